@@ -0,0 +1,142 @@
+"""
+Бенчмарк поиска команды: линейный перебор против CommandIndex.
+
+Ответы индекса сверяются с полным перебором по той же формуле оценки
+(каждый триггер оценивается отдельно): число расхождений должно быть 0.
+
+Запуск:
+    python -m benchmarks.bench_command_index [--commands 10000]
+"""
+
+import argparse
+import random
+import time
+
+from modules.command_index import (
+    EXTRA_WORDS_PENALTY, FUZZY_MIN_SIMILARITY, CommandIndex, normalize_tokens, token_trigrams,
+)
+from modules.commands import MIN_COMMAND_SCORE
+
+VERBS = ["открой", "закрой", "запусти", "останови", "покажи", "скрой", "включи", "выключи"]
+FILLERS = ["пожалуйста", "быстро", "сейчас", "ну"]
+
+
+def make_triggers(count: int, rng: random.Random) -> list:
+    """Уникальные триггеры вида "<глагол> <объект> <номер>"."""
+    objects = ["".join(rng.choice("абвгдежзиклмнопрстуфхцчшщыэюя") for _ in range(rng.randint(4, 9)))
+               for _ in range(max(1, count // len(VERBS)) + 1)]
+    triggers = []
+    for i in range(count):
+        triggers.append(f"{VERBS[i % len(VERBS)]} {objects[i // len(VERBS)]}")
+    return triggers
+
+
+def make_queries(triggers: list, count: int, rng: random.Random) -> list:
+    """Фразы пользователя: точные, с лишними словами (в т.ч. из других триггеров) и с опечаткой."""
+    queries = []
+    for _ in range(count):
+        verb, obj = rng.choice(triggers).split()
+        kind = rng.randrange(4)
+        if kind == 1:
+            queries.append(f"{verb} {rng.choice(FILLERS)} {obj}")
+        elif kind == 3:
+            queries.append(f"{verb} {obj} {rng.choice(triggers).split()[1]}")
+        elif kind == 2:
+            pos = rng.randrange(len(obj))
+            queries.append(f"{verb} {obj[:pos]}о{obj[pos + 1:]}")
+        else:
+            queries.append(f"{verb} {obj}")
+    return queries
+
+
+def linear_scan(triggers: list, user_input: str):
+    """Прежний алгоритм CommandManager.find_similar_command."""
+    best_match, best_score = None, 0
+    text = user_input.lower()
+    for trigger in triggers:
+        if text in trigger.lower():
+            score = len(text) / len(trigger)
+            if score > best_score:
+                best_score, best_match = score, trigger
+    return best_match if best_score >= 0.5 else None
+
+
+def exhaustive_search(triggers: list, text: str, top_k: int) -> list:
+    """Эталон: оценка каждого триггера по формуле CommandIndex.search, без индекса."""
+    query = set(normalize_tokens(text))
+    vocabulary = {token for trigger in triggers for token in normalize_tokens(trigger)}
+
+    def similarity(token: str, word: str) -> float:
+        if token == word:
+            return 1.0
+        if token in vocabulary:
+            return 0.0  # Известное слово не считается опечаткой другого
+        grams = token_trigrams(token)
+        dice = 2 * len(grams & token_trigrams(word)) / (len(grams) + len(word))
+        return dice if dice >= FUZZY_MIN_SIMILARITY else 0.0
+
+    weights = {word: max(similarity(token, word) for token in query) for word in vocabulary}
+    used = sum(any(similarity(token, word) for word in vocabulary) for token in query)
+    factor = 1 - EXTRA_WORDS_PENALTY + EXTRA_WORDS_PENALTY * used / len(query)
+    scored = []
+    for i, trigger in enumerate(triggers):
+        tokens = set(normalize_tokens(trigger))
+        total = sum(weights[token] for token in tokens)
+        if total:
+            scored.append((str(i), total / len(tokens) * factor))
+    return sorted(scored, key=lambda item: item[1], reverse=True)[:top_k]
+
+
+def mismatches(index: CommandIndex, triggers: list, queries: list, top_k: int = 2) -> int:
+    """Сколько ответов индекса расходятся с полным перебором (по оценкам top_k)."""
+    wrong = 0
+    for query in queries:
+        expected = [round(score, 9) for _, score in exhaustive_search(triggers, query, top_k)]
+        actual = [round(score, 9) for _, score in index.search(query, top_k)]
+        wrong += expected != actual
+    return wrong
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--commands", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--check-commands", type=int, default=500, help="Команд для сверки с полным перебором")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    triggers = make_triggers(args.commands, rng)
+    queries = make_queries(triggers, args.queries, rng)
+
+    started = time.perf_counter()
+    index = CommandIndex()
+    for i, trigger in enumerate(triggers):
+        index.add(str(i), trigger)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    scan_hits = sum(linear_scan(triggers, q) is not None for q in queries)
+    scan_us = (time.perf_counter() - started) / len(queries) * 1e6
+
+    started = time.perf_counter()
+    results = [index.search(q, top_k=5) for q in queries]
+    index_us = (time.perf_counter() - started) / len(queries) * 1e6
+    index_hits = sum(bool(ranked) and ranked[0][1] >= MIN_COMMAND_SCORE for ranked in results)
+
+    print(f"Команд: {args.commands}, запросов: {args.queries}, построение индекса: {build_ms:.0f} мс")
+    print(f"{'метод':<18}{'мкс/запрос':>12}{'найдено':>10}")
+    print(f"{'линейный перебор':<18}{scan_us:>12.1f}{scan_hits:>10}")
+    print(f"{'CommandIndex':<18}{index_us:>12.1f}{index_hits:>10}")
+
+    # Сверка с полным перебором (на меньшем наборе: эталон медленный)
+    check_triggers = make_triggers(args.check_commands, rng)
+    check_queries = make_queries(check_triggers, 500, rng)
+    check_index = CommandIndex()
+    for i, trigger in enumerate(check_triggers):
+        check_index.add(str(i), trigger)
+    wrong = mismatches(check_index, check_triggers, check_queries)
+    print(f"Расхождений с полным перебором: {wrong} из {len(check_queries)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Задержка одного вызова OCR для разных бэкендов на фиксированном наборе PNG.
+
+pytesseract запускает tesseract на каждый вызов; tesserocr и worker держат
+движок с загруженным языком.
+
+Запуск:
+    python -m benchmarks.bench_ocr_backends [--fixtures DIR] [--repeat 3]
+        [--backends pytesseract tesserocr worker]
+
+Без --fixtures набор генерируется во временный каталог.
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.ocr_fixtures import write_fixtures
+from modules.ocr_translator import OCR_BACKENDS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сравнение OCR-бэкендов")
+    parser.add_argument("--fixtures", type=Path, help="Каталог с PNG")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backends", nargs="+", default=list(OCR_BACKENDS))
+    args = parser.parse_args()
+
+    if args.fixtures:
+        paths = sorted(args.fixtures.glob("*.png"))
+    else:
+        paths = write_fixtures(Path(tempfile.mkdtemp(prefix="ocr-fixtures-")))
+    images = {path.stem: np.asarray(Image.open(path).convert("RGB")) for path in paths}
+
+    header = f"{'бэкенд':<12}{'старт, мс':>10}" + "".join(f"{name:>12}" for name in images)
+    print("Медиана задержки вызова, мс")
+    print(header)
+    for kind in args.backends:
+        try:
+            started = time.perf_counter()
+            backend = OCR_BACKENDS[kind]()
+            init_ms = (time.perf_counter() - started) * 1000
+        except Exception as e:
+            print(f"{kind:<12}недоступен: {e}")
+            continue
+
+        row = f"{kind:<12}{init_ms:>10.0f}"
+        try:
+            for pixels in images.values():
+                timings = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    backend.recognize(pixels)
+                    timings.append((time.perf_counter() - started) * 1000)
+                row += f"{statistics.median(timings):>12.0f}"
+        finally:
+            backend.close()
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
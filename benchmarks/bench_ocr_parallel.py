@@ -0,0 +1,79 @@
+"""
+Ускорение OCR по блокам в пуле процессов относительно последовательного пути.
+
+Снимок — рабочий стол с несколькими окнами текста; блоки получаются так же,
+как в OCRTranslator (области с текстом).
+
+Запуск:
+    python -m benchmarks.bench_ocr_parallel [--backend tesserocr] [--windows 6] [--repeat 3]
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks.ocr_fixtures import make_desktop
+from modules.ocr_parallel import ParallelOcr, default_workers
+from modules.ocr_preprocess import find_text_regions
+
+WIDTH, HEIGHT = 3840, 2160
+
+
+def window_layout(count: int) -> list:
+    """Окна сеткой 3 x N по всему экрану (промежутки шире ореола бинаризации)."""
+    boxes = []
+    for i in range(count):
+        column, row = i % 3, i // 3
+        boxes.append((80 + column * 1260, 80 + row * 1000, 1060, 800))
+    return boxes
+
+
+def median_ms(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Параллельный OCR по блокам")
+    parser.add_argument("--backend", default="auto")
+    parser.add_argument("--windows", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pixels = np.asarray(make_desktop(WIDTH, HEIGHT, window_layout(args.windows), seed=5, font_size=36))
+    blocks = [region.pixels for region in find_text_regions(pixels)]
+    print(f"Снимок {WIDTH}x{HEIGHT}, окон: {args.windows}, блоков: {len(blocks)}, ядер: {os.cpu_count()}")
+
+    from modules.ocr_translator import create_ocr_backend
+    backend = create_ocr_backend(args.backend)
+    serial_texts = [backend.recognize(block) for block in blocks]  # Прогрев
+    serial_ms = median_ms(lambda: [backend.recognize(block) for block in blocks], args.repeat)
+    backend.close()
+    print(f"{'процессов':>10}{'время, мс':>12}{'ускорение':>11}")
+    print(f"{'серийно':>10}{serial_ms:>12.0f}{1.0:>11.2f}")
+
+    pool = ParallelOcr(backend=args.backend)
+    try:
+        # Прогрев: запуск процессов и загрузка языковых данных
+        assert pool.recognize(blocks) == serial_texts, "Результаты пула и серийного пути разошлись"
+        workers = 2
+        while True:
+            workers = min(workers, default_workers())
+            parallel_ms = median_ms(lambda: pool.recognize(blocks, workers=workers), args.repeat)
+            print(f"{workers:>10}{parallel_ms:>12.0f}{serial_ms / parallel_ms:>11.2f}")
+            if workers == default_workers():
+                break
+            workers *= 2
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Эффект предобработки перед OCR на снимке 4K с одним окном текста.
+
+Сравнивает распознавание полного снимка с распознаванием только найденных
+бинаризованных областей и показывает стоимость самой предобработки.
+
+Запуск:
+    python -m benchmarks.bench_ocr_preprocess [--backend tesserocr] [--repeat 3]
+
+Без установленного Tesseract выводятся только время предобработки и доля
+площади, которая уходит в OCR.
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks.ocr_fixtures import make_desktop
+from modules.ocr_preprocess import find_text_regions
+
+WIDTH, HEIGHT = 3840, 2160
+WINDOW = (700, 450, 1500, 1000)  # Одно окно с текстом
+
+
+def timed(func, repeat: int) -> tuple:
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Предобработка снимка перед OCR")
+    parser.add_argument("--backend", default="pytesseract")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pixels = np.asarray(make_desktop(WIDTH, HEIGHT, [WINDOW], seed=4, font_size=36))
+    prep_ms, regions = timed(lambda: find_text_regions(pixels), args.repeat)
+    area = sum(r.pixels.size for r in regions)
+    print(f"Снимок {WIDTH}x{HEIGHT}, предобработка: {prep_ms:.1f} мс, областей: {len(regions)}")
+    for r in regions:
+        print(f"  ({r.left}, {r.top}) – ({r.right}, {r.bottom}), в OCR {r.pixels.shape[1]}x{r.pixels.shape[0]}")
+    print(f"В OCR уходит {area / (WIDTH * HEIGHT) * 100:.1f}% пикселей полного снимка")
+
+    try:
+        from modules.ocr_translator import OCR_BACKENDS
+        backend = OCR_BACKENDS[args.backend]()
+    except Exception as e:
+        print(f"OCR-бэкенд {args.backend} недоступен ({e}) — распознавание не замерено")
+        return
+
+    try:
+        full_ms, _ = timed(lambda: backend.recognize(pixels), args.repeat)
+        cropped_ms, _ = timed(
+            lambda: [backend.recognize(r.pixels) for r in find_text_regions(pixels)], args.repeat
+        )
+    finally:
+        backend.close()
+    print(f"OCR полного снимка:          {full_ms:8.0f} мс")
+    print(f"Предобработка + OCR областей: {cropped_ms:8.0f} мс")
+    print(f"Ускорение: x{full_ms / cropped_ms:.1f}")
+
+
+if __name__ == "__main__":
+    main()
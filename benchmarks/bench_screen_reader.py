@@ -0,0 +1,86 @@
+"""
+Время до первого звука и общее время чтения экрана: целиком против конвейера.
+
+OCR и перевод имитируются задержками (на блок и на символ), речь — тестовым
+бэкендом TTS в реальном времени, так что замер не требует Tesseract и Argos
+и показывает именно эффект перекрытия стадий.
+
+Запуск:
+    python -m benchmarks.bench_screen_reader [--blocks 6] [--ocr-ms 250] [--translate-ms 1.5]
+"""
+
+import argparse
+import threading
+import time
+
+from modules.screen_reader import ScreenReader
+from modules.text_to_speech import BufferBackend, TextToSpeech
+
+BLOCK_TEXT = (
+    "Файл сохранен в папке документов. Проверьте настройки синхронизации. "
+    "Новая версия доступна для загрузки."
+)
+
+
+class SimulatedOcr:
+    """OCRTranslator с фиксированной стоимостью стадий."""
+
+    def __init__(self, blocks: int, ocr_ms: float, translate_ms_per_char: float):
+        self.blocks = blocks
+        self.ocr_ms = ocr_ms
+        self.translate_ms_per_char = translate_ms_per_char
+
+    def iter_text_blocks(self, region=None):
+        for _ in range(self.blocks):
+            time.sleep(self.ocr_ms / 1000)
+            yield BLOCK_TEXT
+
+    def translate_sentences(self, sentences: list) -> list:
+        # Один пакет модели на блок
+        time.sleep(sum(len(sentence) for sentence in sentences) * self.translate_ms_per_char / 1000)
+        return list(sentences)
+
+    def extract_and_translate_from_screen(self) -> dict:
+        original = "\n".join(self.iter_text_blocks())
+        translated = "\n".join(self.translate_sentences(original.splitlines()))
+        return {"original": original, "translated": translated}
+
+
+def batch_reading(ocr: SimulatedOcr, tts: TextToSpeech) -> tuple:
+    """Прежний путь: весь OCR, весь перевод, затем одна реплика."""
+    started = time.perf_counter()
+    first_audio = []
+    result = ocr.extract_and_translate_from_screen()
+    tts.speak(result["translated"], on_start=lambda: first_audio.append(time.perf_counter()))
+    return (first_audio[0] - started) * 1000, (time.perf_counter() - started) * 1000
+
+
+def streaming_reading(ocr: SimulatedOcr, tts: TextToSpeech) -> tuple:
+    done = threading.Event()
+    reader = ScreenReader(ocr, tts)
+    report = reader.start(on_done=lambda _: done.set())
+    done.wait()
+    return report.first_audio_ms, report.total_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Потоковое чтение экрана")
+    parser.add_argument("--blocks", type=int, default=6)
+    parser.add_argument("--ocr-ms", type=float, default=250, help="OCR одного блока, мс")
+    parser.add_argument("--translate-ms", type=float, default=1.5, help="Перевод одного символа, мс")
+    args = parser.parse_args()
+
+    ocr = SimulatedOcr(args.blocks, args.ocr_ms, args.translate_ms)
+    tts = TextToSpeech(backend=BufferBackend(realtime=True))
+    try:
+        print(f"Блоков: {args.blocks}, OCR {args.ocr_ms:.0f} мс/блок, перевод {args.translate_ms} мс/символ")
+        print(f"{'режим':<12}{'первый звук, мс':>17}{'всего, мс':>12}")
+        for name, run in (("целиком", batch_reading), ("конвейер", streaming_reading)):
+            first_audio_ms, total_ms = run(ocr, tts)
+            print(f"{name:<12}{first_audio_ms:>17.0f}{total_ms:>12.0f}")
+    finally:
+        tts.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Бенчмарк похожести фразы на все триггеры: SequenceMatcher по парам
+против пакетной оценки NgramSimilarityIndex.
+
+Запуск:
+    python -m benchmarks.bench_similarity_batch [--sizes 100 1000 10000]
+"""
+
+import argparse
+import random
+import time
+from difflib import SequenceMatcher
+
+from modules.similarity_index import NgramSimilarityIndex
+from benchmarks.bench_command_index import make_queries, make_triggers
+
+
+def pairwise(triggers: list, query: str) -> int:
+    """Прежний путь: similarity_score для каждого триггера."""
+    best, best_score = -1, 0.0
+    for i, trigger in enumerate(triggers):
+        score = SequenceMatcher(None, query, trigger).ratio()
+        if score > best_score:
+            best, best_score = i, score
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'триггеров':>10}{'сборка, мс':>12}{'попарно, мс':>14}{'пакетно, мс':>14}{'+ rerank, мс':>14}")
+    for size in args.sizes:
+        rng = random.Random(size)
+        triggers = make_triggers(size, rng)
+        queries = make_queries(triggers, args.queries, rng)
+
+        started = time.perf_counter()
+        index = NgramSimilarityIndex(triggers)
+        index.scores(queries[0])  # сборка матрицы
+        build_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        for query in queries:
+            pairwise(triggers, query)
+        pairwise_ms = (time.perf_counter() - started) / len(queries) * 1000
+
+        started = time.perf_counter()
+        for query in queries:
+            index.rank(query, top_k=5)
+        batch_ms = (time.perf_counter() - started) / len(queries) * 1000
+
+        started = time.perf_counter()
+        for query in queries:
+            index.rank(query, top_k=5, rerank=3)
+        rerank_ms = (time.perf_counter() - started) / len(queries) * 1000
+
+        print(f"{size:>10}{build_ms:>12.1f}{pairwise_ms:>14.2f}{batch_ms:>14.3f}{rerank_ms:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Накладные расходы трассировки и точность гистограмм.
+
+Сравнивает стоимость интервала при выключенной и включенной трассировке
+и перцентили гистограммы с точными значениями.
+
+Запуск:
+    python -m benchmarks.bench_tracing [--spans 200000]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from modules.tracing import LatencyHistogram, Tracer
+
+
+def span_cost_ns(tracer: Tracer, count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        with tracer.span("stage"):
+            pass
+    return (time.perf_counter() - started) / count * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Накладные расходы трассировки")
+    parser.add_argument("--spans", type=int, default=200000)
+    args = parser.parse_args()
+
+    baseline_started = time.perf_counter()
+    for _ in range(args.spans):
+        pass
+    loop_ns = (time.perf_counter() - baseline_started) / args.spans * 1e9
+
+    disabled = span_cost_ns(Tracer(enabled=False), args.spans)
+    enabled_tracer = Tracer(enabled=True)
+    enabled_tracer.new_utterance()
+    enabled = span_cost_ns(enabled_tracer, args.spans)
+    print(f"Пустой цикл:           {loop_ns:8.0f} нс")
+    print(f"Интервал, выключено:   {disabled - loop_ns:8.0f} нс")
+    print(f"Интервал, включено:    {enabled - loop_ns:8.0f} нс")
+
+    rng = random.Random(1)
+    values = [int(rng.lognormvariate(10, 1.2)) for _ in range(100000)]  # мкс
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    print(f"{'перцентиль':>10}{'точно, мс':>12}{'гистограмма':>13}{'ошибка':>9}")
+    for percent in (50, 90, 95, 99, 99.9):
+        exact = float(np.percentile(values, percent, method="inverted_cdf"))
+        approx = histogram.percentile(percent)
+        print(f"{percent:>10}{exact / 1000:>12.2f}{approx / 1000:>13.2f}{abs(approx - exact) / exact:>9.2%}")
+    print(f"Корзин занято: {len(histogram.counts)} на {histogram.total} значений")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Пропускная способность перевода: по одному предложению против пакета.
+
+Сравниваются три пути для одного и того же набора предложений:
+  - argostranslate.translate.translate() на каждое предложение (прежний путь:
+    поиск установленных языков и объекта перевода на каждый вызов);
+  - готовый объект перевода пары, по одному предложению;
+  - translate_batch: все предложения одним вызовом модели CTranslate2.
+
+Запуск:
+    python -m benchmarks.bench_translation_batch [--segments 32] [--repeat 3]
+
+Нужны argostranslate и установленный пакет пары из TRANSLATION_CONFIG.
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks.ocr_fixtures import SAMPLE_LINES
+from config.settings import TRANSLATION_CONFIG
+from modules.argos_translation import ARGOS_AVAILABLE, ArgosPair
+
+
+def timed_ms(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Пакетный перевод")
+    parser.add_argument("--segments", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not ARGOS_AVAILABLE:
+        raise SystemExit("argostranslate не установлен")
+    import argostranslate.translate
+
+    source, target = TRANSLATION_CONFIG["source_lang"], TRANSLATION_CONFIG["target_lang"]
+    segments = [SAMPLE_LINES[i % len(SAMPLE_LINES)] + f" {i}." for i in range(args.segments)]
+
+    started = time.perf_counter()
+    pair = ArgosPair(source, target)
+    pair.warm()
+    print(f"Пара {source}-{target}: загрузка и прогрев {(time.perf_counter() - started) * 1000:.0f} мс")
+    print(f"Предложений: {len(segments)}")
+
+    runs = {
+        "translate() на вызов": lambda: [
+            argostranslate.translate.translate(segment, source, target) for segment in segments
+        ],
+        "объект пары, по одному": lambda: [pair.translate(segment) for segment in segments],
+        "translate_batch": lambda: pair.translate_batch(segments),
+    }
+    print(f"{'путь':<26}{'всего, мс':>12}{'мс/предложение':>17}{'предл./с':>11}")
+    for name, run in runs.items():
+        total_ms = timed_ms(run, args.repeat)
+        per_segment = total_ms / len(segments)
+        print(f"{name:<26}{total_ms:>12.0f}{per_segment:>17.1f}{1000 / per_segment:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
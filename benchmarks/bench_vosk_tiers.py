@@ -0,0 +1,70 @@
+"""
+Сравнение уровней моделей Vosk: время загрузки, прирост RSS и задержка
+декодирования одной фразы малой и большой моделью.
+
+Запуск:
+    python -m benchmarks.bench_vosk_tiers phrase.wav [--repeat 5]
+
+WAV — 16 кГц, моно, 16 бит. Пути к моделям берутся из SPEECH_CONFIG.
+"""
+
+import argparse
+import json
+import time
+import wave
+
+from vosk import KaldiRecognizer
+
+from config.settings import SPEECH_CONFIG
+from modules.vosk_models import ModelTier, process_rss
+
+
+def read_pcm(path: str) -> tuple:
+    with wave.open(path, "rb") as wav:
+        if wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise SystemExit("Нужен WAV моно 16 бит")
+        return wav.readframes(wav.getnframes()), wav.getframerate()
+
+
+def decode(tier: ModelTier, pcm: bytes, sample_rate: int) -> str:
+    model = tier.acquire()
+    try:
+        started = time.perf_counter()
+        recognizer = KaldiRecognizer(model, sample_rate)
+        step = 4096
+        for offset in range(0, len(pcm), step):
+            recognizer.AcceptWaveform(pcm[offset:offset + step])
+        text = json.loads(recognizer.FinalResult()).get("text", "")
+        tier.record_decode(time.perf_counter() - started, len(pcm) / 2 / sample_rate)
+        return text
+    finally:
+        tier.release()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("wav", help="Фраза для декодирования")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pcm, sample_rate = read_pcm(args.wav)
+    print(f"Фраза: {len(pcm) / 2 / sample_rate:.2f} с, RSS процесса {process_rss() / 2 ** 20:.0f} МБ")
+
+    tiers = [
+        ModelTier("small", SPEECH_CONFIG["model_path"]),
+        ModelTier("large", SPEECH_CONFIG["large_model_path"]),
+    ]
+    print(f"{'уровень':<8}{'загрузка, с':>12}{'RSS, МБ':>10}{'декод, мс':>11}{'RTF':>7}  текст")
+    for tier in tiers:
+        text = ""
+        for _ in range(args.repeat):
+            text = decode(tier, pcm, sample_rate)
+        stats = tier.get_stats()
+        print(
+            f"{tier.name:<8}{stats['load_seconds']:>12.2f}{stats['rss_mb']:>10.0f}"
+            f"{stats['avg_decode_ms']:>11.1f}{stats['rtf']:>7.2f}  {text}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Микро-бенчмарк подготовки кадра в цикле wake-word.
+
+Сравнивает три пути кадра до вызова движка Porcupine:
+- struct.unpack_from с форматом "h" * N и Porcupine.process(), который
+  копирует кадр в новый массив c_short;
+- int16 memoryview слота и тот же Porcupine.process() с копией;
+- массив c_short поверх слота AudioBus, переданный прямо в нативную функцию
+  (как WakeWordDetector передает его в pv_porcupine_process).
+Вместо движка вызывается memcmp из libc с нулевой длиной: он принимает
+указатель на кадр так же, как pv_porcupine_process, и одинаков для всех путей.
+
+Запуск:
+    python -m benchmarks.bench_wake_frame_decode [--frames 20000]
+"""
+
+import argparse
+import ctypes.util
+import struct
+import time
+import tracemalloc
+from ctypes import CDLL, POINTER, byref, c_int, c_short, c_size_t, c_void_p
+
+FRAME_LENGTH = 512  # Кадр Porcupine (32 мс при 16 кГц)
+RING_FRAMES = 125
+
+_libc = CDLL(ctypes.util.find_library("c") or "msvcrt")
+_native = _libc.memcmp
+_native.argtypes = [POINTER(c_short), c_void_p, c_size_t]
+_native.restype = c_int
+
+
+def make_ring() -> tuple:
+    """Кольцевой буфер так же, как его размечает AudioBus."""
+    frame_bytes = FRAME_LENGTH * 2
+    ring = bytearray(frame_bytes * RING_FRAMES)
+    for i in range(0, len(ring), 2):
+        ring[i] = i % 251
+    view = memoryview(ring)
+    slots = [view[i * frame_bytes:(i + 1) * frame_bytes] for i in range(RING_FRAMES)]
+    sample_slots = [slot.cast("h") for slot in slots]
+    frame_type = c_short * FRAME_LENGTH
+    native_slots = [frame_type.from_buffer(ring, i * frame_bytes) for i in range(RING_FRAMES)]
+    return slots, sample_slots, native_slots
+
+
+def decode_old(slots, index: int):
+    return struct.unpack_from("h" * FRAME_LENGTH, slots[index])
+
+
+def decode_new(sample_slots, index: int):
+    return sample_slots[index]
+
+
+def porcupine_process(pcm) -> int:
+    """Porcupine.process() из pvporcupine: проверка длины, копия в c_short, вызов движка."""
+    if len(pcm) != FRAME_LENGTH:
+        raise ValueError("Неверная длина кадра")
+    keyword_index = c_int(-1)
+    _native((c_short * len(pcm))(*pcm), byref(keyword_index), 0)
+    return keyword_index.value
+
+
+_keyword_index = c_int(-1)
+_keyword_index_ref = byref(_keyword_index)
+
+
+def native_process(pcm) -> int:
+    """Вызов движка из WakeWordDetector: кадр уже c_short, результат в общем c_int."""
+    _native(pcm, _keyword_index_ref, 0)
+    return _keyword_index.value
+
+
+def measure_cpu(decode, process, slots, frames: int) -> float:
+    """CPU-время на кадр, мкс."""
+    start = time.process_time()
+    for i in range(frames):
+        process(decode(slots, i % RING_FRAMES))
+    return (time.process_time() - start) / frames * 1e6
+
+
+def measure_alloc(decode, process, slots, frames: int) -> float:
+    """Пиковый объем выделений на кадр, байт."""
+    tracemalloc.start()
+    peaks = 0
+    for i in range(frames):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        process(decode(slots, i % RING_FRAMES))
+        _, peak = tracemalloc.get_traced_memory()
+        peaks += peak - before
+    tracemalloc.stop()
+    return peaks / frames
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=20000)
+    args = parser.parse_args()
+
+    slots, sample_slots, native_slots = make_ring()
+    paths = [
+        ("struct.unpack_from", decode_old, porcupine_process, slots),
+        ("int16 memoryview", decode_new, porcupine_process, sample_slots),
+        ("c_short слот", decode_new, native_process, native_slots),
+    ]
+
+    print(f"Кадров: {args.frames}, длина кадра: {FRAME_LENGTH}")
+    print(f"{'путь':<22}{'CPU, мкс/кадр':>16}{'выделено, Б/кадр':>20}")
+    for name, decode, process, data in paths:
+        process(decode(data, 0))  # прогрев
+        cpu = measure_cpu(decode, process, data, args.frames)
+        alloc = measure_alloc(decode, process, data, min(args.frames, 5000))
+        print(f"{name:<22}{cpu:>16.2f}{alloc:>20.0f}")
+
+
+if __name__ == "__main__":
+    main()
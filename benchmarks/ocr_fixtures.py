@@ -0,0 +1,106 @@
+"""
+Генерация изображений-фикстур для бенчмарков OCR (детерминированно, через PIL).
+"""
+
+import random
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+SAMPLE_LINES = [
+    "Открыть файл и сохранить изменения в документе",
+    "Системный монитор: загрузка процессора 42 процента",
+    "Перевод текста с русского на английский язык",
+    "Голосовой помощник слушает команду пользователя",
+    "Температура видеокарты в пределах нормы",
+    "Настройки распознавания речи и синтеза голоса",
+    "Скачать обновление и перезапустить приложение",
+    "Ошибка подключения к серверу, повторите попытку",
+]
+
+FONT_CANDIDATES = (
+    "DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "C:/Windows/Fonts/segoeui.ttf",
+    "C:/Windows/Fonts/arial.ttf",
+    "Arial.ttf",
+)
+
+
+def load_font(size: int) -> ImageFont.ImageFont:
+    """Шрифт с кириллицей, если найдется, иначе встроенный."""
+    for name in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+
+def draw_text_block(
+    image: Image.Image,
+    box: Tuple[int, int, int, int],
+    lines: Sequence[str],
+    font_size: int = 22,
+    background: Tuple[int, int, int] = (255, 255, 255),
+    foreground: Tuple[int, int, int] = (20, 20, 20),
+) -> None:
+    """Окно с текстом в прямоугольнике (left, top, width, height)."""
+    left, top, width, height = box
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((left, top, left + width, top + height), fill=background, outline=(90, 90, 90))
+    font = load_font(font_size)
+    y = top + font_size
+    for line in lines:
+        if y + font_size * 1.5 > top + height:
+            break
+        draw.text((left + font_size, y), line, font=font, fill=foreground)
+        y += int(font_size * 1.6)
+
+
+def make_desktop(
+    width: int,
+    height: int,
+    windows: Sequence[Tuple[int, int, int, int]],
+    seed: int = 0,
+    font_size: int = 22,
+) -> Image.Image:
+    """Рабочий стол с градиентным фоном и окнами текста."""
+    rng = random.Random(seed)
+    gradient = Image.linear_gradient("L").resize((width, height))
+    desktop = Image.merge("RGB", (gradient.point(lambda v: 30 + v // 4),
+                                  gradient.point(lambda v: 60 + v // 5),
+                                  gradient.point(lambda v: 90 + v // 6)))
+    for box in windows:
+        count = max(1, box[3] // int(font_size * 1.6))
+        lines = [rng.choice(SAMPLE_LINES) for _ in range(count)]
+        draw_text_block(desktop, box, lines, font_size=font_size)
+    return desktop
+
+
+def fixture_set() -> Dict[str, Image.Image]:
+    """Фиксированный набор изображений для сравнения бэкендов."""
+    dialog = Image.new("RGB", (800, 300), (255, 255, 255))
+    draw_text_block(dialog, (0, 0, 799, 299), SAMPLE_LINES[:4])
+
+    document = Image.new("RGB", (1600, 1000), (255, 255, 255))
+    draw_text_block(document, (0, 0, 1599, 999), SAMPLE_LINES * 4, font_size=24)
+
+    terminal = Image.new("RGB", (1200, 600), (12, 12, 12))
+    draw_text_block(terminal, (0, 0, 1199, 599), SAMPLE_LINES[::-1] * 2,
+                    font_size=20, background=(12, 12, 12), foreground=(220, 220, 220))
+
+    desktop = make_desktop(1920, 1080, [(200, 150, 900, 500), (1150, 600, 650, 380)], seed=1)
+    return {"dialog": dialog, "document": document, "terminal": terminal, "desktop": desktop}
+
+
+def write_fixtures(directory: Path) -> List[Path]:
+    """Сохранить набор фикстур в PNG."""
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, image in fixture_set().items():
+        path = directory / f"{name}.png"
+        image.save(path)
+        paths.append(path)
+    return paths
@@ -2,10 +2,6 @@
 
 import os
 from pathlib import Path
-from dotenv import load_dotenv
-
-# Загрузка переменных окружения
-load_dotenv()
 
 # Пути
 BASE_DIR = Path(__file__).parent.parent
@@ -13,16 +9,59 @@ DATA_DIR = BASE_DIR / "data"
 LOGS_DIR = BASE_DIR / "logs"
 MODELS_DIR = BASE_DIR / "models"
 
-# Создание директорий если их нет
-for directory in [DATA_DIR, LOGS_DIR, MODELS_DIR]:
-    directory.mkdir(exist_ok=True)
+# Загрузка переменных окружения (без поиска .env по стеку вызовов)
+_ENV_FILE = BASE_DIR / ".env"
+if _ENV_FILE.is_file():
+    from dotenv import load_dotenv
+    load_dotenv(_ENV_FILE)
+
+
+def ensure_directories() -> None:
+    """Создать рабочие директории (вызывается при запуске, а не при импорте)."""
+    for directory in [DATA_DIR, LOGS_DIR, MODELS_DIR]:
+        directory.mkdir(exist_ok=True)
+
 
 # Параметры речи
 SPEECH_CONFIG = {
     "sample_rate": 16000,
     "chunk_size": 2048,
     "language": "ru_RU",
-    "model_path": str(MODELS_DIR / "vosk-model-ru-0.42"),
+    "model_path": str(MODELS_DIR / "vosk-model-small-ru-0.22"),  # Малая модель команд (всегда в памяти)
+    "large_model_path": str(MODELS_DIR / "vosk-model-ru-0.42"),  # Большая: диктовка и перепроверка
+    "large_model_idle_unload": 120.0,  # Выгружать большую модель после простоя (сек)
+    "rescore_confidence": 0.6,  # Средняя уверенность слов, ниже которой команда перепроверяется
+    "rescore_max_seconds": 10.0,  # Самая длинная команда для перепроверки (сек)
+    "preroll_seconds": 1.5,  # Звук до срабатывания wake-word, отдаваемый в Vosk
+    "wake_aliases": ("джарвис", "jarvis", "жарвис"),  # Отрезаются в начале фразы
+}
+
+# Параметры детектора речи (VAD) и определения конца фразы
+VAD_CONFIG = {
+    "enabled": True,
+    "subframe_ms": 16,  # Длина подкадра для энергии/ZCR
+    "energy_margin_db": 9.0,  # Порог речи над уровнем шума
+    "zcr_unvoiced": 0.3,  # ZCR шипящих согласных
+    "min_speech_subframes": 2,  # Подкадров с речью, чтобы блок считался речью
+    "initial_noise_floor_db": -60.0,
+    "floor_window_ms": 3000,  # Окно энергий подкадров для оценки уровня шума
+    "floor_percentile": 10,  # Уровень шума — этот перцентиль энергий окна
+    "floor_fall_rate": 0.3,  # Скорость снижения уровня шума
+    "floor_rise_rate": 0.05,  # Скорость роста уровня шума
+    "hangover_ms": 300,  # Сколько тишины после речи еще отдавать в Vosk
+    "endpoint_silence_ms": 700,  # Тишина после речи, после которой фраза завершается
+    "no_speech_timeout": 6.0,  # Сколько ждать начала речи после активации (сек)
+}
+
+# Параметры захвата звука (общая шина для wake-word и STT)
+AUDIO_CONFIG = {
+    "source": os.getenv("AUDIO_SOURCE", "pyaudio"),  # pyaudio, wav, pcm
+    "source_path": os.getenv("AUDIO_SOURCE_PATH", ""),  # Файл WAV/PCM, "-" для stdin
+    "loop": False,  # Зациклить WAV-файл
+    "sample_rate": SPEECH_CONFIG["sample_rate"],
+    "frame_length": 512,  # Семплов в кадре (совпадает с Porcupine)
+    "ring_seconds": 4.0,  # Емкость кольцевого буфера
+    "device_index": None,  # Индекс устройства PyAudio (None — по умолчанию)
 }
 
 # Параметры Porcupine (Wake-word)
@@ -30,6 +69,23 @@ PORCUPINE_CONFIG = {
     "keyword": "привет помощник",  # Ключевая фраза
     "access_key": os.getenv("PORCUPINE_ACCESS_KEY", ""),  # Получить с picovoice.ai
     "sensitivities": 0.5,
+    "wake_prompt": False,  # Говорить "Слушаю" после wake-word (иначе — сразу слушать)
+}
+
+# Выполнение команд по частичным результатам STT
+SPECULATIVE_CONFIG = {
+    "enabled": False,
+    "mode": "dispatch",  # dispatch — выполнить сразу, prewarm — только подготовить
+    "stable_partials": 2,  # Сколько раз подряд должна повториться гипотеза
+    "min_score": 0.9,  # Минимальная оценка совпадения с триггером
+    "min_margin": 0.3,  # Отрыв от второго кандидата
+}
+
+# Параметры NLP
+NLP_CONFIG = {
+    "intents_path": str(DATA_DIR / "intents.json"),  # Доп. ключевые слова {намерение: [слова]}
+    "fuzzy_command_score": 0.7,  # Порог запасного поиска команды по n-граммам (косинус + Левенштейн)
+    "fuzzy_rerank": 3,  # Сколько лучших по n-граммам триггеров уточнять Левенштейном
 }
 
 # Параметры TTS
@@ -37,12 +93,33 @@ TTS_CONFIG = {
     "rate": 150,  # Скорость речи (слова в минуту)
     "volume": 0.9,  # Громкость (0-1)
     "language": "ru",
+    "voice": None,  # ID голоса (None — первый русский)
+    "phrase_cache_mb": 32,  # Память под заранее синтезированные фразы
+    "phrase_cache_dir": str(DATA_DIR / "tts_cache"),
 }
 
 # Параметры OCR
 OCR_CONFIG = {
     "tesseract_path": r"C:\Program Files\Tesseract-OCR\tesseract.exe",  # Путь к Tesseract
     "language": "rus",
+    "backend": "auto",  # auto, tesserocr (в процессе), worker (отдельный процесс), pytesseract
+    "tessdata_path": None,  # Каталог traineddata (None — рядом с tesseract.exe)
+    "preprocess": True,  # Бинаризация и поиск областей с текстом перед OCR
+    "downscale_above": 2560,  # Шире — уменьшать в целое число раз (экраны 4K)
+    "binarize_window": 31,  # Окно локального среднего (пикс.)
+    "binarize_offset": 12,  # Отступ от локального среднего для "чернил"
+    "region_cell": 8,  # Клетка сетки поиска областей (пикс.)
+    "region_min_density": 0.03,  # Доля "чернил" в клетке с текстом
+    "region_gap_cells": (2, 4),  # Промежуток между блоками: строки, столбцы (клеток)
+    "region_min_cells": 6,  # Меньшие блоки отбрасываются
+    "region_padding": 6,  # Поля вокруг области (пикс.)
+    "parallel": True,  # Распознавать блоки снимка в пуле процессов
+    "parallel_workers": None,  # Размер пула (None — ядра минус одно)
+    "stream_queue_size": 4,  # Очереди между стадиями чтения экрана (OCR → перевод → речь)
+    "stream_speech_ahead": 2,  # Предложений в очереди TTS впереди озвучиваемого
+    "cache_mb": 8,  # Память под кэш распознанного текста
+    "band_min_gap": 2,  # Пустых строк, разделяющих полосы (меньше — та же строка текста)
+    "max_tile_height": 256,  # Полоса режется принудительно, если нет пустых строк
 }
 
 # Параметры перевода
@@ -50,12 +127,24 @@ TRANSLATION_CONFIG = {
     "source_lang": "ru",
     "target_lang": "en",
     "use_online": False,  # Использовать онлайн-переводчик (DeepL, Google)
+    "cache": True,  # Кэш переводов по предложениям (память + БД)
+    "cache_entries": 5000,  # Предложений в памяти
+    "warm_on_start": True,  # Загружать модель перевода в фоне при старте OCR
+    "batch_size": 32,  # Предложений в одном вызове модели
+    "beam_size": 4,  # Ширина луча (как в Argos)
+    "threads": 0,  # Потоков модели (0 — по умолчанию CTranslate2)
 }
 
 # Параметры БД
 DATABASE_CONFIG = {
     "path": str(DATA_DIR / "assistant.db"),
     "timeout": 5.0,
+    "history": True,  # Сохранять историю команд и показателей
+    "flush_interval": 2.0,  # Наибольшая задержка записи на диск (сек)
+    "batch_size": 500,  # Записей в одной транзакции
+    "queue_size": 10000,  # Очередь записи (при переполнении записи теряются)
+    "retention_days": 90,  # Сколько хранить историю
+    "compact_interval": 6 * 3600,  # Период очистки старых записей (сек)
 }
 
 # Параметры системного мониторинга
@@ -63,6 +152,33 @@ SYSTEM_MONITOR_CONFIG = {
     "update_interval": 1.0,  # Интервал обновления (сек)
     "max_temp_warning": 85,  # Предупреждение при температуре (°C)
     "monitor_gpu": True,
+    "history_raw_seconds": 3600,  # Сырые замеры за последний час
+    "history_minutes": 1440,  # Поминутные min/max/avg за сутки
+    "history_path": str(DATA_DIR / "metrics_history.npz"),  # Снимок истории между запусками
+    # Сколько секунд значение источника считается свежим
+    "collector_ttl": {
+        "cpu": 0.0,  # Загрузка считается между замерами — каждый замер
+        "cpu_freq": 10.0,
+        "ram": 0.0,
+        "disk": 60.0,
+        "cpu_temp": 5.0,
+        "gpu": 5.0,  # GPUtil запускает nvidia-smi
+    },
+    "collector_max_failures": 5,  # Сбоев подряд до отключения источника
+    "collector_max_backoff": 300.0,  # Предельная пауза перед повтором (сек)
+}
+
+# Регулятор нагрузки: деградация ассистента при загруженной машине
+GOVERNOR_CONFIG = {
+    "enabled": True,
+    "smoothing": 0.3,  # Вес нового замера в сглаживании загрузки CPU
+    "cpu_thresholds": ((75, 60), (90, 80)),  # (вход, выход) % для reduced и minimal
+    "temp_offsets": ((-10, -15), (0, -5)),  # То же для температуры, от max_temp_warning (°C)
+    "min_dwell": 15.0,  # Минимум секунд в уровне перед понижением
+    "ocr_scale": (1.0, 0.75, 0.5),  # Масштаб скриншота для OCR по уровням
+    "ocr_worker_share": (1.0, 0.5, 0.0),  # Доля пула OCR по уровням (минимум 1 процесс)
+    "lower_priority": True,  # Понижать приоритет процесса в режимах деградации
+    "nice_increment": 5,  # На сколько повышать nice (Linux/macOS)
 }
 
 # API ключи (опционально)
@@ -79,6 +195,13 @@ LOGGING_CONFIG = {
     "log_file": str(LOGS_DIR / "assistant.log"),
 }
 
+# Трассировка задержек по репликам (включается и флагом --trace)
+TRACING_CONFIG = {
+    "enabled": False,
+    "max_events": 20000,  # Последних событий для выгрузки
+    "trace_path": str(LOGS_DIR / "trace.json"),  # Chrome trace при выходе
+}
+
 # Параметры GUI
 GUI_CONFIG = {
     "window_width": 1200,
@@ -2,38 +2,59 @@
 Главная точка выполнения голосового помощника для Windows 11.
 """
 
+import argparse
 import logging
+import re
 import sys
 import time
-from typing import Optional
-
-from config.settings import LOGGING_CONFIG
-from modules.text_to_speech import TextToSpeech
-from modules.speech_recognition import SpeechRecognizer
-from modules.system_monitor import SystemMonitor
-from modules.ocr_translator import OCRTranslator
-from modules.commands import CommandManager
-from modules.activation import WakeWordDetector
-
-# GUI (минималистичное окно Jarvis)
-try:
-    from ui.gui import run_gui
-    GUI_AVAILABLE = True
-except ImportError:
-    GUI_AVAILABLE = False
-
-# Конфигурация логирования
-logging.basicConfig(
-    level=getattr(logging, LOGGING_CONFIG["level"]),
-    format=LOGGING_CONFIG["format"],
-    handlers=[
-        logging.FileHandler(LOGGING_CONFIG["log_file"]),
-        logging.StreamHandler(sys.stdout),
-    ],
-)
+from typing import Dict, Optional, Tuple
+
+# Первым — профилировщик запуска: от него отсчитывается время импортов
+from modules.startup import LazyComponent, profiler
+
+# Путь wake-word импортируется сразу, тяжелые модули — в фабриках ниже
+with profiler.measure("config.settings", kind="import"):
+    from config.settings import (
+        DATABASE_CONFIG, GOVERNOR_CONFIG, LOGGING_CONFIG, PORCUPINE_CONFIG, ensure_directories,
+    )
+with profiler.measure("modules.commands", kind="import"):
+    from modules.commands import CommandManager, SpeculativeDispatcher
+with profiler.measure("modules.activation", kind="import"):
+    from modules.activation import WakeWordDetector
+    from modules.audio_bus import AudioBus, create_audio_source
+with profiler.measure("modules.tracing", kind="import"):
+    from modules.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
+# Время от запуска до готовности wake-word, к которому стремимся
+WAKE_READY_TARGET = 1.0
+
+
+def setup_logging() -> None:
+    """Конфигурация логирования."""
+    logging.basicConfig(
+        level=getattr(logging, LOGGING_CONFIG["level"]),
+        format=LOGGING_CONFIG["format"],
+        handlers=[
+            logging.FileHandler(LOGGING_CONFIG["log_file"]),
+            logging.StreamHandler(sys.stdout),
+        ],
+    )
+
+
+# Постоянные реплики — играются из кэша рендеров
+PHRASE_LISTENING = "Слушаю. Говори команду."
+PHRASE_UNKNOWN = "Команда не распознана."
+PHRASE_OCR_FAILED = "Не удалось прочитать текст с экрана."
+PHRASE_DICTATION = "Диктуй."
+
+# Окна для вопросов об истории нагрузки ("нагрузка за последние 10 минут")
+WINDOW_WORDS = {
+    "минуту": 1, "пять": 5, "десять": 10, "пятнадцать": 15,
+    "двадцать": 20, "тридцать": 30, "час": 60, "сутки": 1440,
+}
+
 
 class VoiceAssistant:
     """Основной класс голосового помощника (Jarvis)."""
@@ -48,21 +69,134 @@ class VoiceAssistant:
 
         # GUI окно (инициализируется позже)
         self.gui_window = None
-
-        # Модули
+        # История показателей и регулятор нагрузки (создаются вместе с монитором)
+        self.metrics_history = None
+        self.governor = None
+        # Потоковое чтение экрана (создается при первой команде)
+        self.screen_reader = None
+        # (задержка, мс; успех) команды, выполненной по частичной фразе
+        self._speculative_result: Tuple[float, bool] = (0.0, False)
+
+        # Сначала — все, что нужно для реакции на wake-word
         logger.info("Инициализация модулей...")
-        self.tts = TextToSpeech()
-        self.system_monitor = SystemMonitor()
-        self.ocr_translator = OCRTranslator()
-        self.command_manager = CommandManager()
-
-        # STT и wake-word
-        self.recognizer = SpeechRecognizer(on_result=self._on_speech_recognized)
-        self.wake_detector: Optional[WakeWordDetector] = WakeWordDetector(
-            on_wake=self._on_wake_word
+        with profiler.measure("CommandManager"):
+            self.command_manager = CommandManager()
+            self.speculator = SpeculativeDispatcher(self.command_manager)
+
+        # Единая шина микрофона для wake-word и STT
+        with profiler.measure("AudioBus"):
+            self.audio_bus = AudioBus(create_audio_source())
+        with profiler.measure("WakeWordDetector"):
+            self.wake_detector: Optional[WakeWordDetector] = WakeWordDetector(
+                on_wake=self._on_wake_word, audio_bus=self.audio_bus
+            )
+        profiler.mark("wake-word готов")
+
+        # Тяжелые модули создаются в фоне или при первом обращении
+        self.components: Dict[str, LazyComponent] = {
+            "recognizer": LazyComponent("SpeechRecognizer", self._create_recognizer),
+            "tts": LazyComponent("TextToSpeech", self._create_tts),
+            "system_monitor": LazyComponent("SystemMonitor", self._create_system_monitor),
+            "ocr_translator": LazyComponent("OCRTranslator", self._create_ocr_translator),
+            "history": LazyComponent("HistoryStore", self._create_history),
+        }
+        # Модель Vosk — самая долгая, начинаем с нее
+        self.components["recognizer"].start_background()
+        self.components["tts"].start_background()
+        self.components["system_monitor"].start_background()
+        if DATABASE_CONFIG["history"]:
+            self.components["history"].start_background()
+        # OCR и перевод нужны редко — прогреваем, когда загрузится Vosk
+        # (и если машина не загружена)
+        self.components["recognizer"].future.add_done_callback(
+            lambda _: self._defer(self.components["ocr_translator"].start_background)
         )
 
-        logger.info("Все модули инициализированы")
+        logger.info("Wake-word готов, остальные модули загружаются в фоне")
+
+    # ------------------------ МОДУЛИ ------------------------
+
+    def _create_recognizer(self):
+        module = profiler.import_module("modules.speech_recognition")
+        recognizer = module.SpeechRecognizer(
+            audio_bus=self.audio_bus,
+            on_result=self._on_speech_recognized,
+            on_partial=self._on_partial_result if self.speculator.enabled else None,
+        )
+        if self.governor:
+            recognizer.large_model_allowed = self.governor.allows_large_asr()
+        return recognizer
+
+    def _create_tts(self):
+        module = profiler.import_module("modules.text_to_speech")
+        phrase_cache = profiler.import_module("modules.phrase_cache")
+        return module.TextToSpeech(phrase_cache=phrase_cache.PhraseCache())
+
+    def _create_system_monitor(self):
+        module = profiler.import_module("modules.system_monitor")
+        history_module = profiler.import_module("modules.metrics_history")
+        monitor = module.SystemMonitor()
+        self.metrics_history = history_module.MetricsHistory()
+        self.metrics_history.restore()
+        monitor.subscribe(self.metrics_history.append)
+        if GOVERNOR_CONFIG["enabled"]:
+            governor_module = profiler.import_module("modules.load_governor")
+            self.governor = governor_module.LoadGovernor()
+            self.governor.on_level_change(self._on_load_level)
+            monitor.subscribe(self.governor.update)
+        monitor.start()
+        return monitor
+
+    def _defer(self, task) -> None:
+        """Несрочная работа — через регулятор нагрузки (когда он загрузится)."""
+        def _submit(_monitor) -> None:
+            if self.governor:
+                self.governor.defer(task)
+            else:
+                task()
+
+        self.components["system_monitor"].when_ready(_submit)
+
+    def _on_load_level(self, level: int, previous: int) -> None:
+        """Переключение режима нагрузки: большая модель ASR только в normal."""
+        allowed = self.governor.allows_large_asr()
+        if self.components["recognizer"].ready:
+            self.recognizer.large_model_allowed = allowed
+            if not allowed and self.recognizer.large_model:
+                self.recognizer.large_model.unload()
+
+    def _create_ocr_translator(self):
+        module = profiler.import_module("modules.ocr_translator")
+        return module.OCRTranslator()
+
+    def _create_history(self):
+        module = profiler.import_module("modules.storage")
+        return module.HistoryStore()
+
+    def _record_command(self, text: str, command: Optional[str], latency_ms: float, success: bool) -> None:
+        """В историю (очередь записи, диск не трогаем)."""
+        if self.components["history"].ready:
+            self.components["history"].get().record_command(text, command, latency_ms, success)
+
+    def _record_metric(self, name: str, value: float) -> None:
+        if self.components["history"].ready:
+            self.components["history"].get().record_metric(name, value)
+
+    @property
+    def recognizer(self):
+        return self.components["recognizer"].get()
+
+    @property
+    def tts(self):
+        return self.components["tts"].get()
+
+    @property
+    def system_monitor(self):
+        return self.components["system_monitor"].get()
+
+    @property
+    def ocr_translator(self):
+        return self.components["ocr_translator"].get()
 
     # ------------------------ ПУСК/СТОП ------------------------
 
@@ -73,36 +207,48 @@ class VoiceAssistant:
         self.is_running = True
         self.awaiting_command = False
 
-        self.tts.speak("Jarvis на связи. Скажи 'Jarvis' и команду.")
-        logger.info("Jarvis активирован")
+        self.audio_bus.start()
 
         # Запуск детектора слова-активатора
         if self.wake_detector:
             self.wake_detector.start()
+        logger.info("Jarvis активирован")
+
+        # Распознаватель держим "теплым", чтобы не терять начало команды
+        self.components["recognizer"].when_ready(lambda recognizer: recognizer.start())
+        # После stop() замеры возобновляются (при первом запуске поток уже идет)
+        self.components["system_monitor"].when_ready(lambda monitor: monitor.start())
+        self.components["tts"].when_ready(self._greet)
+
+    def _greet(self, tts) -> None:
+        """Приветствие и прогрев кэша реплик, когда TTS готов."""
+        tts.speak("Jarvis на связи. Скажи 'Jarvis' и команду.", wait=False)
+        self._defer(lambda: tts.warm_phrases(self._fixed_phrases()))
 
     def start_console_loop(self) -> None:
         """Простой консольный цикл (без GUI)."""
         self.start_background()
         try:
             while self.is_running:
-                stats = self.system_monitor.get_all_stats()
+                stats = self.system_monitor.get_snapshot()
                 logger.info(self.system_monitor.format_stats(stats))
                 time.sleep(5)
         except KeyboardInterrupt:
-            self.stop()
+            self.shutdown()
         except Exception as e:
             logger.error(f"Ошибка в главном цикле: {e}")
-            self.stop()
+            self.shutdown()
 
     def stop(self) -> None:
-        """Остановить Jarvis."""
+        """Остановить Jarvis (можно снова запустить через start_background)."""
         if not self.is_running:
             return
         self.is_running = False
         self.awaiting_command = False
 
         try:
-            self.recognizer.stop_listening()
+            if self.components["recognizer"].ready:
+                self.recognizer.shutdown()
         except Exception:
             pass
 
@@ -112,9 +258,51 @@ class VoiceAssistant:
         except Exception:
             pass
 
-        self.tts.speak("Jarvis отключается. До встречи.")
+        self.audio_bus.stop()
+
+        if self.components["system_monitor"].ready:
+            self.system_monitor.stop()
+            try:
+                self.metrics_history.save()
+            except Exception as e:
+                logger.error(f"Ошибка сохранения истории показателей: {e}")
+
+        if self.screen_reader:
+            # Стадии чтения проверяют отмену между блоками; движок OCR
+            # закрываем только после того, как они закончились
+            self.screen_reader.cancel()
+            self.screen_reader.wait()
+        if self.components["ocr_translator"].ready:
+            self.ocr_translator.close()
+
+        if self.components["history"].ready:
+            # Хранилище остается открытым для следующего запуска
+            self.components["history"].get().flush(timeout=5.0)
+
+        if tracer.enabled:
+            logger.info("Задержки по стадиям:\n" + tracer.format_summary())
+            try:
+                tracer.dump()
+            except OSError as e:
+                logger.error(f"Не удалось сохранить трассу: {e}")
+
+        if self.components["tts"].ready:
+            self.tts.interrupt()
+            self.tts.speak("Jarvis отключается. До встречи.", interruptible=False)
         logger.info("Jarvis деактивирован")
 
+    def shutdown(self) -> None:
+        """Остановить Jarvis перед выходом из программы и закрыть хранилище."""
+        self.stop()
+        if self.components["history"].ready:
+            self.components["history"].get().close()
+
+    def _fixed_phrases(self) -> list:
+        """Реплики, которые не меняются между вызовами."""
+        phrases = [PHRASE_LISTENING, PHRASE_UNKNOWN, PHRASE_OCR_FAILED, PHRASE_DICTATION]
+        phrases += [f"Выполняю: {cmd.description}" for cmd in self.command_manager.get_all_commands()]
+        return phrases
+
     # ------------------------ WAVE-WORD ------------------------
 
     def _on_wake_word(self) -> None:
@@ -125,19 +313,60 @@ class VoiceAssistant:
             return
 
         self.awaiting_command = True
-        message = "Слушаю. Говори команду."
+        self.speculator.reset()
+        self._speculative_result = (0.0, False)
+        # Все стадии этой реплики (в потоках Vosk и TTS) помечаются ее номером
+        tracer.new_utterance()
+        tracer.instant("wake_detected")
         logger.info("Wake-word 'Jarvis' обнаружен")
-        logger.info(message)
-        self.tts.speak(message)
+
+        recognizer = self.components["recognizer"]
+        if recognizer.future.done() and not recognizer.ready:
+            logger.error("Распознавание речи недоступно")
+            self.awaiting_command = False
+            return
+        if not recognizer.ready:
+            # Модель еще загружается: звук копится в шине, начнем с pre-roll
+            logger.info("Распознавание речи еще загружается, команда будет обработана позже")
+            recognizer.when_ready(lambda r: r.start_listening(preroll=True))
+            return
+
+        # Barge-in: пользователь перебил — замолкаем
+        tts_ready = self.components["tts"].ready
+        if tts_ready:
+            self.tts.interrupt()
+        if self.screen_reader:
+            self.screen_reader.cancel()
+
+        if PORCUPINE_CONFIG["wake_prompt"] and tts_ready:
+            from modules.text_to_speech import PRIORITY_URGENT
+
+            # После подсказки pre-roll не нужен: в нем будет голос самого Jarvis.
+            # Поток wake-word не ждет окончания подсказки
+            logger.info(PHRASE_LISTENING)
+            prompt = self.tts.speak(
+                PHRASE_LISTENING, wait=False, priority=PRIORITY_URGENT, cache=True, trace="prompt_tts"
+            )
+            prompt.add_done_callback(lambda _: self.recognizer.start_listening(preroll=False))
+        else:
+            # Сразу слушаем, включая звук до срабатывания ("Jarvis, открой браузер")
+            self.recognizer.start_listening(preroll=True)
 
         if self.gui_window:
             self.gui_window.show_message("Jarvis: слушаю команду...")
 
-        # Запускаем короткий сеанс распознавания
-        self.recognizer.start_listening_thread()
-
     # ------------------------ ОБРАБОТКА РЕЧИ ------------------------
 
+    def _on_partial_result(self, text: str) -> None:
+        """Коллбэк Vosk с частичной гипотезой (спекулятивное выполнение)."""
+        started = time.perf_counter()
+        cmd = self.speculator.on_partial(text)
+        if cmd:
+            with tracer.span("execute_command", command=cmd.name, speculative=True):
+                success = self.command_manager.execute_command(cmd.name)
+            # В историю попадет, когда итоговая фраза подтвердит команду
+            self._speculative_result = ((time.perf_counter() - started) * 1000, success)
+
     def _on_speech_recognized(self, text: str) -> None:
         """Коллбэк Vosk с распознанным текстом."""
         text = text.strip()
@@ -155,6 +384,19 @@ class VoiceAssistant:
         self.recognizer.stop_listening()
         self.awaiting_command = False
 
+        if self.recognizer.dictation:
+            # Диктовка — это текст, а не команда
+            logger.info(f"Диктовка: {text}")
+            return
+
+        # Команда уже выполнена по частичной фразе — только подтверждаем
+        speculated = self.speculator.dispatched
+        if self.speculator.reconcile(text):
+            self.tts.speak(f"Выполняю: {speculated.description}", wait=False, cache=True, trace="response_tts")
+            latency_ms, success = self._speculative_result
+            self._record_command(text, speculated.name, latency_ms, success)
+            return
+
         # Обработка команды
         self.process_command(text)
 
@@ -162,49 +404,162 @@ class VoiceAssistant:
 
     def process_command(self, user_input: str) -> None:
         logger.info(f"Обработка команды: {user_input}")
+        started = time.perf_counter()
+        command, success = self._handle_command(user_input)
+        self._record_command(user_input, command, (time.perf_counter() - started) * 1000, success)
 
+    def _handle_command(self, user_input: str) -> Tuple[Optional[str], bool]:
+        """
+        Выполнить команду.
+
+        Returns:
+            (имя команды или None, если не распознана; успешно ли)
+        """
         # Попытка найти зарегистрированную команду
-        cmd = self.command_manager.find_similar_command(user_input)
+        with tracer.span("find_similar_command"):
+            cmd = self.command_manager.find_similar_command(user_input)
         if cmd:
-            self.tts.speak(f"Выполняю: {cmd.description}")
-            self.command_manager.execute_command(cmd.name)
-            return
+            self.tts.speak(f"Выполняю: {cmd.description}", wait=False, cache=True, trace="response_tts")
+            with tracer.span("execute_command", command=cmd.name):
+                return cmd.name, self.command_manager.execute_command(cmd.name)
 
         # Специальные команды
         lower = user_input.lower()
 
+        if "диктовка" in lower:
+            # Следующая фраза декодируется большой моделью
+            self.awaiting_command = True
+            prompt = self.tts.speak(PHRASE_DICTATION, wait=False, cache=True)
+            prompt.add_done_callback(
+                lambda _: self.recognizer.start_listening(preroll=False, dictation=True)
+            )
+            return "dictation", True
+
+        if "нагрузка за" in lower:
+            message = self._describe_load_history(lower)
+            self.tts.speak(message, wait=False)
+            logger.info(message)
+            if self.gui_window:
+                self.gui_window.show_message(message)
+            return "load_history", True
+
         if "статистика" in lower:
-            stats = self.system_monitor.get_all_stats()
+            stats = self.system_monitor.get_snapshot()
             message = self.system_monitor.format_stats(stats)
-            self.tts.speak(message)
+            self.tts.speak(message, wait=False)
             logger.info(message)
             if self.gui_window:
                 self.gui_window.show_message(message)
-            return
+            return "stats", True
 
         if "что на экране" in lower or "прочитай экран" in lower:
-            result = self.ocr_translator.extract_and_translate_from_screen()
-            if result["original"]:
-                self.tts.speak(result["translated"] or result["original"])
-                if self.gui_window:
-                    self.gui_window.show_message(result["original"])
-            else:
-                self.tts.speak("Не удалось прочитать текст с экрана.")
-            return
+            if self.governor:
+                self.ocr_translator.scale = self.governor.ocr_scale()
+                if self.ocr_translator.pool:
+                    self.ocr_translator.workers = self.governor.ocr_workers(
+                        self.ocr_translator.pool.max_workers
+                    )
+            if self.screen_reader is None:
+                from modules.screen_reader import ScreenReader
+                self.screen_reader = ScreenReader(self.ocr_translator, self.tts)
+            # Первое предложение звучит, пока остальной экран распознается и переводится
+            self.screen_reader.start(on_done=self._on_screen_read)
+            return "read_screen", True
 
         # По умолчанию
-        self.tts.speak("Команда не распознана.")
+        self.tts.speak(PHRASE_UNKNOWN, wait=False, cache=True, trace="response_tts")
         logger.warning(f"Неизвестная команда: {user_input}")
+        return None, False
+
+    def _on_screen_read(self, report) -> None:
+        """Чтение экрана закончено: показать исходный текст или сообщить о неудаче."""
+        if report.cancelled:
+            return
+        if report.first_audio_ms is not None:
+            self._record_metric("screen_first_audio_ms", report.first_audio_ms)
+        self._record_metric("screen_total_ms", report.total_ms)
+        if not report.blocks:
+            self.tts.speak(PHRASE_OCR_FAILED, wait=False, cache=True)
+        elif self.gui_window:
+            self.gui_window.show_message("\n".join(report.original))
+
+    def _describe_load_history(self, text: str) -> str:
+        """Ответ на вопрос о нагрузке за последние N минут."""
+        match = re.search(r"(\d+)", text)
+        if match:
+            minutes = int(match.group(1))
+        else:
+            minutes = next((m for word, m in WINDOW_WORDS.items() if word in text.split()), 10)
+
+        # История создается вместе с монитором
+        self.components["system_monitor"].get()
+        cpu = self.metrics_history.aggregate("cpu_percent", minutes * 60, now=time.time())
+        ram = self.metrics_history.aggregate("ram_percent", minutes * 60, now=time.time())
+        if not cpu:
+            return "История нагрузки пока пуста."
+        message = (
+            f"За {minutes} мин: процессор в среднем {cpu['avg']:.0f}%, "
+            f"максимум {cpu['max']:.0f}%"
+        )
+        if ram:
+            message += f", память в среднем {ram['avg']:.0f}%"
+        return message + "."
+
+
+def print_startup_profile(assistant: VoiceAssistant, timeout: float = 300.0) -> None:
+    """Дождаться загрузки всех модулей и вывести время импорта/инициализации."""
+    for component in assistant.components.values():
+        component.start_background()
+    for name, component in assistant.components.items():
+        try:
+            component.future.exception(timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Модуль {name} не загрузился за {timeout:.0f} с: {e}")
+
+    print(profiler.report())
+    wake_ready = profiler.offset("wake-word готов")
+    if wake_ready is not None:
+        verdict = "OK" if wake_ready <= WAKE_READY_TARGET else "медленнее цели"
+        print(f"Wake-word готов через {wake_ready * 1000:.0f} мс "
+              f"(цель {WAKE_READY_TARGET * 1000:.0f} мс): {verdict}")
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Голосовой помощник Jarvis")
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="вывести время импорта и инициализации модулей и выйти",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="трассировать задержки реплик; при выходе — сводка в лог и Chrome trace",
+    )
+    args = parser.parse_args()
+
+    ensure_directories()
+    setup_logging()
+    if args.trace:
+        tracer.enable()
     assistant = VoiceAssistant()
 
-    if GUI_AVAILABLE:
-        # Запускаем GUI (минималистичное окно Jarvis)
-        from ui.gui import run_gui
+    if args.startup_profile:
+        print_startup_profile(assistant)
+        return
+
+    # GUI (минималистичное окно Jarvis)
+    try:
+        with profiler.measure("ui.gui", kind="import"):
+            from ui.gui import run_gui
+    except ImportError:
+        run_gui = None
+
+    if run_gui:
         assistant.start_background()
         run_gui(assistant)
+        # Окно закрыто — выходим
+        assistant.shutdown()
     else:
         assistant.start_console_loop()
 
@@ -1,7 +1,7 @@
 """Модуль детектора слова-активатора на Porcupine."""
 
-import struct
 import logging
+from ctypes import byref, c_int
 from typing import Callable, Optional
 from threading import Thread
 
@@ -11,8 +11,8 @@ try:
 except ImportError:
     PORCUPINE_AVAILABLE = False
 
-import pyaudio
 from config.settings import PORCUPINE_CONFIG
+from modules.audio_bus import AudioBus, AudioConsumer
 
 logger = logging.getLogger(__name__)
 
@@ -20,12 +20,13 @@ logger = logging.getLogger(__name__)
 class WakeWordDetector:
     """Детектор слова-активатора с Porcupine."""
 
-    def __init__(self, on_wake: Callable[[], None]):
+    def __init__(self, on_wake: Callable[[], None], audio_bus: AudioBus):
         """
         Инициализация детектора.
 
         Args:
             on_wake: Коллбэк, который вызывается при срабатывании
+            audio_bus: Общая шина захвата звука
         """
         if not PORCUPINE_AVAILABLE:
             logger.error("Порцупине не установлен. Установите: pip install pvporcupine")
@@ -34,12 +35,12 @@ class WakeWordDetector:
         self.on_wake = on_wake
         self.is_listening = False
         self.porcupine = None
-        self.stream = None
-        self.pa = None
+        self.audio_bus = audio_bus
+        self.consumer: Optional[AudioConsumer] = None
         
         try:
             self._init_porcupine()
-            self._init_audio()
+            self._check_audio()
             logger.info("Детектор слова-активатора инициализирован")
         except Exception as e:
             logger.error(f"Ошибка инициализации: {e}")
@@ -60,42 +61,69 @@ class WakeWordDetector:
         
         self.frame_length = self.porcupine.frame_length
         self.sample_rate = self.porcupine.sample_rate
+        self._process = self._native_process()
         logger.info(f"Порцупин готов (слово: jarvis)")
 
-    def _init_audio(self) -> None:
-        """Настройка аудио стрима."""
-        self.pa = pyaudio.PyAudio()
-        try:
-            self.stream = self.pa.open(
-                rate=self.sample_rate,
-                channels=1,
-                format=pyaudio.paInt16,
-                input=True,
-                frames_per_buffer=self.frame_length,
-                input_device_index=None,
+    def _native_process(self) -> Callable:
+        """
+        Функция обработки кадра для горячего цикла.
+
+        Porcupine.process() копирует каждый кадр в новый массив c_short.
+        Кадры шины уже лежат в c_short, поэтому они передаются прямо в
+        pv_porcupine_process. Если у обертки pvporcupine нет нужных полей
+        (другая версия), используется обычный process().
+        """
+        porcupine = self.porcupine
+        func = getattr(porcupine, "_process_func", None)
+        handle = getattr(porcupine, "_handle", None)
+        statuses = getattr(porcupine, "PicovoiceStatuses", None)
+        if func is None or handle is None or statuses is None:
+            logger.info("Porcupine: кадры передаются через process() (с копией)")
+            return porcupine.process
+
+        success = statuses.SUCCESS
+        keyword_index = c_int(-1)
+        keyword_index_ref = byref(keyword_index)
+
+        def process(pcm) -> int:
+            if func(handle, pcm, keyword_index_ref) is not success:
+                # Ошибку с понятным сообщением поднимет сама обертка
+                return porcupine.process(pcm)
+            return keyword_index.value
+
+        return process
+
+    def _check_audio(self) -> None:
+        """Проверить, что формат шины подходит Porcupine."""
+        if self.audio_bus.sample_rate != self.sample_rate:
+            raise ValueError(
+                f"Частота шины {self.audio_bus.sample_rate} Гц, Porcupine ждет {self.sample_rate} Гц"
+            )
+        if self.audio_bus.frame_length != self.frame_length:
+            raise ValueError(
+                f"Кадр шины {self.audio_bus.frame_length}, Porcupine ждет {self.frame_length}"
             )
-            logger.info("Аудио стрим открыт")
-        except Exception as e:
-            logger.error(f"Ошибка открытия аудио стрима: {e}")
-            raise
 
     def start(self) -> None:
         """Начать ослушивание в отдельном потоке."""
         self.is_listening = True
+        self.consumer = self.audio_bus.subscribe("wake-word")
         thread = Thread(target=self._listen_loop, daemon=True)
         thread.start()
         logger.info("Начало ослушивание wake-word")
 
     def _listen_loop(self) -> None:
         """Цикл ослушивания."""
+        consumer = self.consumer
         while self.is_listening:
             try:
-                pcm = self.stream.read(
-                    self.frame_length,
-                    exception_on_overflow=False
-                )
-                pcm = struct.unpack_from("h" * self.frame_length, pcm)
-                result = self.porcupine.process(pcm)
+                # Массив c_short поверх слота шины: без распаковки и без копии
+                pcm = consumer.read_samples(timeout=0.5)
+                if pcm is None:
+                    if not self.audio_bus.is_running:
+                        break
+                    continue
+                result = self._process(pcm)
                 
                 if result >= 0:
                     logger.info(f"🎱 JARVIS обнаружен!")
@@ -103,6 +131,7 @@ class WakeWordDetector:
             except Exception as e:
                 logger.error(f"Ошибка в цикле ослушивания: {e}")
                 break
+        consumer.close()
 
     def stop(self) -> None:
         """Остановить ослушивание."""
@@ -113,11 +142,6 @@ class WakeWordDetector:
         """Очистить ресурсы."""
         self.stop()
         try:
-            if self.stream:
-                self.stream.stop_stream()
-                self.stream.close()
-            if self.pa:
-                self.pa.terminate()
             if self.porcupine:
                 self.porcupine.delete()
             logger.info("Ресурсы очищены")
@@ -0,0 +1,179 @@
+"""Перевод через Argos: готовые объекты перевода по языковым парам и пакетный перевод."""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List
+from config.settings import TRANSLATION_CONFIG
+from modules.startup import LazyComponent
+
+try:
+    import argostranslate.translate
+    ARGOS_AVAILABLE = True
+except ImportError:
+    ARGOS_AVAILABLE = False
+
+try:
+    import ctranslate2
+    CTRANSLATE2_AVAILABLE = True
+except ImportError:
+    CTRANSLATE2_AVAILABLE = False
+
+try:
+    import sentencepiece
+    SENTENCEPIECE_AVAILABLE = True
+except ImportError:
+    SENTENCEPIECE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Короткая фраза для прогрева модели
+WARMUP_TEXT = "test"
+
+
+class _SentencePieceTokenizer:
+    """Токенизатор пакета Argos (для версий без argostranslate.tokenizer)."""
+
+    def __init__(self, model_path: Path):
+        self._processor = sentencepiece.SentencePieceProcessor(model_file=str(model_path))
+
+    def encode(self, sentence: str) -> List[str]:
+        return self._processor.encode(sentence, out_type=str)
+
+    def decode(self, tokens: List[str]) -> str:
+        return self._processor.decode(tokens)
+
+
+class ArgosPair:
+    """
+    Перевод одной языковой пары.
+
+    Объект перевода Argos находится один раз. Для пакетного перевода
+    используется его модель CTranslate2 напрямую: сегменты уже разбиты на
+    предложения, поэтому разбиение Argos не нужно, а все сегменты уходят
+    в модель одним вызовом translate_batch.
+    """
+
+    def __init__(self, source: str, target: str):
+        """
+        Args:
+            source: Код исходного языка
+            target: Код целевого языка
+        """
+        if not ARGOS_AVAILABLE:
+            raise RuntimeError("argostranslate не установлен")
+        self.source = source
+        self.target = target
+        languages = {language.code: language for language in argostranslate.translate.get_installed_languages()}
+        if source not in languages or target not in languages:
+            raise RuntimeError(f"Языковая пара {source}-{target} не установлена")
+        self.translation = languages[source].get_translation(languages[target])
+        if self.translation is None:
+            raise RuntimeError(f"Нет перевода {source}-{target}")
+
+        self._batch = None
+        try:
+            self._batch = self._open_batch()
+        except Exception as e:
+            logger.info(f"Пакетный перевод {source}-{target} недоступен, переводим по одному: {e}")
+
+    def _open_batch(self) -> tuple:
+        """Модель, токенизатор и префикс пакета Argos для прямых вызовов CTranslate2."""
+        if not CTRANSLATE2_AVAILABLE:
+            raise RuntimeError("ctranslate2 не установлен")
+        # CachedTranslation оборачивает PackageTranslation
+        translation = getattr(self.translation, "underlying", self.translation)
+        package = getattr(translation, "pkg", None)
+        if package is None:
+            raise RuntimeError("перевод через промежуточный язык")
+        path = Path(package.package_path)
+
+        tokenizer = getattr(package, "tokenizer", None)
+        if tokenizer is None:
+            if not SENTENCEPIECE_AVAILABLE:
+                raise RuntimeError("sentencepiece не установлен")
+            tokenizer = _SentencePieceTokenizer(path / "sentencepiece.model")
+
+        translator = getattr(translation, "translator", None)
+        if translator is None:
+            translator = ctranslate2.Translator(
+                str(path / "model"), device="cpu", intra_threads=TRANSLATION_CONFIG["threads"]
+            )
+            # Argos подхватит ту же модель, а не загрузит вторую копию
+            translation.translator = translator
+        prefix = getattr(package, "target_prefix", "") or ""
+        return translator, tokenizer, prefix
+
+    def translate(self, text: str) -> str:
+        """Перевести произвольный текст (разбиение на предложения — Argos)."""
+        return self.translation.translate(text)
+
+    def translate_batch(self, segments: List[str]) -> List[str]:
+        """
+        Перевести предложения одним вызовом модели.
+
+        Args:
+            segments: Отдельные предложения
+
+        Returns:
+            Переводы в том же порядке
+        """
+        if not segments:
+            return []
+        if self._batch is not None:
+            try:
+                return self._translate_batch(segments)
+            except Exception as e:
+                logger.warning(f"Ошибка пакетного перевода, переводим по одному: {e}")
+        return [self.translation.translate(segment) for segment in segments]
+
+    def _translate_batch(self, segments: List[str]) -> List[str]:
+        translator, tokenizer, prefix = self._batch
+        results = translator.translate_batch(
+            [tokenizer.encode(segment) for segment in segments],
+            max_batch_size=TRANSLATION_CONFIG["batch_size"],
+            beam_size=TRANSLATION_CONFIG["beam_size"],
+            replace_unknowns=True,
+            target_prefix=[[prefix]] * len(segments) if prefix else None,
+        )
+        translated = []
+        for result in results:
+            tokens = result.hypotheses[0]
+            if prefix and tokens[:1] == [prefix]:
+                tokens = tokens[1:]
+            translated.append(tokenizer.decode(tokens).strip())
+        return translated
+
+    def warm(self) -> None:
+        """Загрузить модель заранее, чтобы первый перевод не ждал ее."""
+        self.translate_batch([WARMUP_TEXT])
+
+
+class ArgosTranslator:
+    """Объекты перевода по языковым парам: создаются один раз, можно заранее в фоне."""
+
+    def __init__(self):
+        self._pairs: Dict[str, LazyComponent] = {}
+        self._lock = threading.Lock()
+
+    def _component(self, source: str, target: str) -> LazyComponent:
+        key = f"{source}-{target}"
+        with self._lock:
+            if key not in self._pairs:
+                self._pairs[key] = LazyComponent(f"Argos {key}", lambda: self._load(source, target))
+            return self._pairs[key]
+
+    @staticmethod
+    def _load(source: str, target: str) -> ArgosPair:
+        pair = ArgosPair(source, target)
+        pair.warm()
+        logger.info(f"Перевод {source}-{target} готов")
+        return pair
+
+    def warm(self, source: str, target: str) -> None:
+        """Подготовить пару в фоновом потоке."""
+        self._component(source, target).start_background()
+
+    def pair(self, source: str, target: str) -> ArgosPair:
+        """Готовая пара (ждет фоновую загрузку или загружает сейчас)."""
+        return self._component(source, target).get()
@@ -0,0 +1,359 @@
+"""Общая шина захвата звука: один поток чтения, кольцевой буфер и подписчики."""
+
+import sys
+import time
+import wave
+import logging
+import threading
+from ctypes import Array, c_short
+from typing import BinaryIO, Dict, List, Optional, Union
+
+try:
+    import pyaudio
+    PYAUDIO_AVAILABLE = True
+except ImportError:
+    PYAUDIO_AVAILABLE = False
+
+from config.settings import AUDIO_CONFIG
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_WIDTH = 2  # 16-битный PCM
+
+
+class AudioSource:
+    """Базовый источник PCM (16 бит, моно)."""
+
+    sample_rate: int = 16000
+
+    def open(self) -> None:
+        """Открыть источник."""
+
+    def read_into(self, buffer: memoryview) -> int:
+        """
+        Заполнить буфер очередным кадром.
+
+        Args:
+            buffer: Буфер размером в один кадр
+
+        Returns:
+            Число записанных байт (0 — поток закончился)
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Закрыть источник."""
+
+
+class PyAudioSource(AudioSource):
+    """Микрофон через PyAudio."""
+
+    def __init__(self, sample_rate: int, frame_length: int, device_index: Optional[int] = None):
+        if not PYAUDIO_AVAILABLE:
+            raise ImportError("pyaudio is required")
+        self.sample_rate = sample_rate
+        self.frame_length = frame_length
+        self.device_index = device_index
+        self.pa = None
+        self.stream = None
+
+    def open(self) -> None:
+        self.pa = pyaudio.PyAudio()
+        self.stream = self.pa.open(
+            rate=self.sample_rate,
+            channels=1,
+            format=pyaudio.paInt16,
+            input=True,
+            frames_per_buffer=self.frame_length,
+            input_device_index=self.device_index,
+        )
+        logger.info("Аудио стрим открыт")
+
+    def read_into(self, buffer: memoryview) -> int:
+        data = self.stream.read(len(buffer) // SAMPLE_WIDTH, exception_on_overflow=False)
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        try:
+            if self.stream:
+                self.stream.stop_stream()
+                self.stream.close()
+            if self.pa:
+                self.pa.terminate()
+        finally:
+            self.stream = None
+            self.pa = None
+
+
+class WavFileSource(AudioSource):
+    """WAV-файл (16 бит, моно) — для запуска без звуковой карты."""
+
+    def __init__(self, path: str, realtime: bool = True, loop: bool = False):
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self._wav = None
+        self._next_deadline = 0.0
+        with wave.open(path, "rb") as wav:
+            self.sample_rate = wav.getframerate()
+
+    def open(self) -> None:
+        self._wav = wave.open(self.path, "rb")
+        if self._wav.getnchannels() != 1 or self._wav.getsampwidth() != SAMPLE_WIDTH:
+            self._wav.close()
+            raise ValueError(f"Ожидается WAV 16 бит моно: {self.path}")
+        self._next_deadline = time.perf_counter()
+        logger.info(f"Аудио источник: WAV {self.path}")
+
+    def read_into(self, buffer: memoryview) -> int:
+        frames = self._wav.readframes(len(buffer) // SAMPLE_WIDTH)
+        if not frames and self.loop:
+            self._wav.rewind()
+            frames = self._wav.readframes(len(buffer) // SAMPLE_WIDTH)
+        buffer[:len(frames)] = frames
+
+        if self.realtime and frames:
+            # Отдаем кадры с той же скоростью, что и микрофон
+            self._next_deadline += len(frames) / SAMPLE_WIDTH / self.sample_rate
+            delay = self._next_deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return len(frames)
+
+    def close(self) -> None:
+        if self._wav:
+            self._wav.close()
+            self._wav = None
+
+
+class RawPcmSource(AudioSource):
+    """Сырой PCM s16le из файла или канала ("-" — stdin)."""
+
+    def __init__(self, stream: Union[str, BinaryIO], sample_rate: int):
+        self.sample_rate = sample_rate
+        self._target = stream
+        self._stream: Optional[BinaryIO] = None
+
+    def open(self) -> None:
+        if isinstance(self._target, str):
+            self._stream = sys.stdin.buffer if self._target == "-" else open(self._target, "rb")
+        else:
+            self._stream = self._target
+        logger.info("Аудио источник: сырой PCM")
+
+    def read_into(self, buffer: memoryview) -> int:
+        # Из канала данные могут приходить частями — дочитываем кадр целиком
+        filled = 0
+        while filled < len(buffer):
+            count = self._stream.readinto(buffer[filled:])
+            if not count:
+                break
+            filled += count
+        return filled
+
+    def close(self) -> None:
+        if self._stream and self._stream is not sys.stdin.buffer and isinstance(self._target, str):
+            self._stream.close()
+        self._stream = None
+
+
+class AudioConsumer:
+    """Подписчик шины со своим курсором чтения."""
+
+    def __init__(self, bus: "AudioBus", name: str, position: int):
+        self.bus = bus
+        self.name = name
+        self.position = position  # Номер следующего кадра для чтения
+        self.dropped_frames = 0
+
+    def read(self, timeout: Optional[float] = None) -> Optional[memoryview]:
+        """
+        Получить следующий кадр без копирования.
+
+        Кадр остается валидным, пока шина не сделает полный круг
+        по кольцевому буферу.
+
+        Returns:
+            memoryview кадра или None (таймаут / шина остановлена)
+        """
+        index = self.bus._read(self, timeout)
+        return None if index is None else self.bus._slots[index]
+
+    def read_samples(self, timeout: Optional[float] = None) -> Optional[Array]:
+        """
+        То же, что read(), но кадр отдается как массив c_short поверх слота.
+
+        Массивы создаются один раз при создании шины и разделяют память с
+        кольцевым буфером: кадр можно передать в C-функцию (Porcupine) без
+        копии и без выделений на кадр.
+        """
+        index = self.bus._read(self, timeout)
+        return None if index is None else self.bus._sample_slots[index]
+
+    def skip_to_latest(self) -> None:
+        """Пропустить накопившиеся кадры."""
+        self.position = self.bus.write_position
+
+    def rewind(self, frames: int) -> int:
+        """
+        Переставить курсор на frames кадров назад от текущего момента.
+
+        Returns:
+            Сколько кадров реально доступно для повторного чтения
+        """
+        with self.bus._cond:
+            latest = self.bus.write_position
+            # Самый старый кадр, который еще не перезаписывается захватом
+            oldest = max(0, latest - self.bus.ring_frames + 1)
+            self.position = max(oldest, latest - frames)
+            return latest - self.position
+
+    def close(self) -> None:
+        """Отписаться от шины."""
+        self.bus.unsubscribe(self)
+
+
+class AudioBus:
+    """Единый поток захвата звука, раздающий кадры всем подписчикам."""
+
+    def __init__(
+        self,
+        source: AudioSource,
+        frame_length: int = AUDIO_CONFIG["frame_length"],
+        ring_seconds: float = AUDIO_CONFIG["ring_seconds"],
+    ):
+        """
+        Инициализация шины.
+
+        Args:
+            source: Источник PCM
+            frame_length: Число семплов в кадре
+            ring_seconds: Емкость кольцевого буфера в секундах
+        """
+        self.source = source
+        self.frame_length = frame_length
+        self.frame_bytes = frame_length * SAMPLE_WIDTH
+        self.ring_frames = max(4, int(ring_seconds * source.sample_rate / frame_length))
+
+        self._ring = bytearray(self.frame_bytes * self.ring_frames)
+        view = memoryview(self._ring)
+        self._slots: List[memoryview] = [
+            view[i * self.frame_bytes:(i + 1) * self.frame_bytes]
+            for i in range(self.ring_frames)
+        ]
+        # PCM little-endian, как и нативный порядок байт x86/ARM
+        frame_type = c_short * frame_length
+        self._sample_slots: List[Array] = [
+            frame_type.from_buffer(self._ring, i * self.frame_bytes)
+            for i in range(self.ring_frames)
+        ]
+
+        self.write_position = 0  # Сколько кадров записано всего
+        self.is_running = False
+        self._cond = threading.Condition()
+        self._consumers: Dict[int, AudioConsumer] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def sample_rate(self) -> int:
+        return self.source.sample_rate
+
+    def start(self) -> None:
+        """Открыть источник и запустить поток захвата."""
+        if self.is_running:
+            return
+        self.source.open()
+        self.is_running = True
+        self._thread = threading.Thread(target=self._capture_loop, name="audio-bus", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Аудио шина запущена ({self.sample_rate} Гц, кадр {self.frame_length}, "
+            f"буфер {self.ring_frames} кадров)"
+        )
+
+    def stop(self) -> None:
+        """Остановить захват и разбудить подписчиков."""
+        if not self.is_running:
+            return
+        with self._cond:
+            self.is_running = False
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        try:
+            self.source.close()
+        except Exception as e:
+            logger.error(f"Ошибка при закрытии аудио источника: {e}")
+        logger.info("Аудио шина остановлена")
+
+    def subscribe(self, name: str) -> AudioConsumer:
+        """Подписаться на кадры начиная с текущего момента."""
+        with self._cond:
+            consumer = AudioConsumer(self, name, self.write_position)
+            self._consumers[id(consumer)] = consumer
+        logger.debug(f"Подписчик аудио шины: {name}")
+        return consumer
+
+    def unsubscribe(self, consumer: AudioConsumer) -> None:
+        """Удалить подписчика."""
+        with self._cond:
+            self._consumers.pop(id(consumer), None)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Количество потерянных кадров по подписчикам."""
+        with self._cond:
+            return {c.name: c.dropped_frames for c in self._consumers.values()}
+
+    def _capture_loop(self) -> None:
+        """Цикл чтения источника в кольцевой буфер."""
+        while self.is_running:
+            slot = self._slots[self.write_position % self.ring_frames]
+            try:
+                count = self.source.read_into(slot)
+            except Exception as e:
+                logger.error(f"Ошибка чтения аудио источника: {e}")
+                break
+            if count == 0:
+                logger.info("Аудио источник исчерпан")
+                break
+            if count < self.frame_bytes:
+                slot[count:] = bytes(self.frame_bytes - count)
+
+            with self._cond:
+                self.write_position += 1
+                self._cond.notify_all()
+
+        with self._cond:
+            self.is_running = False
+            self._cond.notify_all()
+
+    def _read(self, consumer: AudioConsumer, timeout: Optional[float]) -> Optional[int]:
+        with self._cond:
+            while consumer.position >= self.write_position:
+                if not self.is_running:
+                    return None
+                if not self._cond.wait(timeout):
+                    return None
+
+            # Слот, в который сейчас пишет захват, и все более старые кадры
+            # уже недоступны — подписчик отстал, догоняем
+            lag = self.write_position - consumer.position
+            if lag >= self.ring_frames:
+                skipped = lag - self.ring_frames + 1
+                consumer.position += skipped
+                consumer.dropped_frames += skipped
+
+            index = consumer.position % self.ring_frames
+            consumer.position += 1
+            return index
+
+
+def create_audio_source(config: dict = AUDIO_CONFIG) -> AudioSource:
+    """Создать источник звука по конфигурации."""
+    kind = config.get("source", "pyaudio")
+    if kind == "wav":
+        return WavFileSource(config["source_path"], loop=config.get("loop", False))
+    if kind == "pcm":
+        return RawPcmSource(config["source_path"] or "-", config["sample_rate"])
+    return PyAudioSource(config["sample_rate"], config["frame_length"], config.get("device_index"))
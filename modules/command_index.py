@@ -0,0 +1,140 @@
+"""Индекс триггеров команд: инвертированный индекс слов + триграммы для опечаток."""
+
+import heapq
+import logging
+import threading
+from collections import Counter
+from typing import Dict, FrozenSet, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Минимальная похожесть слова по триграммам, чтобы считать его опечаткой
+FUZZY_MIN_SIMILARITY = 0.5
+# Доля оценки, зависящая от "лишних" слов во фразе пользователя
+EXTRA_WORDS_PENALTY = 0.15
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Нижний регистр, ё → е, только буквы и цифры."""
+    text = text.lower().replace("ё", "е")
+    text = "".join(c if c.isalnum() else " " for c in text)
+    return text.split()
+
+
+def token_trigrams(token: str) -> Set[str]:
+    """Символьные триграммы слова с границами."""
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CommandIndex:
+    """Инкрементальный индекс для поиска команды по фразе."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._triggers: Dict[str, FrozenSet[str]] = {}  # команда -> слова триггера
+        self._lengths: Dict[str, int] = {}  # команда -> число слов триггера
+        self._postings: Dict[str, Set[str]] = {}  # слово -> команды
+        self._trigrams: Dict[str, Set[str]] = {}  # триграмма -> слова словаря
+
+    def __len__(self) -> int:
+        return len(self._triggers)
+
+    def add(self, name: str, trigger: str) -> None:
+        """Добавить (или заменить) триггер команды."""
+        tokens = frozenset(normalize_tokens(trigger))
+        with self._lock:
+            if name in self._triggers:
+                self.remove(name)
+            self._triggers[name] = tokens
+            self._lengths[name] = max(1, len(tokens))
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = set()
+                    for gram in token_trigrams(token):
+                        self._trigrams.setdefault(gram, set()).add(token)
+                postings.add(name)
+
+    def remove(self, name: str) -> bool:
+        """Удалить команду из индекса."""
+        with self._lock:
+            tokens = self._triggers.pop(name, None)
+            if tokens is None:
+                return False
+            del self._lengths[name]
+            for token in tokens:
+                postings = self._postings[token]
+                postings.discard(name)
+                if postings:
+                    continue
+                # Слово больше не встречается — убираем из словаря
+                del self._postings[token]
+                for gram in token_trigrams(token):
+                    words = self._trigrams[gram]
+                    words.discard(token)
+                    if not words:
+                        del self._trigrams[gram]
+            return True
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        """Слова словаря, соответствующие слову запроса, с весами."""
+        if token in self._postings:
+            return [(token, 1.0)]
+
+        grams = token_trigrams(token)
+        overlap: Dict[str, int] = {}
+        for gram in grams:
+            for word in self._trigrams.get(gram, ()):
+                overlap[word] = overlap.get(word, 0) + 1
+
+        matches = []
+        for word, common in overlap.items():
+            # Коэффициент Дайса по триграммам
+            similarity = 2 * common / (len(grams) + len(word))
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                matches.append((word, similarity))
+        return matches
+
+    def search(self, text: str, top_k: int = 5) -> List[Tuple[str, float]]:
+        """
+        Найти команды для фразы.
+
+        Оценка — доля слов триггера, найденных во фразе (с учетом опечаток),
+        с небольшим штрафом за лишние слова.
+
+        Returns:
+            До top_k пар (имя команды, оценка 0-1) по убыванию оценки
+        """
+        query = set(normalize_tokens(text))
+        if not query:
+            return []
+
+        with self._lock:
+            # Слово словаря -> лучший вес среди слов запроса
+            weights: Dict[str, float] = {}
+            used_query_tokens = 0
+            for token in query:
+                expansions = self._expand(token)
+                if expansions:
+                    used_query_tokens += 1
+                for word, weight in expansions:
+                    if weight > weights.get(word, 0.0):
+                        weights[word] = weight
+
+            # Каждая команда со словом запроса — кандидат: оценка делится на
+            # длину триггера, поэтому команда из частых слов ("открой браузер")
+            # может обойти найденные по редким
+            scores: Counter = Counter()
+            for word, weight in weights.items():
+                if weight == 1.0:
+                    scores.update(self._postings[word])  # Точные слова — подсчет в C
+                else:
+                    for name in self._postings[word]:
+                        scores[name] += weight
+
+            factor = 1 - EXTRA_WORDS_PENALTY + EXTRA_WORDS_PENALTY * used_query_tokens / len(query)
+            lengths = self._lengths
+            best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1] / lengths[item[0]])
+
+        return [(name, total / lengths[name] * factor) for name, total in best]
@@ -2,11 +2,16 @@
 
 import subprocess
 import logging
-from typing import Callable, Dict, Optional, List
+from typing import Callable, Dict, Optional, List, Tuple
 from dataclasses import dataclass
+from config.settings import NLP_CONFIG, SPECULATIVE_CONFIG
+from modules.command_index import CommandIndex
 
 logger = logging.getLogger(__name__)
 
+# Наименьшая оценка CommandIndex, при которой команда считается найденной
+MIN_COMMAND_SCORE = 0.5
+
 
 @dataclass
 class Command:
@@ -16,6 +21,8 @@ class Command:
     action: Callable  # Выполняемое действие
     description: str = ""
     confidence_threshold: float = 0.7
+    prewarm: Optional[Callable] = None  # Подготовка действия заранее (по частичной фразе)
+    speculative: bool = True  # Можно ли выполнять по частичной фразе
 
 
 class CommandManager:
@@ -24,6 +31,11 @@ class CommandManager:
     def __init__(self):
         """Инициализация."""
         self.commands: Dict[str, Command] = {}
+        self.index = CommandIndex()
+        # Запасной посимвольный поиск (имена команд, индекс n-грамм триггеров);
+        # строится при первом промахе индекса — NumPy не нужен для wake-word
+        self._nlp = None
+        self._similarity = None
         self._register_builtin_commands()
         logger.info("Менеджер команд инициализирован")
 
@@ -59,8 +71,24 @@ class CommandManager:
             command: Объект Команды
         """
         self.commands[command.name] = command
+        self.index.add(command.name, command.trigger)
+        self._similarity = None
         logger.info(f"Команда '{command.name}' регистрирована")
 
+    def unregister_command(self, command_name: str) -> bool:
+        """
+        Удалить команду.
+
+        Returns:
+            True если команда была зарегистрирована
+        """
+        if self.commands.pop(command_name, None) is None:
+            return False
+        self.index.remove(command_name)
+        self._similarity = None
+        logger.info(f"Команда '{command_name}' удалена")
+        return True
+
     def execute_command(self, command_name: str, *args, **kwargs) -> bool:
         """
         Эксекютировать команду.
@@ -104,23 +132,140 @@ class CommandManager:
         """Заблокировать экран."""
         subprocess.Popen("rundll32.exe user32.dll,LockWorkStation")
 
+    def rank_commands(self, user_input: str, top_k: int = 3) -> List[Tuple[Command, float]]:
+        """
+        Оценить все команды для фразы.
+
+        Returns:
+            До top_k пар (команда, оценка 0-1) по убыванию оценки
+        """
+        return [
+            (self.commands[name], score)
+            for name, score in self.index.search(user_input, top_k)
+            if name in self.commands
+        ]
+
     def find_similar_command(self, user_input: str) -> Optional[Command]:
         """
-        Поиск похожей команды как встроцзаю или
-        расстояние (симплый каср для искрама).
+        Поиск команды: по словам триггеров (CommandIndex), а если слова не
+        совпали (слитно, оборвано распознаванием) — сравнением фразы со
+        всеми триггерами сразу по n-граммам (NLPProcessor.similarity_batch).
         """
-        best_match = None
-        best_score = 0
-        
-        for command in self.commands.values():
-            # Постойсянные встроится
-            if user_input.lower() in command.trigger.lower():
-                score = len(user_input) / len(command.trigger)
-                if score > best_score:
-                    best_score = score
-                    best_match = command
-        
-        if best_score >= 0.5:
-            return best_match
-        
+        ranked = self.rank_commands(user_input, top_k=1)
+        if ranked and ranked[0][1] >= MIN_COMMAND_SCORE:
+            return ranked[0][0]
+        return self._find_fuzzy(user_input)
+
+    def _find_fuzzy(self, user_input: str) -> Optional[Command]:
+        """Лучший триггер по n-граммам с уточнением Левенштейном (одна шкала 0-1)."""
+        if not self.commands:
+            return None
+        similarity = self._similarity
+        if similarity is None:
+            if self._nlp is None:
+                from modules.nlp_processor import NLPProcessor
+                self._nlp = NLPProcessor()
+            names = list(self.commands)
+            similarity = (names, self._nlp.build_similarity_index(self.commands[name].trigger for name in names))
+            self._similarity = similarity
+
+        names, index = similarity
+        ranked = self._nlp.similarity_batch(user_input, index, top_k=1, rerank=NLP_CONFIG["fuzzy_rerank"])
+        if ranked and ranked[0][1] >= NLP_CONFIG["fuzzy_command_score"]:
+            command = self.commands.get(names[ranked[0][0]])
+            if command:
+                logger.debug(f"Команда '{command.name}' найдена по n-граммам ({ranked[0][1]:.2f})")
+            return command
         return None
+
+
+class SpeculativeDispatcher:
+    """Выполнение команды по устойчивой частичной гипотезе STT."""
+
+    def __init__(self, command_manager: CommandManager):
+        """
+        Инициализация.
+
+        Args:
+            command_manager: Менеджер команд
+        """
+        self.command_manager = command_manager
+        self.enabled = SPECULATIVE_CONFIG["enabled"]
+        self.mode = SPECULATIVE_CONFIG["mode"]
+        self.stats = {"dispatched": 0, "prewarmed": 0, "confirmed": 0, "mismatched": 0}
+        self.reset()
+
+    def reset(self) -> None:
+        """Начать новую фразу."""
+        self.dispatched: Optional[Command] = None
+        self._last_partial = ""
+        self._repeats = 0
+
+    def on_partial(self, text: str) -> Optional[Command]:
+        """
+        Учесть частичную гипотезу.
+
+        Returns:
+            Команду, которую нужно выполнить сейчас (режим dispatch), иначе None
+        """
+        if not self.enabled or self.dispatched or not text:
+            return None
+
+        # Гипотеза должна повториться несколько раз подряд
+        if text == self._last_partial:
+            self._repeats += 1
+        else:
+            self._last_partial = text
+            self._repeats = 1
+        if self._repeats < SPECULATIVE_CONFIG["stable_partials"]:
+            return None
+
+        ranked = self.command_manager.rank_commands(text, top_k=2)
+        if not ranked:
+            return None
+        command, score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if (
+            not command.speculative
+            or score < SPECULATIVE_CONFIG["min_score"]
+            or score - runner_up < SPECULATIVE_CONFIG["min_margin"]
+        ):
+            return None
+
+        self.dispatched = command
+        if self.mode == "prewarm":
+            if command.prewarm:
+                try:
+                    command.prewarm()
+                except Exception as e:
+                    logger.error(f"Ошибка подготовки команды '{command.name}': {e}")
+            self.stats["prewarmed"] += 1
+            logger.info(f"Команда '{command.name}' подготовлена по частичной фразе: {text}")
+            return None
+
+        self.stats["dispatched"] += 1
+        logger.info(f"Команда '{command.name}' выполняется по частичной фразе: {text}")
+        return command
+
+    def reconcile(self, final_text: str) -> bool:
+        """
+        Сверить итоговый текст с уже выполненной командой.
+
+        Returns:
+            True если команда уже выполнена и совпадает с итоговой фразой
+        """
+        command = self.dispatched
+        self.reset()
+        if command is None or self.mode != "dispatch":
+            return False
+
+        final = self.command_manager.find_similar_command(final_text)
+        if final and final.name == command.name:
+            self.stats["confirmed"] += 1
+            return True
+
+        self.stats["mismatched"] += 1
+        logger.warning(
+            f"Спекулятивно выполнена '{command.name}', но итоговая фраза другая: {final_text}"
+        )
+        return False
@@ -0,0 +1,20 @@
+"""Общее подключение к базе данных ассистента (SQLite)."""
+
+import sqlite3
+from pathlib import Path
+from config.settings import DATABASE_CONFIG
+
+
+def connect(path: str = DATABASE_CONFIG["path"]) -> sqlite3.Connection:
+    """
+    Открыть базу с общими настройками.
+
+    WAL: читатели не ждут писателя; synchronous=NORMAL — без fsync на каждую
+    транзакцию (в WAL это безопасно для целостности). Соединение можно
+    передавать между потоками, но использовать — под своей блокировкой.
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path, timeout=DATABASE_CONFIG["timeout"], check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
@@ -0,0 +1,134 @@
+"""Автомат Ахо-Корасик для поиска множества ключевых слов за один проход."""
+
+import logging
+import threading
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordAutomaton:
+    """
+    Автомат Ахо-Корасик.
+
+    Слова добавляются сразу вместе со ссылками: суффиксные ссылки
+    считаются только для новых узлов и для тех узлов, которым новое слово
+    дает более длинный суффикс, а выходы пересчитываются только в их
+    поддеревьях (по дереву суффиксных ссылок).
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]  # переходы бора
+        self._fail: List[int] = [0]  # суффиксные ссылки
+        self._fail_children: List[Set[int]] = [set()]  # обратные суффиксные ссылки
+        self._depth: List[int] = [0]
+        self._own: List[List[Tuple[str, Any]]] = [[]]  # слова, оканчивающиеся в узле
+        self._out: List[List[Tuple[str, Any]]] = [[]]  # с учетом суффиксных ссылок
+        self._lock = threading.Lock()
+        self.keyword_count = 0
+
+    def add(self, keyword: str, payload: Any = None) -> None:
+        """
+        Добавить ключевое слово.
+
+        Args:
+            keyword: Слово (ищется как подстрока)
+            payload: Данные, возвращаемые при совпадении (например, намерение)
+        """
+        if not keyword:
+            return
+        with self._lock:
+            node = 0
+            created = []  # (родитель, символ, узел) в порядке глубины
+            for char in keyword:
+                nxt = self._goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._fail_children.append(set())
+                    self._depth.append(self._depth[node] + 1)
+                    self._own.append([])
+                    self._out.append([])
+                    created.append((node, char, nxt))
+                node = nxt
+            if (keyword, payload) in self._own[node]:
+                return
+            self._own[node].append((keyword, payload))
+            self.keyword_count += 1
+            self._refresh_outputs([node] + self._link(created))
+
+    def _set_fail(self, node: int, target: int) -> None:
+        self._fail_children[self._fail[node]].discard(node)
+        self._fail[node] = target
+        self._fail_children[target].add(node)
+
+    def _link(self, created: List[Tuple[int, str, int]]) -> List[int]:
+        """
+        Суффиксные ссылки после добавления узлов created.
+
+        Returns:
+            Новые узлы и прежние узлы, чья ссылка изменилась
+        """
+        pending = {child for _, _, child in created}
+        changed = []
+        for parent, char, child in created:
+            # Ссылка нового узла — как при построении в ширину: родитель уже готов
+            target = 0
+            if parent:
+                fail = self._fail[parent]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+            self._set_fail(child, target)
+            pending.discard(child)
+            changed.append(child)
+
+            # Узлы, чья строка оканчивается строкой child: переходы по char из
+            # узлов, оканчивающихся строкой parent (поддерево parent по ссылкам)
+            stack = list(self._fail_children[parent])
+            while stack:
+                node = stack.pop()
+                stack.extend(self._fail_children[node])
+                other = self._goto[node].get(char)
+                if (
+                    other is not None
+                    and other != child
+                    and other not in pending
+                    and self._depth[self._fail[other]] < self._depth[child]
+                ):
+                    self._set_fail(other, child)
+                    changed.append(other)
+        return changed
+
+    def _refresh_outputs(self, roots: List[int]) -> None:
+        """Пересчитать выходы в поддеревьях roots (по дереву суффиксных ссылок)."""
+        affected = set()
+        stack = list(roots)
+        while stack:
+            node = stack.pop()
+            if node not in affected:
+                affected.add(node)
+                stack.extend(self._fail_children[node])
+        # Ссылка всегда ведет в менее глубокий узел — он пересчитан раньше
+        for node in sorted(affected, key=self._depth.__getitem__):
+            self._out[node] = self._own[node] + self._out[self._fail[node]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str, Any]]:
+        """
+        Все вхождения ключевых слов за один проход по тексту.
+
+        Yields:
+            (позиция начала, слово, payload)
+        """
+        with self._lock:
+            goto, fail, out = self._goto, self._fail, self._out
+
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for keyword, payload in out[node]:
+                yield index - len(keyword) + 1, keyword, payload
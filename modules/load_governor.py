@@ -0,0 +1,185 @@
+"""Регулятор нагрузки: ассистент уступает ресурсы, когда машина загружена."""
+
+import sys
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+import psutil
+
+from config.settings import GOVERNOR_CONFIG, SYSTEM_MONITOR_CONFIG
+from modules.system_monitor import SystemStats
+
+logger = logging.getLogger(__name__)
+
+# Уровни деградации
+LEVEL_NORMAL = 0  # Все возможности
+LEVEL_REDUCED = 1  # Без большой модели ASR, OCR в меньшем разрешении, фоновая работа отложена
+LEVEL_MINIMAL = 2  # То же, но OCR еще грубее
+
+LEVEL_NAMES = {LEVEL_NORMAL: "normal", LEVEL_REDUCED: "reduced", LEVEL_MINIMAL: "minimal"}
+
+
+class LoadGovernor:
+    """
+    Выбирает уровень деградации по загрузке CPU и температуре.
+
+    Пороги с гистерезисом: уровень включается при превышении порога входа
+    и держится, пока показатель не опустится ниже порога выхода; вниз
+    уровень меняется не раньше, чем через min_dwell секунд.
+    Подписывается на SystemMonitor через update().
+    """
+
+    def __init__(self):
+        self.level = LEVEL_NORMAL
+        self._since = time.monotonic()
+        self._cpu: Optional[float] = None  # Сглаженная загрузка CPU
+        self._listeners: List[Callable[[int, int], None]] = []
+        self._deferred: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._process = psutil.Process()
+        self._process.cpu_percent(interval=None)
+        self._priority_lowered = False
+
+        max_temp = SYSTEM_MONITOR_CONFIG["max_temp_warning"]
+        # (вход, выход) для уровней REDUCED и MINIMAL
+        self.cpu_thresholds = GOVERNOR_CONFIG["cpu_thresholds"]
+        self.temp_thresholds = tuple(
+            (max_temp + enter, max_temp + leave) for enter, leave in GOVERNOR_CONFIG["temp_offsets"]
+        )
+
+        self.transitions: Dict[str, int] = {}
+        self.time_in_level = {level: 0.0 for level in LEVEL_NAMES}
+
+    # ------------------------ УРОВЕНЬ ------------------------
+
+    def update(self, stats: SystemStats) -> None:
+        """Учесть новый замер (подписчик SystemMonitor)."""
+        alpha = GOVERNOR_CONFIG["smoothing"]
+        cpu = stats.cpu_percent
+        self._cpu = cpu if self._cpu is None else self._cpu + alpha * (cpu - self._cpu)
+        temps = [t for t in (stats.cpu_temp, stats.gpu_temp) if t is not None]
+        temp = max(temps) if temps else None
+
+        target = self._target_level(self._cpu, temp)
+        now = time.monotonic()
+        if target < self.level and now - self._since < GOVERNOR_CONFIG["min_dwell"]:
+            return
+        if target != self.level:
+            self._transition(target, now, self._cpu, temp)
+
+    def _target_level(self, cpu: float, temp: Optional[float]) -> int:
+        target = LEVEL_NORMAL
+        for level, ((cpu_enter, cpu_leave), (temp_enter, temp_leave)) in enumerate(
+            zip(self.cpu_thresholds, self.temp_thresholds), start=1
+        ):
+            # На этом уровне (или выше) держимся до порога выхода
+            holding = self.level >= level
+            cpu_limit = cpu_leave if holding else cpu_enter
+            temp_limit = temp_leave if holding else temp_enter
+            if cpu >= cpu_limit or (temp is not None and temp >= temp_limit):
+                target = level
+        return target
+
+    def _transition(self, level: int, now: float, cpu: float, temp: Optional[float]) -> None:
+        previous = self.level
+        self.time_in_level[previous] += now - self._since
+        self.level = level
+        self._since = now
+
+        key = f"{LEVEL_NAMES[previous]}->{LEVEL_NAMES[level]}"
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        temp_text = f", {temp:.0f}°C" if temp is not None else ""
+        own = self._process.cpu_percent(interval=None) / (psutil.cpu_count() or 1)
+        logger.warning(
+            f"Режим нагрузки: {LEVEL_NAMES[previous]} → {LEVEL_NAMES[level]} "
+            f"(CPU {cpu:.0f}%{temp_text}, сам ассистент {own:.0f}%)"
+        )
+
+        if GOVERNOR_CONFIG["lower_priority"]:
+            self._set_low_priority(level > LEVEL_NORMAL)
+
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(level, previous)
+            except Exception as e:
+                logger.error(f"Ошибка обработчика режима нагрузки: {e}")
+
+        if level == LEVEL_NORMAL:
+            self._run_deferred()
+
+    def _set_low_priority(self, low: bool) -> None:
+        """Понизить/вернуть приоритет процесса."""
+        if low == self._priority_lowered:
+            return
+        try:
+            if sys.platform == "win32":
+                self._process.nice(
+                    psutil.BELOW_NORMAL_PRIORITY_CLASS if low else psutil.NORMAL_PRIORITY_CLASS
+                )
+            else:
+                # Без прав root nice можно только повышать, поэтому обратно не возвращаем
+                if not low:
+                    return
+                self._process.nice(self._process.nice() + GOVERNOR_CONFIG["nice_increment"])
+            self._priority_lowered = low
+            logger.info("Приоритет процесса понижен" if low else "Приоритет процесса восстановлен")
+        except (psutil.Error, OSError) as e:
+            logger.debug(f"Не удалось изменить приоритет: {e}")
+
+    # ------------------------ ДЛЯ МОДУЛЕЙ ------------------------
+
+    def on_level_change(self, callback: Callable[[int, int], None]) -> None:
+        """Вызывать callback(новый уровень, прежний) при каждом переходе."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def allows_large_asr(self) -> bool:
+        """Можно ли загружать большую модель Vosk."""
+        return self.level == LEVEL_NORMAL
+
+    def ocr_scale(self) -> float:
+        """Масштаб скриншота для OCR на текущем уровне."""
+        return GOVERNOR_CONFIG["ocr_scale"][self.level]
+
+    def ocr_workers(self, max_workers: int) -> int:
+        """Сколько процессов пула OCR занимать на текущем уровне."""
+        return max(1, int(max_workers * GOVERNOR_CONFIG["ocr_worker_share"][self.level]))
+
+    def defer(self, task: Callable[[], None]) -> None:
+        """
+        Выполнить несрочную задачу сейчас или при возврате в normal.
+
+        Отложенные задачи выполняются в потоке монитора, поэтому должны
+        быть быстрыми (или сами уходить в фон).
+        """
+        with self._lock:
+            if self.level != LEVEL_NORMAL:
+                self._deferred.append(task)
+                logger.info(f"Фоновая задача отложена (отложено: {len(self._deferred)})")
+                return
+        task()
+
+    def _run_deferred(self) -> None:
+        with self._lock:
+            tasks, self._deferred = self._deferred, []
+        for task in tasks:
+            try:
+                task()
+            except Exception as e:
+                logger.error(f"Ошибка отложенной задачи: {e}")
+
+    def get_stats(self) -> dict:
+        """Текущий уровень, переходы и время в каждом уровне."""
+        time_in_level = dict(self.time_in_level)
+        time_in_level[self.level] += time.monotonic() - self._since
+        return {
+            "level": LEVEL_NAMES[self.level],
+            "cpu_smoothed": self._cpu,
+            "transitions": dict(self.transitions),
+            "seconds_in_level": {LEVEL_NAMES[k]: v for k, v in time_in_level.items()},
+            "deferred": len(self._deferred),
+        }
@@ -0,0 +1,253 @@
+"""История системных показателей: кольцевые буферы NumPy с агрегацией по минутам."""
+
+import os
+import math
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from config.settings import SYSTEM_MONITOR_CONFIG
+from modules.system_monitor import SystemStats
+
+logger = logging.getLogger(__name__)
+
+# Показатели, которые хранятся в истории (поля SystemStats)
+METRICS = ("cpu_percent", "ram_percent", "cpu_temp", "gpu_percent", "gpu_temp", "gpu_memory")
+_METRIC_INDEX = {name: i for i, name in enumerate(METRICS)}
+
+
+class MetricsHistory:
+    """
+    История показателей в двух разрешениях.
+
+    - raw: каждый замер за последние raw_seconds;
+    - minutes: min/max/avg за каждую минуту за последние minutes минут.
+
+    Память фиксирована при создании; добавление — O(1). Отсутствующие
+    значения (нет GPU, нет датчиков) хранятся как NaN.
+    """
+
+    def __init__(
+        self,
+        raw_seconds: Optional[float] = None,
+        minutes: Optional[int] = None,
+        sample_interval: Optional[float] = None,
+    ):
+        """
+        Args:
+            raw_seconds: Глубина сырых данных (сек)
+            minutes: Глубина поминутных агрегатов
+            sample_interval: Ожидаемый период замеров (сек)
+        """
+        raw_seconds = raw_seconds or SYSTEM_MONITOR_CONFIG["history_raw_seconds"]
+        minutes = minutes or SYSTEM_MONITOR_CONFIG["history_minutes"]
+        sample_interval = sample_interval or SYSTEM_MONITOR_CONFIG["update_interval"]
+        self.raw_capacity = max(1, int(math.ceil(raw_seconds / sample_interval)))
+        self.minute_capacity = int(minutes)
+        metrics = len(METRICS)
+
+        self._raw_time = np.zeros(self.raw_capacity, dtype=np.float64)
+        self._raw = np.full((self.raw_capacity, metrics), np.nan, dtype=np.float32)
+        self._raw_count = 0  # Всего добавлено (позиция = count % capacity)
+
+        # Поминутно: начало минуты и [min, max, avg] по каждому показателю
+        self._minute_time = np.zeros(self.minute_capacity, dtype=np.float64)
+        self._minutes = np.full((self.minute_capacity, metrics, 3), np.nan, dtype=np.float32)
+        self._minute_count = 0
+
+        # Накопители текущей минуты
+        self._current_minute: Optional[float] = None
+        self._acc_min = np.full(metrics, np.inf)
+        self._acc_max = np.full(metrics, -np.inf)
+        self._acc_sum = np.zeros(metrics)
+        self._acc_n = np.zeros(metrics, dtype=np.int64)
+
+        self._lock = threading.Lock()
+
+    def memory_bytes(self) -> int:
+        """Память под буферы (байт)."""
+        return sum(
+            a.nbytes for a in (self._raw_time, self._raw, self._minute_time, self._minutes)
+        )
+
+    # ------------------------ ЗАПИСЬ ------------------------
+
+    def append(self, stats: SystemStats) -> None:
+        """Добавить замер (подходит как подписчик SystemMonitor)."""
+        values = np.array(
+            [np.nan if getattr(stats, name) is None else getattr(stats, name) for name in METRICS],
+            dtype=np.float64,
+        )
+        self.append_values(stats.timestamp, values)
+
+    def append_values(self, timestamp: float, values: np.ndarray) -> None:
+        """Добавить замер в виде массива значений в порядке METRICS."""
+        minute = timestamp - timestamp % 60
+        with self._lock:
+            position = self._raw_count % self.raw_capacity
+            self._raw_time[position] = timestamp
+            self._raw[position] = values
+            self._raw_count += 1
+
+            if self._current_minute is not None and minute != self._current_minute:
+                self._close_minute()
+            self._current_minute = minute
+
+            present = ~np.isnan(values)
+            self._acc_min[present] = np.minimum(self._acc_min[present], values[present])
+            self._acc_max[present] = np.maximum(self._acc_max[present], values[present])
+            self._acc_sum[present] += values[present]
+            self._acc_n[present] += 1
+
+    def _close_minute(self) -> None:
+        """Перенести накопители минуты в поминутный буфер."""
+        position = self._minute_count % self.minute_capacity
+        present = self._acc_n > 0
+        row = np.full((len(METRICS), 3), np.nan, dtype=np.float32)
+        row[present, 0] = self._acc_min[present]
+        row[present, 1] = self._acc_max[present]
+        row[present, 2] = self._acc_sum[present] / self._acc_n[present]
+        self._minute_time[position] = self._current_minute
+        self._minutes[position] = row
+        self._minute_count += 1
+
+        self._acc_min.fill(np.inf)
+        self._acc_max.fill(-np.inf)
+        self._acc_sum.fill(0)
+        self._acc_n.fill(0)
+
+    # ------------------------ ЗАПРОСЫ ------------------------
+
+    def _raw_window(self, since: float) -> np.ndarray:
+        """Индексы сырых замеров не старше since."""
+        filled = min(self._raw_count, self.raw_capacity)
+        return np.flatnonzero(self._raw_time[:filled] >= since)
+
+    def series(self, metric: str, seconds: float, now: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Сырые значения показателя за окно (по времени).
+
+        Returns:
+            (моменты замеров, значения)
+        """
+        column = _METRIC_INDEX[metric]
+        with self._lock:
+            now = now if now is not None else self._latest_time()
+            rows = self._raw_window(now - seconds)
+            order = np.argsort(self._raw_time[rows])
+            rows = rows[order]
+            return self._raw_time[rows].copy(), self._raw[rows, column].astype(np.float64)
+
+    def aggregate(self, metric: str, seconds: float, now: Optional[float] = None) -> Optional[Dict[str, float]]:
+        """
+        min/max/avg показателя за последние seconds секунд.
+
+        Окна в пределах сырых данных считаются по каждому замеру, более
+        длинные — по поминутным агрегатам (плюс незакрытая текущая минута).
+
+        Returns:
+            dict с min, max, avg и count или None, если данных нет
+        """
+        column = _METRIC_INDEX[metric]
+        with self._lock:
+            now = now if now is not None else self._latest_time()
+            since = now - seconds
+            filled = min(self._raw_count, self.raw_capacity)
+            oldest_raw = self._raw_time[:filled].min() if filled else now
+            if filled and (since >= oldest_raw or self._raw_count <= self.raw_capacity):
+                values = self._raw[self._raw_window(since), column]
+                values = values[~np.isnan(values)]
+                if not values.size:
+                    return None
+                return {
+                    "min": float(values.min()),
+                    "max": float(values.max()),
+                    "avg": float(values.mean()),
+                    "count": int(values.size),
+                }
+            return self._aggregate_minutes(column, since)
+
+    def _aggregate_minutes(self, column: int, since: float) -> Optional[Dict[str, float]]:
+        filled = min(self._minute_count, self.minute_capacity)
+        rows = np.flatnonzero(self._minute_time[:filled] >= since - since % 60)
+        data = self._minutes[rows, column]
+        data = data[~np.isnan(data[:, 2])]
+        mins, maxs, avgs = list(data[:, 0]), list(data[:, 1]), list(data[:, 2])
+        if self._acc_n[column]:
+            mins.append(self._acc_min[column])
+            maxs.append(self._acc_max[column])
+            avgs.append(self._acc_sum[column] / self._acc_n[column])
+        if not avgs:
+            return None
+        return {
+            "min": float(min(mins)),
+            "max": float(max(maxs)),
+            "avg": float(np.mean(avgs)),  # Среднее поминутных средних
+            "count": len(avgs),
+        }
+
+    def _latest_time(self) -> float:
+        if not self._raw_count:
+            return 0.0
+        return float(self._raw_time[(self._raw_count - 1) % self.raw_capacity])
+
+    # ------------------------ СОХРАНЕНИЕ ------------------------
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Сохранить историю на диск (атомарно)."""
+        path = Path(path or SYSTEM_MONITOR_CONFIG["history_path"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with self._lock:
+            # Незакрытая минута сохраняется накопителями
+            with open(tmp, "wb") as f:
+                np.savez(
+                    f,
+                    metrics=np.array(METRICS),
+                    raw_time=self._raw_time,
+                    raw=self._raw,
+                    raw_count=self._raw_count,
+                    minute_time=self._minute_time,
+                    minutes=self._minutes,
+                    minute_count=self._minute_count,
+                    current_minute=np.nan if self._current_minute is None else self._current_minute,
+                    acc=np.stack([self._acc_min, self._acc_max, self._acc_sum, self._acc_n]),
+                )
+        os.replace(tmp, path)
+
+    def restore(self, path: Optional[str] = None) -> bool:
+        """
+        Загрузить историю с диска.
+
+        Returns:
+            True, если история загружена (размеры буферов должны совпадать)
+        """
+        path = Path(path or SYSTEM_MONITOR_CONFIG["history_path"])
+        if not path.exists():
+            return False
+        try:
+            with np.load(path) as data:
+                if tuple(data["metrics"]) != METRICS or data["raw"].shape != self._raw.shape \
+                        or data["minutes"].shape != self._minutes.shape:
+                    logger.warning("История показателей другого формата — не загружена")
+                    return False
+                with self._lock:
+                    self._raw_time[:] = data["raw_time"]
+                    self._raw[:] = data["raw"]
+                    self._raw_count = int(data["raw_count"])
+                    self._minute_time[:] = data["minute_time"]
+                    self._minutes[:] = data["minutes"]
+                    self._minute_count = int(data["minute_count"])
+                    current = float(data["current_minute"])
+                    self._current_minute = None if math.isnan(current) else current
+                    acc = data["acc"]
+                    self._acc_min[:], self._acc_max[:], self._acc_sum[:] = acc[0], acc[1], acc[2]
+                    self._acc_n[:] = acc[3].astype(np.int64)
+        except Exception as e:
+            logger.error(f"Ошибка загрузки истории показателей: {e}")
+            return False
+        logger.info(f"История показателей загружена: {path}")
+        return True
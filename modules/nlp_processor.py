@@ -1,8 +1,13 @@
 """Модуль обработки естественного языка и распознавания намерения."""
 
+import json
 import logging
-from typing import Optional, Dict, List, Tuple
+from pathlib import Path
+from typing import Iterable, Optional, Dict, List, Tuple, Union
 from difflib import SequenceMatcher
+from config.settings import NLP_CONFIG
+from modules.keyword_automaton import KeywordAutomaton
+from modules.similarity_index import NgramSimilarityIndex
 
 logger = logging.getLogger(__name__)
 
@@ -19,26 +24,74 @@ class NLPProcessor:
             "search": ["поиск", "google", "яндекс"],
             "control": ["статистика", "контроль", "установка"],
         }
+        self._load_intents(NLP_CONFIG["intents_path"])
+
+        # Все ключевые слова компилируются в один автомат
+        self.automaton = KeywordAutomaton()
+        for intent, keywords in self.intent_keywords.items():
+            for keyword in keywords:
+                self.automaton.add(keyword.lower(), intent)
         logger.info("НЛП процессор инициализирован")
 
+    def _load_intents(self, path: str) -> None:
+        """Дополнить таблицу намерений из JSON {намерение: [слова]}, если файл есть."""
+        intents_file = Path(path)
+        if not intents_file.exists():
+            return
+        try:
+            loaded = json.loads(intents_file.read_text(encoding="utf-8"))
+            for intent, keywords in loaded.items():
+                self.intent_keywords.setdefault(intent, []).extend(keywords)
+            logger.info(f"Загружено намерений из {intents_file}: {len(loaded)}")
+        except Exception as e:
+            logger.error(f"Ошибка загрузки намерений: {e}")
+
+    def add_keywords(self, intent: str, keywords: Iterable[str]) -> None:
+        """
+        Добавить ключевые слова намерения во время работы.
+
+        Args:
+            intent: Намерение
+            keywords: Новые ключевые слова
+        """
+        known = self.intent_keywords.setdefault(intent, [])
+        for keyword in keywords:
+            if keyword not in known:
+                known.append(keyword)
+                self.automaton.add(keyword.lower(), intent)
+
     def extract_intent(self, text: str) -> Tuple[Optional[str], float]:
         """
         Истрает намерение из текста.
 
+        Все ключевые слова ищутся за один проход. Любое совпадение дает
+        не меньше 0.5; выше — если слова намерения стоят ближе к началу
+        фразы и покрывают большую ее часть.
+
         Returns:
             Кортеж (намерение, уверенность)
         """
         text_lower = text.lower()
+        if not text_lower.strip():
+            return None, 0
+
+        # намерение -> (покрытые позиции символов, позиция первого совпадения)
+        hits: Dict[str, Tuple[set, int]] = {}
+        for start, keyword, intent in self.automaton.iter_matches(text_lower):
+            covered, first = hits.get(intent, (set(), start))
+            covered.update(range(start, start + len(keyword)))
+            hits[intent] = (covered, min(first, start))
+
         best_intent = None
         best_score = 0
-
-        for intent, keywords in self.intent_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    score = 1.0
-                    if best_score < score:
-                        best_score = score
-                        best_intent = intent
+        letters = sum(1 for c in text_lower if not c.isspace())
+        for intent, (covered, first) in hits.items():
+            coverage = len(covered) / letters
+            position = 1 - first / len(text_lower)
+            score = 0.5 + 0.3 * position + 0.2 * min(1.0, 2 * coverage)
+            if score > best_score:
+                best_score = score
+                best_intent = intent
 
         return best_intent, best_score
 
@@ -52,6 +105,37 @@ class NLPProcessor:
         matcher = SequenceMatcher(None, text1.lower(), text2.lower())
         return matcher.ratio()
 
+    def build_similarity_index(self, candidates: Iterable[str]) -> NgramSimilarityIndex:
+        """
+        Предрассчитать матрицу n-грамм для набора строк (например, всех триггеров).
+
+        Индекс стоит переиспользовать между вызовами similarity_batch.
+        """
+        return NgramSimilarityIndex(self.preprocess_text(c) for c in candidates)
+
+    def similarity_batch(
+        self,
+        text: str,
+        candidates: Union[NgramSimilarityIndex, Iterable[str]],
+        top_k: int = 5,
+        rerank: int = 3,
+    ) -> List[Tuple[int, float]]:
+        """
+        Оценить схождение текста со всем набором строк сразу.
+
+        Args:
+            text: Фраза пользователя
+            candidates: Готовый индекс или список строк
+            top_k: Сколько результатов вернуть
+            rerank: Сколько лучших уточнить расстоянием Левенштейна
+
+        Returns:
+            Пары (индекс строки, оценка 0-1) по убыванию оценки
+        """
+        if not isinstance(candidates, NgramSimilarityIndex):
+            candidates = self.build_similarity_index(candidates)
+        return candidates.rank(self.preprocess_text(text), top_k=top_k, rerank=rerank)
+
     def extract_entities(self, text: str) -> Dict[str, List[str]]:
         """
         Попытка истраеть сущности (топики, значения).
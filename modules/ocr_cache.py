@@ -0,0 +1,215 @@
+"""Кэш результатов OCR по содержимому снимка (целиком и по горизонтальным полосам)."""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import OCR_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Строка пикселей считается пустой, если перепад яркости в ней меньше этого
+BLANK_ROW_CONTRAST = 16
+
+
+def split_bands(gray: np.ndarray, max_height: int, min_gap: int = 1) -> List[Tuple[int, int]]:
+    """
+    Разрезать изображение на горизонтальные полосы по пустым строкам.
+
+    Полоса — строки с содержимым между пустыми промежутками (промежутки
+    короче min_gap не режут: точки и диакритика над буквами). Границы
+    зависят только от соседних пикселей, а не от положения на снимке:
+    вставка строки текста добавляет полосу, но не сдвигает границы ниже,
+    и их ключи в кэше остаются прежними. Высокое содержимое без пустых
+    строк режется на куски по max_height от своего начала.
+
+    Returns:
+        Список (начало, конец) по строкам
+    """
+    blank = (gray.max(axis=1).astype(np.int16) - gray.min(axis=1)) < BLANK_ROW_CONTRAST
+    content = np.flatnonzero(~blank)
+    if not content.size:
+        return []
+    breaks = np.flatnonzero(np.diff(content) > min_gap)
+    starts = np.concatenate(([content[0]], content[breaks + 1]))
+    ends = np.concatenate((content[breaks], [content[-1]])) + 1
+    bands = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        for top in range(start, end, max_height):
+            bands.append((top, min(top + max_height, end)))
+    return bands
+
+
+class OcrCache:
+    """
+    LRU-кэш текста по хэшу пикселей.
+
+    Ключ — blake2b пикселей плюс размер, регион и язык. Снимок сначала
+    проверяется целиком; при промахе распознаются только его фрагменты
+    (области с текстом или полосы), которых нет в кэше, — изменившиеся
+    с прошлого раза.
+    """
+
+    def __init__(self, max_bytes: int = OCR_CONFIG["cache_mb"] * 1024 * 1024):
+        """
+        Args:
+            max_bytes: Лимит памяти под тексты
+        """
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "block_hits": 0, "block_misses": 0, "evictions": 0}
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(pixels: np.ndarray, context: str) -> str:
+        digest = hashlib.blake2b(np.ascontiguousarray(pixels), digest_size=16).hexdigest()
+        return f"{context}|{pixels.shape[1]}x{pixels.shape[0]}|{digest}"
+
+    @staticmethod
+    def _entry_size(key: str, text: str) -> int:
+        return len(key) + len(text.encode("utf-8")) + 64  # + накладные расходы словаря
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+            return text
+
+    def put(self, key: str, text: str) -> None:
+        size = self._entry_size(key, text)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return
+            self._memory[key] = text
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_bytes:
+                old_key, old_text = self._memory.popitem(last=False)
+                self._memory_bytes -= self._entry_size(old_key, old_text)
+                self.stats["evictions"] += 1
+
+    def lookup(self, pixels: np.ndarray, context: str = "") -> Tuple[str, Optional[str]]:
+        """
+        Найти текст снимка целиком.
+
+        Returns:
+            (ключ для put(), текст или None)
+        """
+        key = self._key(pixels, context)
+        text = self.get(key)
+        self.stats["hits" if text is not None else "misses"] += 1
+        return key, text
+
+    def recognize(
+        self,
+        pixels: np.ndarray,
+        ocr: Callable[[np.ndarray], str],
+        context: str = "",
+    ) -> str:
+        """
+        Текст снимка: из кэша или распознанный по полосам.
+
+        Args:
+            pixels: Снимок (высота x ширина [x каналы], uint8)
+            ocr: Функция распознавания фрагмента
+            context: Регион, язык и другие параметры, влияющие на результат
+
+        Returns:
+            Текст полос, склеенный сверху вниз
+        """
+        key, text = self.lookup(pixels, context)
+        if text is None:
+            parts = self.recognize_many(self._bands(pixels), lambda bands: [ocr(band) for band in bands], context)
+            text = "\n".join(part for part in parts if part)
+            self.put(key, text)
+        return text
+
+    def recognize_many(
+        self,
+        images: List[np.ndarray],
+        ocr_batch: Callable[[List[np.ndarray]], List[str]],
+        context: str = "",
+    ) -> List[str]:
+        """
+        Тексты нескольких фрагментов; все фрагменты, которых нет в кэше,
+        распознаются одним вызовом ocr_batch (его можно выполнять параллельно).
+
+        Returns:
+            Тексты в порядке images
+        """
+        return list(self.iter_recognize(images, ocr_batch, context))
+
+    def iter_recognize(
+        self,
+        images: List[np.ndarray],
+        ocr_stream: Callable[[List[np.ndarray]], Iterable[str]],
+        context: str = "",
+    ) -> Iterator[str]:
+        """
+        Тексты фрагментов в их порядке — по мере готовности.
+
+        Найденные в кэше отдаются сразу; остальные (без повторов) передаются
+        в ocr_stream одним списком, и он отдает тексты в том же порядке.
+
+        Args:
+            images: Фрагменты (области с текстом или полосы)
+            ocr_stream: Распознавание списка фрагментов (список или генератор)
+            context: Регион, язык и другие параметры, влияющие на результат
+        """
+        keys = [self._key(pixels, context) for pixels in images]
+        cached: Dict[str, str] = {}
+        missing: Dict[str, np.ndarray] = {}
+        for key, pixels in zip(keys, images):
+            if key in cached or key in missing:
+                continue
+            text = self.get(key)
+            if text is None:
+                self.stats["block_misses"] += 1
+                missing[key] = pixels
+            else:
+                self.stats["block_hits"] += 1
+                cached[key] = text
+
+        recognized = iter(ocr_stream(list(missing.values()))) if missing else iter(())
+        try:
+            for key in keys:
+                if key not in cached:
+                    # Промахи идут в порядке images, так что следующий текст — этого ключа
+                    cached[key] = next(recognized).strip()
+                    self.put(key, cached[key])
+                yield cached[key]
+        finally:
+            # Чтение прервали — остановить распознавание оставшихся фрагментов
+            if hasattr(recognized, "close"):
+                recognized.close()
+
+    @staticmethod
+    def _bands(pixels: np.ndarray) -> List[np.ndarray]:
+        """Горизонтальные полосы с текстом сверху вниз (границы — по пустым строкам)."""
+        # Для поиска пустых строк хватает средней яркости по каналам
+        gray = pixels if pixels.ndim == 2 else (pixels.sum(axis=2, dtype=np.uint16) // pixels.shape[2])
+        return [
+            pixels[top:bottom]
+            for top, bottom in split_bands(gray, OCR_CONFIG["max_tile_height"], OCR_CONFIG["band_min_gap"])
+        ]
+
+    def clear(self) -> None:
+        """Очистить кэш."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def get_stats(self) -> dict:
+        """Счетчики попаданий и занятая память."""
+        stats = dict(self.stats)
+        stats["entries"] = len(self._memory)
+        stats["bytes"] = self._memory_bytes
+        return stats
@@ -0,0 +1,155 @@
+"""Параллельное распознавание блоков снимка в пуле процессов (пиксели — через shared memory)."""
+
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import OCR_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Движок OCR рабочего процесса (создается один раз в initializer)
+_engine = None
+
+
+def _init_worker(kind: str) -> None:
+    global _engine
+    from modules.ocr_translator import create_ocr_backend
+    _engine = create_ocr_backend(kind)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Подключиться к сегменту родителя (удаляет его родитель)."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # До Python 3.13: трекер общий с родителем, повторная регистрация безвредна
+        return shared_memory.SharedMemory(name=name)
+
+
+def _ocr_block(name: str, offset: int, shape: Tuple[int, ...]) -> str:
+    """Распознать блок, лежащий в общем сегменте памяти."""
+    shm = _attach(name)
+    try:
+        pixels = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=offset)
+        text = _engine.recognize(pixels)
+        del pixels
+        return text
+    finally:
+        shm.close()
+
+
+def default_workers() -> int:
+    """Размер пула: все ядра, кроме одного (его оставляем захвату звука и STT)."""
+    return OCR_CONFIG["parallel_workers"] or max(1, (os.cpu_count() or 2) - 1)
+
+
+class ParallelOcr:
+    """
+    Пул процессов с постоянными движками Tesseract.
+
+    Блоки одного снимка копируются в один сегмент shared memory; задачи
+    передают только имя сегмента, смещение и форму. Результаты
+    отдаются в порядке блоков.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, backend: str = "auto"):
+        """
+        Args:
+            max_workers: Размер пула (None — по числу ядер)
+            backend: Бэкенд OCR в рабочих процессах
+        """
+        self.max_workers = max_workers or default_workers()
+        self.backend = backend
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.backend,),
+                )
+                logger.info(f"Пул OCR: {self.max_workers} процессов")
+            return self._executor
+
+    def recognize(self, blocks: List[np.ndarray], workers: Optional[int] = None) -> List[str]:
+        """
+        Распознать блоки параллельно.
+
+        Args:
+            blocks: Изображения (uint8)
+            workers: Сколько блоков обрабатывать одновременно (по нагрузке)
+
+        Returns:
+            Тексты в порядке блоков
+        """
+        return list(self.iter_recognize(blocks, workers))
+
+    def iter_recognize(self, blocks: List[np.ndarray], workers: Optional[int] = None) -> Iterator[str]:
+        """
+        Распознать блоки параллельно, отдавая тексты в порядке блоков по мере готовности.
+
+        Все блоки отправляются в пул сразу (не больше workers одновременно):
+        первый текст доступен, как только распознан первый блок, а остальные
+        в это время распознаются на других ядрах.
+
+        Args:
+            blocks: Изображения (uint8) в порядке чтения
+            workers: Сколько блоков обрабатывать одновременно (по нагрузке)
+        """
+        if not blocks:
+            return
+        workers = max(1, min(workers or self.max_workers, self.max_workers, len(blocks)))
+        blocks = [np.ascontiguousarray(block, dtype=np.uint8) for block in blocks]
+
+        offsets = np.cumsum([0] + [block.nbytes for block in blocks])
+        shm = shared_memory.SharedMemory(create=True, size=max(1, int(offsets[-1])))
+        running: Dict[Future, int] = {}
+        try:
+            for block, offset in zip(blocks, offsets):
+                view = np.ndarray(block.shape, dtype=np.uint8, buffer=shm.buf, offset=int(offset))
+                view[...] = block
+                del view
+
+            pool = self._pool()
+            # Не больше workers задач в работе — остальные ядра остаются машине.
+            # Блоки идут в порядке чтения: первый текст нужен раньше всех
+            order = list(range(len(blocks)))
+            results: Dict[int, str] = {}
+            next_index = 0
+            while next_index < len(blocks):
+                while order and len(running) < workers:
+                    index = order.pop(0)
+                    future = pool.submit(
+                        _ocr_block, shm.name, int(offsets[index]), blocks[index].shape
+                    )
+                    running[future] = index
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+                while next_index in results:
+                    yield results.pop(next_index)
+                    next_index += 1
+        finally:
+            # Генератор могли закрыть раньше (чтение прервано) — лишнее не распознаем
+            for future in running:
+                future.cancel()
+            shm.close()
+            shm.unlink()
+
+    def close(self) -> None:
+        """Остановить рабочие процессы."""
+        with self._lock:
+            if self._executor:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,169 @@
+"""Подготовка снимка к OCR на NumPy: серый, бинаризация, поиск областей с текстом."""
+
+import logging
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+from config.settings import OCR_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TextRegion:
+    """Область с текстом: координаты в исходном снимке и готовое изображение."""
+    left: int
+    top: int
+    right: int
+    bottom: int
+    pixels: np.ndarray  # Бинаризованный фрагмент: темный текст на белом
+
+
+def to_grayscale(pixels: np.ndarray) -> np.ndarray:
+    """Яркость (BT.601) в целочисленной арифметике."""
+    if pixels.ndim == 2:
+        return pixels
+    # По одному каналу за раз: без копии всего снимка в uint16
+    gray = pixels[..., 0] * np.uint16(77)
+    gray += pixels[..., 1] * np.uint16(150)
+    gray += pixels[..., 2] * np.uint16(29)
+    gray >>= 8
+    return gray.astype(np.uint8)
+
+
+def downscale(gray: np.ndarray, factor: int) -> np.ndarray:
+    """Уменьшить в целое число раз усреднением блоков."""
+    if factor <= 1:
+        return gray
+    height, width = gray.shape[0] // factor * factor, gray.shape[1] // factor * factor
+    # Сначала складываем соседние строки, потом столбцы — срезами, без осей в reshape
+    rows = gray[:height:factor, :width].astype(np.uint16)
+    for i in range(1, factor):
+        rows += gray[i:height:factor, :width]
+    total = rows[:, ::factor].copy()
+    for i in range(1, factor):
+        total += rows[:, i::factor]
+    return (total // (factor * factor)).astype(np.uint8)
+
+
+def local_mean(gray: np.ndarray, window: int) -> np.ndarray:
+    """Среднее по окну window x window для каждого пикселя (интегральное изображение)."""
+    height, width = gray.shape
+    radius = window // 2
+    size = 2 * radius + 1
+    # Нули по краям: окно у границы просто содержит меньше пикселей
+    integral = np.zeros((height + size, width + size), dtype=np.uint32)
+    # Переполнение uint32 не страшно: итоговые разности верны по модулю 2**32
+    inner_rows = slice(radius + 1, height + radius + 1)
+    inner_cols = slice(radius + 1, width + radius + 1)
+    np.cumsum(gray, axis=0, dtype=np.uint32, out=integral[inner_rows, inner_cols])
+    # Ниже изображения сумма по столбцу больше не растет
+    integral[height + radius + 1:, inner_cols] = integral[height + radius, inner_cols]
+    np.cumsum(integral, axis=1, dtype=np.uint32, out=integral)
+
+    sums = integral[size:, size:] - integral[:-size, size:]
+    sums -= integral[size:, :-size]
+    sums += integral[:-size, :-size]
+
+    rows = np.arange(height)
+    cols = np.arange(width)
+    row_count = np.minimum(rows + radius + 1, height) - np.maximum(rows - radius, 0)
+    col_count = np.minimum(cols + radius + 1, width) - np.maximum(cols - radius, 0)
+    area = np.outer(row_count, col_count).astype(np.float32)
+    return sums.astype(np.float32) / area
+
+
+def adaptive_ink(gray: np.ndarray, window: int, offset: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Адаптивная бинаризация.
+
+    Returns:
+        (темнее локального фона, светлее локального фона)
+    """
+    mean = local_mean(gray, window)
+    return gray < mean - offset, gray > mean + offset
+
+
+def _runs(profile: np.ndarray, min_gap: int) -> List[Tuple[int, int]]:
+    """Отрезки True в профиле, разделенные промежутками длиннее min_gap."""
+    index = np.flatnonzero(profile)
+    if not index.size:
+        return []
+    breaks = np.flatnonzero(np.diff(index) > min_gap)
+    starts = np.concatenate(([index[0]], index[breaks + 1]))
+    ends = np.concatenate((index[breaks], [index[-1]])) + 1
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def xy_cut(
+    grid: np.ndarray, row_gap: int, col_gap: int, top: int = 0, left: int = 0
+) -> List[Tuple[int, int, int, int]]:
+    """
+    Рекурсивное разбиение по проекционным профилям (XY-cut).
+
+    Блоки возвращаются в порядке чтения: сверху вниз, затем слева направо.
+
+    Returns:
+        Список (top, left, bottom, right) в координатах сетки
+    """
+    rows = _runs(grid.any(axis=1), row_gap)
+    if len(rows) > 1:
+        blocks = []
+        for r0, r1 in rows:
+            blocks += xy_cut(grid[r0:r1], row_gap, col_gap, top + r0, left)
+        return blocks
+    if not rows:
+        return []
+    r0, r1 = rows[0]
+    cols = _runs(grid[r0:r1].any(axis=0), col_gap)
+    if len(cols) > 1:
+        blocks = []
+        for c0, c1 in cols:
+            blocks += xy_cut(grid[r0:r1, c0:c1], row_gap, col_gap, top + r0, left + c0)
+        return blocks
+    c0, c1 = cols[0]
+    return [(top + r0, left + c0, top + r1, left + c1)]
+
+
+def find_text_regions(pixels: np.ndarray) -> List[TextRegion]:
+    """
+    Найти на снимке области с текстом и подготовить их для OCR.
+
+    Снимок переводится в серый, на экранах высокой плотности уменьшается,
+    бинаризуется по локальному среднему; клетки с долей "чернил" выше
+    порога группируются в блоки XY-разрезом.
+
+    Returns:
+        Области в порядке чтения
+    """
+    gray = to_grayscale(pixels)
+    factor = 1
+    while gray.shape[1] // factor > OCR_CONFIG["downscale_above"]:
+        factor += 1
+    small = downscale(gray, factor)
+
+    dark, light = adaptive_ink(small, OCR_CONFIG["binarize_window"], OCR_CONFIG["binarize_offset"])
+    ink = dark | light
+
+    cell = OCR_CONFIG["region_cell"]
+    height, width = small.shape[0] // cell * cell, small.shape[1] // cell * cell
+    density = ink[:height, :width].reshape(height // cell, cell, width // cell, cell).mean(axis=(1, 3))
+    grid = density >= OCR_CONFIG["region_min_density"]
+
+    row_gap, col_gap = OCR_CONFIG["region_gap_cells"]
+    padding = OCR_CONFIG["region_padding"]
+    regions = []
+    for top, left, bottom, right in xy_cut(grid, row_gap, col_gap):
+        if (bottom - top) * (right - left) < OCR_CONFIG["region_min_cells"]:
+            continue  # Иконки, шум
+        y0, x0 = max(0, top * cell - padding), max(0, left * cell - padding)
+        y1, x1 = min(small.shape[0], bottom * cell + padding), min(small.shape[1], right * cell + padding)
+
+        # Светлый фон — текст темный, и наоборот
+        crop_gray = small[y0:y1, x0:x1]
+        crop_ink = dark[y0:y1, x0:x1] if np.median(crop_gray) >= 128 else light[y0:y1, x0:x1]
+        binary = np.where(crop_ink, 0, 255).astype(np.uint8)
+        regions.append(TextRegion(x0 * factor, y0 * factor, x1 * factor, y1 * factor, binary))
+    return regions
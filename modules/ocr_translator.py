@@ -1,36 +1,244 @@
 """Модуль OCR и перевода текста."""
 
 import logging
+import threading
+import multiprocessing
+import numpy as np
 import pytesseract
-from PIL import ImageGrab
-from typing import Optional
+from pathlib import Path
+from PIL import Image, ImageGrab
+from typing import Iterator, List, Optional
 from config.settings import OCR_CONFIG, TRANSLATION_CONFIG
+from modules.ocr_cache import OcrCache
+from modules.ocr_preprocess import find_text_regions
+from modules.ocr_parallel import ParallelOcr
+from modules.translation_cache import TranslationCache
+from modules.argos_translation import ARGOS_AVAILABLE, ArgosTranslator
+
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
 # Проверить и установить путь к Tesseract
 try:
-    pytesseract.pytesseract.pytesseract_cmd = OCR_CONFIG["tesseract_path"]
+    pytesseract.pytesseract.tesseract_cmd = OCR_CONFIG["tesseract_path"]
 except Exception as e:
     logger.warning(f"Не удалось установить путь Tesseract: {e}")
 
 
+def _tessdata_path() -> Optional[str]:
+    """Каталог traineddata: из конфига или рядом с tesseract.exe."""
+    if OCR_CONFIG["tessdata_path"]:
+        return OCR_CONFIG["tessdata_path"]
+    candidate = Path(OCR_CONFIG["tesseract_path"]).parent / "tessdata"
+    return str(candidate) if candidate.is_dir() else None
+
+
+def _open_tesserocr(lang: str, tessdata: Optional[str]) -> "tesserocr.PyTessBaseAPI":
+    if tessdata:
+        return tesserocr.PyTessBaseAPI(path=tessdata, lang=lang)
+    return tesserocr.PyTessBaseAPI(lang=lang)
+
+
+def _set_image(api: "tesserocr.PyTessBaseAPI", pixels: np.ndarray) -> None:
+    """Передать движку сырой буфер пикселей (без PNG и временных файлов)."""
+    pixels = np.ascontiguousarray(pixels)
+    height, width = pixels.shape[:2]
+    channels = 1 if pixels.ndim == 2 else pixels.shape[2]
+    api.SetImageBytes(pixels.tobytes(), width, height, channels, width * channels)
+
+
+class OcrBackend:
+    """Базовый бэкенд распознавания текста."""
+
+    name = "base"
+
+    def recognize(self, pixels: np.ndarray) -> str:
+        """
+        Распознать текст изображения.
+
+        Args:
+            pixels: Изображение (высота x ширина [x каналы], uint8)
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Освободить движок."""
+
+
+class PytesseractBackend(OcrBackend):
+    """Запуск tesseract на каждый вызов (запасной вариант)."""
+
+    name = "pytesseract"
+
+    def __init__(self, lang: str = OCR_CONFIG["language"]):
+        self.lang = lang
+
+    def recognize(self, pixels: np.ndarray) -> str:
+        return pytesseract.image_to_string(Image.fromarray(pixels), lang=self.lang)
+
+
+class TesserocrBackend(OcrBackend):
+    """Tesseract в этом же процессе: языковые данные загружаются один раз."""
+
+    name = "tesserocr"
+
+    def __init__(self, lang: str = OCR_CONFIG["language"]):
+        if not TESSEROCR_AVAILABLE:
+            raise RuntimeError("tesserocr не установлен")
+        self._api = _open_tesserocr(lang, _tessdata_path())
+        self._lock = threading.Lock()
+
+    def recognize(self, pixels: np.ndarray) -> str:
+        with self._lock:
+            _set_image(self._api, pixels)
+            return self._api.GetUTF8Text()
+
+    def close(self) -> None:
+        with self._lock:
+            self._api.End()
+
+
+def _tesseract_worker(conn, lang: str, tessdata: Optional[str]) -> None:
+    """Рабочий процесс: держит движок загруженным и отвечает на запросы."""
+    api = _open_tesserocr(lang, tessdata)
+    conn.send("ready")
+    try:
+        while True:
+            header = conn.recv()
+            if header is None:
+                break
+            buffer = conn.recv_bytes()
+            pixels = np.frombuffer(buffer, dtype=np.uint8).reshape(header)
+            try:
+                _set_image(api, pixels)
+                conn.send(api.GetUTF8Text())
+            except Exception as e:
+                conn.send(e)
+    except EOFError:
+        pass
+    finally:
+        api.End()
+
+
+class TesseractWorkerBackend(OcrBackend):
+    """
+    Tesseract в отдельном долгоживущем процессе.
+
+    Пиксели передаются по pipe сырым буфером. Сбой движка не роняет
+    ассистента, а распознавание не держит GIL основного процесса.
+    """
+
+    name = "worker"
+
+    def __init__(self, lang: str = OCR_CONFIG["language"]):
+        if not TESSEROCR_AVAILABLE:
+            raise RuntimeError("tesserocr не установлен")
+        self.lang = lang
+        self._lock = threading.Lock()
+        self._process = None
+        self._conn = None
+        self._start()
+
+    def _start(self) -> None:
+        context = multiprocessing.get_context("spawn")
+        self._conn, child = context.Pipe()
+        self._process = context.Process(
+            target=_tesseract_worker, args=(child, self.lang, _tessdata_path()),
+            name="tesseract-worker", daemon=True,
+        )
+        self._process.start()
+        child.close()
+        if self._conn.recv() != "ready":
+            raise RuntimeError("Рабочий процесс Tesseract не запустился")
+
+    def recognize(self, pixels: np.ndarray) -> str:
+        pixels = np.ascontiguousarray(pixels)
+        with self._lock:
+            if not self._process.is_alive():
+                logger.warning("Рабочий процесс Tesseract перезапускается")
+                self._start()
+            self._conn.send(pixels.shape)
+            self._conn.send_bytes(pixels)
+            result = self._conn.recv()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def close(self) -> None:
+        with self._lock:
+            if self._process and self._process.is_alive():
+                self._conn.send(None)
+                self._process.join(timeout=2.0)
+            self._conn.close()
+
+
+OCR_BACKENDS = {
+    "tesserocr": TesserocrBackend,
+    "worker": TesseractWorkerBackend,
+    "pytesseract": PytesseractBackend,
+}
+
+
+def create_ocr_backend(kind: str = OCR_CONFIG["backend"]) -> OcrBackend:
+    """
+    Создать бэкенд OCR.
+
+    Args:
+        kind: tesserocr, worker, pytesseract или auto (постоянный движок,
+            если доступен, иначе pytesseract)
+    """
+    kinds = ["tesserocr", "pytesseract"] if kind == "auto" else [kind, "pytesseract"]
+    for name in kinds:
+        try:
+            backend = OCR_BACKENDS[name]()
+            logger.info(f"OCR: бэкенд {backend.name}")
+            return backend
+        except Exception as e:
+            logger.warning(f"OCR-бэкенд {name} недоступен: {e}")
+    raise RuntimeError("Нет доступного OCR-бэкенда")
+
+
 class OCRTranslator:
     """Модуль для OCR и перевода."""
 
     def __init__(self):
         """Инициализация."""
-        try:
-            import argostranslate.package
-            import argostranslate.translate
-            
-            self.argos_available = True
-            self.translator_module = argostranslate.translate
+        # Масштаб скриншота перед OCR (меньше — быстрее, ставит регулятор нагрузки)
+        self.scale = 1.0
+        # Повторный запрос того же окна не распознается заново
+        self.cache = OcrCache()
+        self._backend: Optional[OcrBackend] = create_ocr_backend()
+        self._backend_lock = threading.Lock()
+        # Блоки снимка распознаются параллельно; число процессов ставит регулятор нагрузки
+        self.pool = None
+        if OCR_CONFIG["parallel"] and OCR_CONFIG["backend"] != "worker":
+            self.pool = ParallelOcr(backend=OCR_CONFIG["backend"])
+        self.workers = self.pool.max_workers if self.pool else 1
+        # Повторяющиеся строки интерфейса не переводятся заново
+        self.translation_cache = TranslationCache() if TRANSLATION_CONFIG["cache"] else None
+        self.argos_available = ARGOS_AVAILABLE
+        if self.argos_available:
+            # Объект перевода ищется один раз на пару, модель грузится заранее
+            self.argos = ArgosTranslator()
+            if TRANSLATION_CONFIG["warm_on_start"]:
+                self.argos.warm(TRANSLATION_CONFIG["source_lang"], TRANSLATION_CONFIG["target_lang"])
             logger.info("Модуль OCR и перевода инициализирован")
-        except ImportError:
-            self.argos_available = False
+        else:
             logger.warning("Оптиональные модули перевода не установлены")
 
+    @property
+    def backend(self) -> OcrBackend:
+        """Движок OCR; после close() создается заново при первом обращении."""
+        with self._backend_lock:
+            if self._backend is None:
+                self._backend = create_ocr_backend()
+            return self._backend
+
     def extract_text_from_screen(self, region: Optional[tuple] = None) -> str:
         """
         Экстракция текста на экране.
@@ -42,17 +250,13 @@ class OCRTranslator:
             Очищенный текст
         """
         try:
-            # Получить скриншот
-            if region:
-                screenshot = ImageGrab.grab(bbox=region)
-            else:
-                screenshot = ImageGrab.grab()
-            
-            # Отрисовать текст с OCR
-            text = pytesseract.image_to_string(
-                screenshot,
-                lang=OCR_CONFIG["language"]
-            )
+            # Отрисовать текст с OCR (только изменившиеся области)
+            pixels = self._capture(region)
+            context = f"{OCR_CONFIG['language']}|{region}"
+            key, text = self.cache.lookup(pixels, context)
+            if text is None:
+                text = self._recognize(pixels, context)
+                self.cache.put(key, text)
             
             logger.debug(f"Одвою текст: {text[:100]}...")
             return text.strip()
@@ -60,6 +264,72 @@ class OCRTranslator:
             logger.error(f"Ошибка орисования OCR: {e}")
             return ""
 
+    def iter_text_blocks(self, region: Optional[tuple] = None) -> Iterator[str]:
+        """
+        Текст экрана по блокам в порядке чтения — по мере распознавания.
+
+        Все блоки сразу уходят в пул процессов; первый блок отдается, как
+        только распознан, пока остальные распознаются параллельно.
+
+        Args:
+            region: Координаты (left, top, right, bottom) для обыска региона
+        """
+        pixels = self._capture(region)
+        context = f"{OCR_CONFIG['language']}|{region}"
+        key, text = self.cache.lookup(pixels, context)
+        if text is not None:
+            yield text.strip()
+            return
+
+        parts = []
+        for part in self.cache.iter_recognize(self._blocks(pixels), self._ocr_stream, context):
+            parts.append(part)
+            if part:
+                yield part
+        # Только если снимок распознан целиком (чтение не прервали)
+        self.cache.put(key, "\n".join(part for part in parts if part))
+
+    def _capture(self, region: Optional[tuple]) -> np.ndarray:
+        """Снимок экрана (с масштабом регулятора нагрузки) в виде RGB-массива."""
+        if region:
+            screenshot = ImageGrab.grab(bbox=region)
+        else:
+            screenshot = ImageGrab.grab()
+        if self.scale < 1.0:
+            width, height = screenshot.size
+            screenshot = screenshot.resize((int(width * self.scale), int(height * self.scale)))
+        return np.asarray(screenshot.convert("RGB"))
+
+    def _blocks(self, pixels: np.ndarray) -> list:
+        """Фрагменты снимка для OCR в порядке чтения."""
+        if OCR_CONFIG["preprocess"]:
+            # Только бинаризованные области с текстом
+            return [region.pixels for region in find_text_regions(pixels)]
+        return OcrCache._bands(pixels)
+
+    def _recognize(self, pixels: np.ndarray, context: str) -> str:
+        """Распознать снимок: по областям с текстом или по полосам."""
+        parts = self.cache.recognize_many(self._blocks(pixels), self._ocr_batch, context)
+        return "\n".join(part for part in parts if part)
+
+    def _ocr_batch(self, blocks: list) -> list:
+        """Распознать блоки: в пуле процессов или по очереди в этом процессе."""
+        return list(self._ocr_stream(blocks))
+
+    def _ocr_stream(self, blocks: list) -> Iterator[str]:
+        """Тексты блоков по порядку, по мере готовности (пул или этот процесс)."""
+        done = 0
+        if self.pool and len(blocks) > 1 and self.workers > 1:
+            try:
+                for text in self.pool.iter_recognize(blocks, workers=self.workers):
+                    done += 1
+                    yield text
+                return
+            except Exception as e:
+                logger.warning(f"Пул OCR недоступен, распознаем последовательно: {e}")
+        for block in blocks[done:]:
+            yield self.backend.recognize(block)
+
     def translate_text(self, text: str, source_lang: Optional[str] = None, target_lang: Optional[str] = None) -> str:
         """
         Перевести текст.
@@ -80,13 +350,88 @@ class OCRTranslator:
         target_lang = target_lang or TRANSLATION_CONFIG["target_lang"]
         
         try:
-            translated = self.translator_module.translate(text, source_lang, target_lang)
+            translated, report = self._translate(text, source_lang, target_lang)
+            if report:
+                logger.info(
+                    f"Перевод: сегментов {report['segments']}, из кэша {report['hits']} "
+                    f"({report['hit_rate']:.0%}), сэкономлено {report['saved_ms']:.0f} мс"
+                )
             logger.debug(f"Переведено: {translated}")
             return translated
         except Exception as e:
             logger.error(f"Ошибка перевода: {e}")
             return text
 
+    def translate_sentences(
+        self, sentences: List[str], source_lang: Optional[str] = None, target_lang: Optional[str] = None
+    ) -> List[str]:
+        """
+        Перевести предложения одного блока (для потокового чтения экрана, без отчета в лог).
+
+        Промахи кэша уходят в модель одним пакетом.
+
+        Returns:
+            Переводы в том же порядке
+        """
+        if not self.argos_available or not sentences:
+            return list(sentences)
+        source_lang = source_lang or TRANSLATION_CONFIG["source_lang"]
+        target_lang = target_lang or TRANSLATION_CONFIG["target_lang"]
+        try:
+            if not self.translation_cache:
+                return self.translate_batch(sentences, source_lang, target_lang)
+            return self.translation_cache.translate_segments(
+                sentences, f"{source_lang}-{target_lang}",
+                lambda segments: self.translate_batch(segments, source_lang, target_lang),
+            )[0]
+        except Exception as e:
+            logger.error(f"Ошибка перевода: {e}")
+            return list(sentences)
+
+    def translate_batch(self, segments: list, source_lang: Optional[str] = None, target_lang: Optional[str] = None) -> list:
+        """
+        Перевести список предложений одним вызовом модели.
+
+        Args:
+            segments: Отдельные предложения
+            source_lang: Исходный язык
+            target_lang: Целевой язык
+
+        Returns:
+            Переводы в том же порядке
+        """
+        if not self.argos_available:
+            return list(segments)
+        source_lang = source_lang or TRANSLATION_CONFIG["source_lang"]
+        target_lang = target_lang or TRANSLATION_CONFIG["target_lang"]
+        return self.argos.pair(source_lang, target_lang).translate_batch(segments)
+
+    def _translate(self, text: str, source_lang: str, target_lang: str) -> tuple:
+        """Перевод через кэш (если включен). Returns: (перевод, отчет кэша или None)."""
+        if not self.translation_cache:
+            return self.argos.pair(source_lang, target_lang).translate(text), None
+        # В модель уходят только промахи кэша — одним пакетом
+        return self.translation_cache.translate(
+            text, f"{source_lang}-{target_lang}",
+            lambda segments: self.translate_batch(segments, source_lang, target_lang),
+        )
+
+    def close(self) -> None:
+        """
+        Освободить движок OCR, пул процессов и кэш переводов.
+
+        Все они открываются заново при следующем распознавании или переводе,
+        так что после close() модулем можно пользоваться дальше.
+        """
+        with self._backend_lock:
+            if self._backend is not None:
+                self._backend.close()
+                self._backend = None
+        if self.pool:
+            self.pool.close()
+        if self.translation_cache:
+            self.translation_cache.close()
+
     def extract_and_translate_from_screen(
         self,
         region: Optional[tuple] = None,
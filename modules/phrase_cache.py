@@ -0,0 +1,114 @@
+"""Кэш заранее синтезированных фраз (память + диск)."""
+
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+from config.settings import TTS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class PhraseCache:
+    """LRU-кэш WAV-рендеров фраз с дисковым уровнем."""
+
+    def __init__(
+        self,
+        cache_dir: str = TTS_CONFIG["phrase_cache_dir"],
+        max_bytes: int = TTS_CONFIG["phrase_cache_mb"] * 1024 * 1024,
+    ):
+        """
+        Инициализация кэша.
+
+        Args:
+            cache_dir: Каталог дискового уровня
+            max_bytes: Лимит памяти для рендеров
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.fingerprint = ""
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    def set_voice_settings(self, settings: Dict) -> None:
+        """
+        Привязать кэш к параметрам голоса.
+
+        При смене скорости/громкости/голоса память очищается, а на диске
+        используется отдельный подкаталог — старые рендеры не смешиваются с новыми.
+        """
+        raw = "|".join(f"{key}={settings[key]}" for key in sorted(settings))
+        fingerprint = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+        if fingerprint == self.fingerprint:
+            return
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self.fingerprint = fingerprint
+        logger.info(f"Кэш фраз: параметры голоса изменились ({raw})")
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / self.fingerprint / f"{key}.wav"
+
+    def get(self, text: str) -> Optional[bytes]:
+        """Получить WAV-рендер фразы или None."""
+        key = self._key(text)
+        with self._lock:
+            wav = self._memory.get(key)
+            if wav is not None:
+                self._memory.move_to_end(key)
+                self.stats["hits"] += 1
+                return wav
+
+        path = self._path(key)
+        try:
+            wav = path.read_bytes()
+        except OSError:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["disk_hits"] += 1
+        self._remember(key, wav)
+        return wav
+
+    def put(self, text: str, wav: bytes) -> None:
+        """Сохранить рендер фразы в память и на диск."""
+        key = self._key(text)
+        self._remember(key, wav)
+
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(wav)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить фразу на диск: {e}")
+
+    def _remember(self, key: str, wav: bytes) -> None:
+        if len(wav) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._memory[key] = wav
+            self._memory_bytes += len(wav)
+            while self._memory_bytes > self.max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+                self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """Очистить уровень в памяти."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
@@ -0,0 +1,232 @@
+"""Потоковое чтение экрана: OCR → перевод → речь с перекрытием стадий."""
+
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from concurrent.futures import CancelledError, TimeoutError
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, List, Optional
+from config.settings import OCR_CONFIG
+from modules.translation_cache import HAS_LETTERS, split_segments
+
+logger = logging.getLogger(__name__)
+
+# Конец потока в очереди между стадиями
+_DONE = object()
+
+
+@dataclass
+class ReadingReport:
+    """Замеры одного чтения экрана (мс от начала)."""
+    blocks: int = 0
+    sentences: int = 0
+    first_text_ms: Optional[float] = None
+    first_translation_ms: Optional[float] = None
+    first_audio_ms: Optional[float] = None
+    total_ms: Optional[float] = None
+    cancelled: bool = False
+    original: List[str] = field(default_factory=list)
+
+
+class ScreenReader:
+    """
+    Конвейер чтения экрана.
+
+    OCR отдает блоки в порядке чтения, перевод идет по блокам, речь по
+    предложениям ставится в очередь TTS по мере готовности. Стадии работают в своих
+    потоках и связаны ограниченными очередями: первое предложение звучит,
+    пока остальные еще распознаются и переводятся, а быстрая стадия не
+    убегает далеко вперед медленной.
+    """
+
+    def __init__(
+        self,
+        ocr,
+        tts,
+        queue_size: int = OCR_CONFIG["stream_queue_size"],
+        speech_ahead: int = OCR_CONFIG["stream_speech_ahead"],
+    ):
+        """
+        Args:
+            ocr: OCRTranslator (iter_text_blocks, translate_sentences)
+            tts: TextToSpeech
+            queue_size: Емкость очередей между стадиями
+            speech_ahead: Сколько предложений держать в очереди TTS
+        """
+        self.ocr = ocr
+        self.tts = tts
+        self.queue_size = queue_size
+        self.speech_ahead = speech_ahead
+        self._stop: Optional[threading.Event] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(
+        self,
+        region: Optional[tuple] = None,
+        translate: bool = True,
+        on_done: Optional[Callable[[ReadingReport], None]] = None,
+    ) -> ReadingReport:
+        """
+        Начать чтение экрана (предыдущее чтение прерывается).
+
+        Args:
+            region: Координаты (left, top, right, bottom) или весь экран
+            translate: Переводить ли текст
+            on_done: Вызывается по окончании с итоговым отчетом
+
+        Returns:
+            Отчет, заполняемый по ходу чтения
+        """
+        self.cancel()
+        report = ReadingReport()
+        stop = threading.Event()
+        self._stop = stop
+        self._thread = threading.Thread(
+            target=self._run, args=(region, translate, report, stop, on_done),
+            name="screen-reader", daemon=True,
+        )
+        self._thread.start()
+        return report
+
+    def cancel(self) -> None:
+        """Прервать текущее чтение."""
+        if self._stop:
+            self._stop.set()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Дождаться окончания текущего чтения."""
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self, region, translate, report: ReadingReport, stop: threading.Event, on_done) -> None:
+        started = time.perf_counter()
+
+        def elapsed() -> float:
+            return (time.perf_counter() - started) * 1000
+
+        def blocks() -> Iterator[str]:
+            for block in self.ocr.iter_text_blocks(region):
+                if report.first_text_ms is None:
+                    report.first_text_ms = elapsed()
+                report.blocks += 1
+                report.original.append(block)
+                yield block
+
+        def sentences(texts: Iterable[str]) -> Iterator[str]:
+            for text in texts:
+                block = [
+                    sentence for line in split_segments(text) for sentence in line
+                    if HAS_LETTERS.search(sentence)
+                ]
+                if not block:
+                    continue
+                # Блок переводится целиком: промахи кэша — одним пакетом модели
+                if translate:
+                    block = self.ocr.translate_sentences(block)
+                if report.first_translation_ms is None:
+                    report.first_translation_ms = elapsed()
+                yield from block
+
+        def first_audio() -> None:
+            if report.first_audio_ms is None:
+                report.first_audio_ms = elapsed()
+
+        text_queue: "queue.Queue" = queue.Queue(self.queue_size)
+        speech_queue: "queue.Queue" = queue.Queue(self.queue_size)
+        workers = [
+            threading.Thread(target=self._pump, args=(blocks(), text_queue, stop),
+                             name="screen-ocr", daemon=True),
+            threading.Thread(target=self._pump, args=(sentences(self._drain(text_queue, stop)), speech_queue, stop),
+                             name="screen-translate", daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+
+        pending: "deque" = deque()
+        try:
+            for sentence in self._drain(speech_queue, stop):
+                pending.append(self.tts.speak(sentence, wait=False, on_start=first_audio))
+                report.sentences += 1
+                while len(pending) > self.speech_ahead and not stop.is_set():
+                    if self._wait_spoken(pending[0], stop):
+                        pending.popleft()
+            while pending and not stop.is_set():
+                if self._wait_spoken(pending[0], stop):
+                    pending.popleft()
+        finally:
+            report.cancelled = stop.is_set()
+            stop.set()
+            # Прерванное чтение не должно договаривать очередь TTS
+            for future in pending:
+                future.cancel()
+            for worker in workers:
+                worker.join()
+            report.total_ms = elapsed()
+
+        if report.cancelled:
+            logger.info(f"Чтение экрана прервано через {report.total_ms:.0f} мс")
+        else:
+            first_audio_ms = f"{report.first_audio_ms:.0f}" if report.first_audio_ms is not None else "-"
+            logger.info(
+                f"Чтение экрана: блоков {report.blocks}, предложений {report.sentences}, "
+                f"первый звук через {first_audio_ms} мс, всего {report.total_ms:.0f} мс"
+            )
+        if on_done:
+            on_done(report)
+
+    @staticmethod
+    def _wait_spoken(future, stop: threading.Event) -> bool:
+        """
+        Дождаться реплики; прерванная (barge-in) останавливает чтение.
+
+        Returns:
+            True если реплика завершилась, False если чтение остановлено раньше
+        """
+        while not stop.is_set():
+            try:
+                spoken = future.result(timeout=0.1)
+            except TimeoutError:
+                continue
+            except CancelledError:
+                spoken = False
+            except Exception:
+                spoken = True  # Ошибка синтеза одной фразы не прерывает чтение
+            if not spoken:
+                stop.set()
+            return True
+        return False
+
+    @staticmethod
+    def _pump(source: Iterator, out: "queue.Queue", stop: threading.Event) -> None:
+        """Перекладывать элементы стадии в очередь следующей (с ожиданием места)."""
+        try:
+            for item in source:
+                if not ScreenReader._put(out, item, stop):
+                    return
+        except Exception as e:
+            logger.error(f"Ошибка стадии чтения экрана: {e}")
+        ScreenReader._put(out, _DONE, stop)
+
+    @staticmethod
+    def _put(out: "queue.Queue", item, stop: threading.Event) -> bool:
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @staticmethod
+    def _drain(source: "queue.Queue", stop: threading.Event) -> Iterator:
+        """Элементы из очереди предыдущей стадии до ее конца или остановки."""
+        while not stop.is_set():
+            try:
+                item = source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                return
+            yield item
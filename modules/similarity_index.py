@@ -0,0 +1,132 @@
+"""Пакетная оценка похожести фразы на весь набор триггеров (n-граммы + NumPy)."""
+
+import logging
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NGRAM_SIZE = 3
+
+
+def char_ngrams(text: str, n: int = NGRAM_SIZE) -> Counter:
+    """Символьные n-граммы строки с границами."""
+    padded = f" {text} "
+    return Counter(padded[i:i + n] for i in range(len(padded) - n + 1))
+
+
+def levenshtein_ratio(a: str, b: str) -> float:
+    """Похожесть 0-1 по расстоянию Левенштейна."""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        previous = current
+    return 1 - previous[-1] / max(len(a), len(b))
+
+
+class NgramSimilarityIndex:
+    """
+    Матрица n-грамм триггеров (разреженная, по столбцам) для косинусной
+    похожести одной фразы со всеми триггерами за одно умножение.
+    """
+
+    def __init__(self, texts: Iterable[str] = ()):
+        self.texts: List[str] = []
+        self._vocabulary: Dict[str, int] = {}
+        self._rows: List[Dict[int, float]] = []
+        self._dirty = True
+        self.add_many(texts)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def add_many(self, texts: Iterable[str]) -> None:
+        """Добавить строки (матрица пересобирается при следующем поиске)."""
+        for text in texts:
+            counts = char_ngrams(text)
+            norm = sum(v * v for v in counts.values()) ** 0.5 or 1.0
+            row = {}
+            for gram, count in counts.items():
+                column = self._vocabulary.setdefault(gram, len(self._vocabulary))
+                row[column] = count / norm
+            self.texts.append(text)
+            self._rows.append(row)
+            self._dirty = True
+
+    def _build(self) -> None:
+        """Собрать CSC-представление: для каждой n-граммы — строки и веса."""
+        columns = [[] for _ in range(len(self._vocabulary))]
+        for row_index, row in enumerate(self._rows):
+            for column, weight in row.items():
+                columns[column].append((row_index, weight))
+
+        self._indptr = np.zeros(len(columns) + 1, dtype=np.int64)
+        np.cumsum([len(c) for c in columns], out=self._indptr[1:])
+        self._row_ids = np.fromiter(
+            (r for c in columns for r, _ in c), dtype=np.int32, count=int(self._indptr[-1])
+        )
+        self._weights = np.fromiter(
+            (w for c in columns for _, w in c), dtype=np.float32, count=int(self._indptr[-1])
+        )
+        self._dirty = False
+
+    def scores(self, text: str) -> np.ndarray:
+        """Косинусная похожесть фразы со всеми строками индекса."""
+        if self._dirty:
+            self._build()
+
+        counts = char_ngrams(text)
+        norm = sum(v * v for v in counts.values()) ** 0.5 or 1.0
+        starts, ends, query_weights = [], [], []
+        for gram, count in counts.items():
+            column = self._vocabulary.get(gram)
+            if column is not None:
+                starts.append(self._indptr[column])
+                ends.append(self._indptr[column + 1])
+                query_weights.append(count / norm)
+        if not starts:
+            return np.zeros(len(self.texts), dtype=np.float32)
+
+        # Склеиваем столбцы запроса и суммируем вклад по строкам одним bincount
+        lengths = np.subtract(ends, starts)
+        positions = np.repeat(np.subtract(ends, lengths.cumsum()), lengths) + np.arange(lengths.sum())
+        weights = self._weights[positions] * np.repeat(np.asarray(query_weights, dtype=np.float32), lengths)
+        return np.bincount(self._row_ids[positions], weights=weights, minlength=len(self.texts))
+
+    def rank(self, text: str, top_k: int = 5, rerank: int = 0) -> List[Tuple[int, float]]:
+        """
+        Лучшие строки для фразы.
+
+        Args:
+            text: Фраза
+            top_k: Сколько результатов вернуть
+            rerank: Сколько лучших по n-граммам кандидатов переоценить
+                средним косинуса и похожести по Левенштейну; остальные
+                кандидаты сохраняют косинусную оценку
+
+        Returns:
+            Пары (индекс строки, оценка 0-1) по убыванию оценки
+        """
+        if not self.texts:
+            return []
+        scores = self.scores(text)
+        count = min(max(top_k, rerank), len(scores))
+        best = np.argpartition(-scores, count - 1)[:count]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        ranked = [(int(i), float(scores[i])) for i in best]
+        for position, (i, score) in enumerate(ranked[:rerank]):
+            ranked[position] = (i, (score + levenshtein_ratio(text, self.texts[i])) / 2)
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked[:top_k]
@@ -1,77 +1,360 @@
 """Модуль распознавания речи (STT) с Vosk."""
 
-import pyaudio
 import json
+import time
 import logging
 import threading
-from typing import Callable, Optional
-from vosk import Model, KaldiRecognizer
-from config.settings import SPEECH_CONFIG, MODELS_DIR
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from vosk import KaldiRecognizer
+from config.settings import SPEECH_CONFIG, VAD_CONFIG
+from modules.audio_bus import AudioBus
+from modules.vad import VoiceActivityDetector
+from modules.vosk_models import ModelTier
+from modules.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
 
 class SpeechRecognizer:
-    """Обертка для Vosk ASR."""
+    """
+    Обертка для Vosk ASR.
 
-    def __init__(self, on_result: Optional[Callable[[str], None]] = None):
+    Команды декодируются малой моделью, которая всегда в памяти. Большая
+    модель загружается для диктовки и для команд с низкой уверенностью:
+    фраза повторно декодируется из сохраненной копии звука.
+    """
+
+    def __init__(
+        self,
+        audio_bus: AudioBus,
+        on_result: Optional[Callable[[str], None]] = None,
+        on_partial: Optional[Callable[[str], None]] = None,
+    ):
         """
         Инициализация распознавания речи.
 
         Args:
+            audio_bus: Общая шина захвата звука
             on_result: Коллбэк для обработки результата
+            on_partial: Коллбэк для частичных гипотез
         """
         try:
-            self.model = Model(SPEECH_CONFIG["model_path"])
+            small_path = SPEECH_CONFIG["model_path"]
+            large_path = SPEECH_CONFIG["large_model_path"]
+            has_large = bool(large_path) and Path(large_path).exists()
+            if not Path(small_path).exists() and has_large:
+                # Установлена только большая модель — команды декодирует она
+                logger.warning(f"Малая модель Vosk не найдена ({small_path}), используется {large_path}")
+                small_path, has_large = large_path, False
+            self.small_model = ModelTier("small", small_path)
+            self.model = self.small_model.acquire()
             self.recognizer = KaldiRecognizer(
                 self.model, SPEECH_CONFIG["sample_rate"]
             )
+            # Уверенность по словам — для решения о перепроверке
+            self.recognizer.SetWords(True)
+
+            self.large_model: Optional[ModelTier] = None
+            if has_large:
+                self.large_model = ModelTier(
+                    "large", large_path, SPEECH_CONFIG["large_model_idle_unload"]
+                )
+            else:
+                logger.warning("Большая модель Vosk не найдена, перепроверка отключена")
+            # Снимается регулятором нагрузки, когда машина загружена
+            self.large_model_allowed = True
             self.on_result = on_result
+            self.on_partial = on_partial
             self.is_listening = False
-            self.audio = pyaudio.PyAudio()
+            self.audio_bus = audio_bus
+            # Сколько кадров шины собирать в один вызов AcceptWaveform
+            self.frames_per_chunk = max(1, SPEECH_CONFIG["chunk_size"] // audio_bus.frame_length)
+            self.chunk_seconds = self.frames_per_chunk * audio_bus.frame_length / audio_bus.sample_rate
+            self.preroll_frames = int(
+                SPEECH_CONFIG["preroll_seconds"] * audio_bus.sample_rate / audio_bus.frame_length
+            )
+
+            # Рабочий поток держит распознаватель "теплым" между командами
+            self.is_running = False
+            self._activate = threading.Event()
+            self._use_preroll = True
+            self._dictation_requested = False
+            self.dictation = False  # Режим текущей (последней) фразы
+            self._wake_time = 0.0
+            # Копия звука текущей фразы для повторного декодирования
+            self._utterance: List[bytes] = []
+            self._utterance_decode = 0.0
+            self.rescored = 0
+            self._consumer = None
+            self._worker: Optional[threading.Thread] = None
+
+            # Тишина не декодируется, конец фразы определяется по паузе
+            self.vad = VoiceActivityDetector(audio_bus.sample_rate) if VAD_CONFIG["enabled"] else None
+            self.vad_stats = {"chunks": 0, "skipped": 0, "decoded": 0, "decode_cpu": 0.0}
+
+            # Задержка от wake-word до первого декодированного кадра
+            self.last_wake_latency_ms: Optional[float] = None
             logger.info("Модуль распознания речи инициализирован")
         except Exception as e:
             logger.error(f"Ошибка инициализации: {e}")
             raise
 
+    def start(self) -> None:
+        """Запустить рабочий поток распознавания (ждет активации)."""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._consumer = self.audio_bus.subscribe("stt")
+        self._worker = threading.Thread(target=self._worker_loop, name="stt", daemon=True)
+        self._worker.start()
+
+    def shutdown(self) -> None:
+        """Остановить рабочий поток."""
+        self.is_running = False
+        self.stop_listening()
+        self._activate.set()
+        # Дожидаемся старого потока, иначе после перезапуска шину читают двое
+        if self._worker and self._worker is not threading.current_thread():
+            self._worker.join(timeout=2.0)
+        self._worker = None
+        if self._consumer:
+            self._consumer.close()
+            self._consumer = None
+
+    def start_listening(self, preroll: bool = True, dictation: bool = False) -> None:
+        """
+        Активировать распознавание одной команды.
+
+        Args:
+            preroll: Декодировать и звук, записанный до активации
+            dictation: Режим диктовки — итог декодируется большой моделью
+        """
+        if not self.is_running:
+            self.start()
+        if dictation and self.large_model and self.large_model_allowed:
+            # Модель грузится, пока пользователь говорит
+            self.large_model.prefetch()
+        self._wake_time = time.perf_counter()
+        self._use_preroll = preroll
+        self._dictation_requested = dictation
+        self._activate.set()
+
+    def _worker_loop(self) -> None:
+        """Ожидание активаций и декодирование команд."""
+        while self.is_running:
+            if not self._activate.wait(timeout=0.5):
+                continue
+            self._activate.clear()
+            if not self.is_running:
+                break
+            self.listen()
+
     def listen(self) -> None:
-        """Начать постоянное послушивание."""
+        """Распознать одну команду из шины (блокирующе)."""
         self.is_listening = True
         logger.info("Начало послушивание")
-        
-        stream = self.audio.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=SPEECH_CONFIG["sample_rate"],
-            input=True,
-            frames_per_buffer=SPEECH_CONFIG["chunk_size"],
-        )
-        
+        tracer.instant("stt_open")
+        listen_span = tracer.span("stt_listen")
+
+        consumer = self._consumer
+        # Пока распознаватель простаивал, курсор не двигался — возвращаем его
+        # к текущему моменту (плюс pre-roll, если нужен)
+        replayed = consumer.rewind(self.preroll_frames if self._use_preroll else 0)
+        logger.debug(f"Pre-roll: {replayed} кадров")
+        self.recognizer.Reset()
+        self._first_chunk = True
+        self.dictation = self._dictation_requested
+        self._utterance.clear()
+        self._utterance_decode = 0.0
+        frames = []
+
+        # Состояние определения конца фразы
+        speech_started = False
+        silence = 0.0  # Тишина после последнего блока с речью (сек)
+        waited = 0.0  # Сколько ждем начала речи (сек)
+        lead_in = b""  # Последний тихий блок перед речью — чтобы не срезать начало слова
+
         try:
             while self.is_listening:
-                data = stream.read(SPEECH_CONFIG["chunk_size"])
-                
-                if self.recognizer.AcceptWaveform(data):
+                frame = consumer.read(timeout=0.5)
+                if frame is None:
+                    if not self.audio_bus.is_running:
+                        break
+                    continue
+                frames.append(frame)
+                if len(frames) < self.frames_per_chunk:
+                    continue
+                data = b"".join(frames)
+                frames.clear()
+                self.vad_stats["chunks"] += 1
+
+                if self.vad:
+                    if self.vad.is_speech(data):
+                        speech_started = True
+                        silence = 0.0
+                        data, lead_in = lead_in + data, b""
+                    elif not speech_started:
+                        waited += self.chunk_seconds
+                        lead_in = data
+                        self.vad_stats["skipped"] += 1
+                        if waited >= VAD_CONFIG["no_speech_timeout"]:
+                            logger.info("Речь не началась — завершаем прослушивание")
+                            self._emit("")
+                            break
+                        continue
+                    else:
+                        silence += self.chunk_seconds
+                        if silence * 1000 > VAD_CONFIG["hangover_ms"]:
+                            self.vad_stats["skipped"] += 1
+                            if silence * 1000 >= VAD_CONFIG["endpoint_silence_ms"]:
+                                # Не ждем, пока Vosk сам решит, что фраза закончилась
+                                result = json.loads(self.recognizer.FinalResult())
+                                text = self._finalize(result)
+                                if text:
+                                    self._emit(text)
+                                    break
+                                # Пауза после одного слова-активатора — ждем саму команду
+                                speech_started = False
+                                silence = 0.0
+                                waited = 0.0
+                            continue
+
+                if self._accept(data):
                     result = json.loads(self.recognizer.Result())
-                    if "result" in result and result["result"]:
-                        text = " ".join([item["conf"] for item in result["result"]])
-                        if self.on_result:
-                            self.on_result(text)
+                    # Фраза из одного слова-активатора — ждем саму команду
+                    text = self._finalize(result)
+                    if text:
+                        self._emit(text)
                 else:
                     partial = json.loads(self.recognizer.PartialResult())
                     if "partial" in partial:
                         logger.debug(f"Партиальный результат: {partial['partial']}")
+                        if self.on_partial:
+                            text = self._strip_wake_word(partial["partial"])
+                            if text:
+                                self.on_partial(text)
         except Exception as e:
             logger.error(f"Ошибка в процессе слушания: {e}")
         finally:
-            stream.stop_stream()
-            stream.close()
+            self.is_listening = False
+            listen_span.end()
+            stats = self.get_vad_stats()
+            logger.debug(
+                f"VAD: пропущено {stats['skipped']}/{stats['chunks']} блоков, "
+                f"сэкономлено {stats['cpu_seconds_saved']:.2f} с CPU"
+            )
+
+    def _accept(self, data: bytes) -> bool:
+        """Отдать блок в Vosk с замером CPU-времени декодирования."""
+        self._utterance.append(data)
+        started = time.thread_time()
+        wall_started = time.perf_counter()
+        accepted = self.recognizer.AcceptWaveform(data)
+        self._utterance_decode += time.perf_counter() - wall_started
+        self.vad_stats["decoded"] += 1
+        self.vad_stats["decode_cpu"] += time.thread_time() - started
+
+        if self._first_chunk:
+            self._first_chunk = False
+            self.last_wake_latency_ms = (time.perf_counter() - self._wake_time) * 1000
+            tracer.instant("first_audio_fed")
+            logger.info(f"Wake → первый кадр декодирован: {self.last_wake_latency_ms:.1f} мс")
+        return accepted
+
+    def _finalize(self, result: dict) -> str:
+        """
+        Итоговый текст фразы: при диктовке или низкой уверенности малой
+        модели фраза повторно декодируется большой моделью.
+
+        Команда не ждет загрузки большой модели: если она еще не в памяти,
+        загрузка начинается в фоне, а фраза остается с текстом малой модели.
+        """
+        audio = b"".join(self._utterance)
+        self._utterance.clear()
+        audio_seconds = len(audio) / 2 / self.audio_bus.sample_rate
+        self.small_model.record_decode(self._utterance_decode, audio_seconds)
+        self._utterance_decode = 0.0
+
+        text = result.get("text", "")
+        words = result.get("result") or []
+        confidence = sum(w.get("conf", 1.0) for w in words) / len(words) if words else 1.0
+
+        if self.large_model and self.large_model_allowed and audio and (
+            self.dictation
+            or (
+                text
+                and confidence < SPEECH_CONFIG["rescore_confidence"]
+                and audio_seconds <= SPEECH_CONFIG["rescore_max_seconds"]
+            )
+        ):
+            if not self.dictation and not self.large_model.loaded:
+                logger.info(f"Большая модель прогревается в фоне, без перепроверки ({confidence:.2f}): '{text}'")
+                self.large_model.prefetch()
+                return self._strip_wake_word(text)
+            try:
+                with tracer.span("stt_rescore"):
+                    rescored = self._rescore(audio, audio_seconds)
+            except Exception as e:
+                logger.error(f"Ошибка перепроверки большой моделью: {e}")
+            else:
+                logger.info(
+                    f"Перепроверка ({confidence:.2f}): '{text}' → '{rescored}'"
+                )
+                text = rescored or text
+        return self._strip_wake_word(text)
+
+    def _rescore(self, audio: bytes, audio_seconds: float) -> str:
+        """Декодировать сохраненную фразу большой моделью."""
+        model = self.large_model.acquire()
+        try:
+            started = time.perf_counter()
+            recognizer = KaldiRecognizer(model, self.audio_bus.sample_rate)
+            step = self.frames_per_chunk * self.audio_bus.frame_length * 2
+            parts = []
+            for offset in range(0, len(audio), step):
+                if recognizer.AcceptWaveform(audio[offset:offset + step]):
+                    parts.append(json.loads(recognizer.Result()).get("text", ""))
+            parts.append(json.loads(recognizer.FinalResult()).get("text", ""))
+            self.large_model.record_decode(time.perf_counter() - started, audio_seconds)
+            self.rescored += 1
+            return " ".join(part for part in parts if part)
+        finally:
+            self.large_model.release()
+
+    def get_tier_stats(self) -> Dict[str, dict]:
+        """Память и задержка декодирования по уровням моделей."""
+        stats = {"small": self.small_model.get_stats()}
+        if self.large_model:
+            stats["large"] = self.large_model.get_stats()
+        return stats
+
+    def _emit(self, text: str) -> None:
+        """Передать итоговый текст в коллбэк."""
+        tracer.instant("final_result")
+        if self.on_result:
+            self.on_result(text)
+
+    def get_vad_stats(self) -> dict:
+        """
+        Статистика VAD.
+
+        Returns:
+            dict с числом блоков, пропущенных блоков и оценкой
+            сэкономленного CPU-времени (по средней цене декодирования блока)
+        """
+        stats = dict(self.vad_stats)
+        avg_cost = stats["decode_cpu"] / stats["decoded"] if stats["decoded"] else 0.0
+        stats["cpu_seconds_saved"] = stats["skipped"] * avg_cost
+        return stats
 
-    def start_listening_thread(self) -> threading.Thread:
-        """Начать послушивание в отдельном потоке."""
-        thread = threading.Thread(target=self.listen, daemon=True)
-        thread.start()
-        return thread
+    @staticmethod
+    def _strip_wake_word(text: str) -> str:
+        """Убрать слово-активатор, попавшее в pre-roll."""
+        words = text.split()
+        while words and words[0].lower() in SPEECH_CONFIG["wake_aliases"]:
+            words.pop(0)
+        return " ".join(words)
 
     def stop_listening(self) -> None:
         """Остановить послушивание."""
@@ -81,7 +364,6 @@ class SpeechRecognizer:
     def __del__(self) -> None:
         """Очистка ресурсов."""
         try:
-            self.stop_listening()
-            self.audio.terminate()
+            self.shutdown()
         except:
             pass
@@ -0,0 +1,128 @@
+"""Ленивая инициализация модулей и замер времени запуска."""
+
+import time
+import logging
+import importlib
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Generic, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Точка отсчета — импорт этого модуля (его импортирует main.py первым делом)
+PROCESS_START = time.perf_counter()
+
+
+class StartupProfiler:
+    """Собирает длительность импортов и инициализации модулей."""
+
+    def __init__(self):
+        self._records: List[Tuple[str, str, float, float]] = []  # вид, имя, начало, длительность
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, name: str, kind: str = "init"):
+        """Замерить блок кода."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, kind, started, time.perf_counter() - started)
+
+    def record(self, name: str, kind: str, started: float, seconds: float) -> None:
+        with self._lock:
+            self._records.append((kind, name, started - PROCESS_START, seconds))
+
+    def mark(self, name: str) -> None:
+        """Отметить момент (например, готовность wake-word)."""
+        self.record(name, "mark", time.perf_counter(), 0.0)
+
+    def offset(self, name: str) -> Optional[float]:
+        """Момент первой записи с таким именем от старта процесса (сек)."""
+        with self._lock:
+            for _, record_name, started, seconds in self._records:
+                if record_name == name:
+                    return started + seconds
+        return None
+
+    def import_module(self, module_name: str) -> Any:
+        """Импортировать модуль с замером времени."""
+        with self.measure(module_name, kind="import"):
+            return importlib.import_module(module_name)
+
+    def report(self) -> str:
+        """Таблица: вид, имя, момент начала от старта процесса, длительность."""
+        with self._lock:
+            records = sorted(self._records, key=lambda r: r[2])
+        lines = [f"{'вид':<8}{'модуль':<36}{'старт, мс':>10}{'время, мс':>11}"]
+        for kind, name, offset, seconds in records:
+            duration = "" if kind == "mark" else f"{seconds * 1000:.1f}"
+            lines.append(f"{kind:<8}{name:<36}{offset * 1000:>10.1f}{duration:>11}")
+        return "\n".join(lines)
+
+
+profiler = StartupProfiler()
+
+
+class LazyComponent(Generic[T]):
+    """Модуль, который создается при первом обращении или заранее в фоне."""
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        """
+        Args:
+            name: Имя для логов и профиля запуска
+            factory: Функция, создающая модуль
+        """
+        self.name = name
+        self.future: "Future[T]" = Future()
+        self._factory = factory
+        self._started = False
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        """Модуль создан успешно."""
+        return self.future.done() and self.future.exception() is None
+
+    def _claim(self) -> bool:
+        with self._lock:
+            if self._started:
+                return False
+            self._started = True
+            return True
+
+    def _run(self) -> None:
+        if not self.future.set_running_or_notify_cancel():
+            return
+        try:
+            with profiler.measure(self.name):
+                result = self._factory()
+        except Exception as e:
+            logger.error(f"Ошибка инициализации модуля {self.name}: {e}")
+            self.future.set_exception(e)
+        else:
+            self.future.set_result(result)
+
+    def start_background(self) -> "LazyComponent[T]":
+        """Начать инициализацию в фоновом потоке."""
+        if self._claim():
+            threading.Thread(target=self._run, name=f"init-{self.name}", daemon=True).start()
+        return self
+
+    def get(self, timeout: Optional[float] = None) -> T:
+        """Получить модуль; если он еще не создавался — создать в текущем потоке."""
+        if self._claim():
+            self._run()
+        return self.future.result(timeout)
+
+    def when_ready(self, callback: Callable[[T], None]) -> None:
+        """Вызвать callback(модуль), когда модуль будет готов (без ожидания)."""
+        def _done(future: Future) -> None:
+            if future.exception() is None:
+                callback(future.result())
+
+        self.start_background()
+        self.future.add_done_callback(_done)
@@ -0,0 +1,285 @@
+"""История команд и показателей в SQLite с фоновой пакетной записью."""
+
+import math
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+from config.settings import DATABASE_CONFIG
+from modules.database import connect
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS command_history (
+        id INTEGER PRIMARY KEY,
+        ts REAL NOT NULL,
+        text TEXT NOT NULL,
+        command TEXT,
+        latency_ms REAL NOT NULL,
+        success INTEGER NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_history_ts ON command_history (ts)",
+    # Частота и доля ошибок по команде; перцентиль задержки — по индексу, без сортировки
+    "CREATE INDEX IF NOT EXISTS idx_history_command_latency ON command_history (command, latency_ms)",
+    """CREATE TABLE IF NOT EXISTS metrics (
+        ts REAL NOT NULL,
+        name TEXT NOT NULL,
+        value REAL NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_metrics_name_ts ON metrics (name, ts)",
+)
+
+INSERT_COMMAND = (
+    "INSERT INTO command_history (ts, text, command, latency_ms, success) VALUES (?, ?, ?, ?, ?)"
+)
+INSERT_METRIC = "INSERT INTO metrics (ts, name, value) VALUES (?, ?, ?)"
+
+# Служебные элементы очереди записи
+_STOP = object()
+
+
+class HistoryStore:
+    """
+    Хранилище истории команд и показателей.
+
+    record_* только кладут запись в очередь и никогда не трогают диск:
+    их можно вызывать из потоков звука и команд. Фоновый поток забирает
+    записи пачками и пишет каждую пачку одной транзакцией (executemany
+    с одним подготовленным запросом на таблицу). Запросы читают через
+    отдельное соединение — в WAL чтение не ждет записи.
+    """
+
+    def __init__(
+        self,
+        path: str = DATABASE_CONFIG["path"],
+        flush_interval: float = DATABASE_CONFIG["flush_interval"],
+        batch_size: int = DATABASE_CONFIG["batch_size"],
+        queue_size: int = DATABASE_CONFIG["queue_size"],
+        retention_days: float = DATABASE_CONFIG["retention_days"],
+        compact_interval: float = DATABASE_CONFIG["compact_interval"],
+    ):
+        """
+        Args:
+            path: Файл базы данных
+            flush_interval: Наибольшая задержка записи на диск (сек)
+            batch_size: Записей в одной транзакции
+            queue_size: Емкость очереди (при переполнении записи теряются)
+            retention_days: Сколько дней хранить историю
+            compact_interval: Период удаления старых записей (сек)
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.retention_days = retention_days
+        self.compact_interval = compact_interval
+        self.stats = {"written": 0, "dropped": 0, "flushes": 0, "flush_ms": 0.0, "deleted": 0}
+
+        self._queue: "queue.Queue" = queue.Queue(queue_size)
+        self._writer = connect(path)
+        for statement in SCHEMA:
+            self._writer.execute(statement)
+        self._writer.commit()
+        self._reader = connect(path)
+        self._read_lock = threading.Lock()
+        self._last_compact = 0.0
+
+        self._thread = threading.Thread(target=self._write_loop, name="storage-writer", daemon=True)
+        self._thread.start()
+
+    # ------------------------ ЗАПИСЬ ------------------------
+
+    def _enqueue(self, item) -> None:
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def record_command(
+        self,
+        text: str,
+        command: Optional[str],
+        latency_ms: float,
+        success: bool,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        """
+        Записать обработанную команду (без ожидания диска).
+
+        Args:
+            text: Распознанный текст
+            command: Имя выполненной команды (None — не распознана)
+            latency_ms: От распознанного текста до выполнения
+            success: Команда выполнена успешно
+            timestamp: Время (по умолчанию — сейчас)
+        """
+        ts = timestamp if timestamp is not None else time.time()
+        self._enqueue((INSERT_COMMAND, (ts, text, command, latency_ms, int(success))))
+
+    def record_metric(self, name: str, value: float, timestamp: Optional[float] = None) -> None:
+        """Записать значение показателя (без ожидания диска)."""
+        ts = timestamp if timestamp is not None else time.time()
+        self._enqueue((INSERT_METRIC, (ts, name, float(value))))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Дождаться записи всего, что уже в очереди.
+
+        Returns:
+            True если записано до истечения timeout
+        """
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def _write_loop(self) -> None:
+        """Поток записи: пачки по batch_size или раз в flush_interval."""
+        running = True
+        while running:
+            batch: Dict[str, List[tuple]] = {}
+            waiters: List[threading.Event] = []
+            count = 0
+            deadline = time.monotonic() + self.flush_interval
+            while count < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    running = False
+                    break
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                sql, row = item
+                batch.setdefault(sql, []).append(row)
+                count += 1
+
+            if batch:
+                self._write(batch, count)
+            for waiter in waiters:
+                waiter.set()
+            if time.time() - self._last_compact >= self.compact_interval:
+                self._compact()
+        self._writer.close()
+
+    def _write(self, batch: Dict[str, List[tuple]], count: int) -> None:
+        started = time.perf_counter()
+        try:
+            with self._writer:  # Одна транзакция на пачку
+                for sql, rows in batch.items():
+                    self._writer.executemany(sql, rows)
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка записи истории ({count} записей потеряно): {e}")
+            self.stats["dropped"] += count
+            return
+        self.stats["written"] += count
+        self.stats["flushes"] += 1
+        self.stats["flush_ms"] += (time.perf_counter() - started) * 1000
+
+    def _compact(self) -> int:
+        """
+        Удалить записи старше retention_days и вернуть место в WAL.
+
+        Только из потока записи (при старте и раз в compact_interval).
+
+        Returns:
+            Сколько записей удалено
+        """
+        self._last_compact = time.time()
+        cutoff = time.time() - self.retention_days * 86400
+        try:
+            with self._writer:
+                deleted = self._writer.execute("DELETE FROM command_history WHERE ts < ?", (cutoff,)).rowcount
+                deleted += self._writer.execute("DELETE FROM metrics WHERE ts < ?", (cutoff,)).rowcount
+            self._writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._writer.execute("PRAGMA optimize")
+        except sqlite3.Error as e:
+            logger.warning(f"Ошибка очистки истории: {e}")
+            return 0
+        if deleted:
+            logger.info(f"История: удалено записей старше {self.retention_days} дн.: {deleted}")
+        self.stats["deleted"] += deleted
+        return deleted
+
+    # ------------------------ ЗАПРОСЫ ------------------------
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        with self._read_lock:
+            return self._reader.execute(sql, params).fetchall()
+
+    def most_frequent_commands(self, limit: int = 10, since: float = 0.0) -> List[Tuple[str, int]]:
+        """Самые частые команды: [(команда, число вызовов)]."""
+        return self._query(
+            "SELECT command, COUNT(*) AS calls FROM command_history "
+            "WHERE command IS NOT NULL AND ts >= ? GROUP BY command ORDER BY calls DESC LIMIT ?",
+            (since, limit),
+        )
+
+    def failure_rate(self, command: Optional[str] = None, since: float = 0.0) -> float:
+        """
+        Доля неудачных вызовов.
+
+        Args:
+            command: Имя команды (None — по всем, включая нераспознанные)
+            since: Начало периода (unix time)
+        """
+        if command is None:
+            rows = self._query(
+                "SELECT COUNT(*), SUM(1 - success) FROM command_history WHERE ts >= ?", (since,)
+            )
+        else:
+            rows = self._query(
+                "SELECT COUNT(*), SUM(1 - success) FROM command_history WHERE command = ? AND ts >= ?",
+                (command, since),
+            )
+        total, failed = rows[0]
+        return (failed or 0) / total if total else 0.0
+
+    def latency_percentile(self, command: str, percentile: float = 95.0) -> Optional[float]:
+        """
+        Перцентиль задержки команды (метод ближайшего ранга).
+
+        Значение читается по индексу (command, latency_ms) через OFFSET —
+        без выборки и сортировки всех задержек.
+        """
+        (count,) = self._query("SELECT COUNT(*) FROM command_history WHERE command = ?", (command,))[0]
+        if not count:
+            return None
+        rank = max(1, math.ceil(percentile / 100 * count))
+        rows = self._query(
+            "SELECT latency_ms FROM command_history WHERE command = ? "
+            "ORDER BY latency_ms LIMIT 1 OFFSET ?",
+            (command, rank - 1),
+        )
+        return rows[0][0]
+
+    def latency_p95_by_command(self) -> Dict[str, float]:
+        """p95 задержки для каждой команды."""
+        commands = self._query("SELECT DISTINCT command FROM command_history WHERE command IS NOT NULL")
+        return {command: self.latency_percentile(command, 95.0) for (command,) in commands}
+
+    def metric_series(self, name: str, since: float = 0.0) -> List[Tuple[float, float]]:
+        """Значения показателя: [(время, значение)]."""
+        return self._query(
+            "SELECT ts, value FROM metrics WHERE name = ? AND ts >= ? ORDER BY ts", (name, since)
+        )
+
+    def get_stats(self) -> Dict:
+        """Статистика записи."""
+        stats = dict(self.stats)
+        stats["queued"] = self._queue.qsize()
+        stats["avg_flush_ms"] = stats["flush_ms"] / stats["flushes"] if stats["flushes"] else 0.0
+        return stats
+
+    def close(self) -> None:
+        """Дописать очередь и закрыть базу."""
+        self._queue.put(_STOP)
+        self._thread.join(timeout=5.0)
+        with self._read_lock:
+            self._reader.close()
@@ -1,17 +1,25 @@
 """Модуль мониторинга системы (температура, нагрузка, FPS)."""
 
+import os
+import sys
+import time
 import psutil
 import logging
-from typing import Dict, Optional
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
 from dataclasses import dataclass
 from config.settings import SYSTEM_MONITOR_CONFIG
 
 logger = logging.getLogger(__name__)
 
+# Диск, на котором стоит система
+SYSTEM_DRIVE = os.environ.get("SystemDrive", "C:") + "\\" if sys.platform == "win32" else "/"
 
-@dataclass
+
+@dataclass(frozen=True)
 class SystemStats:
-    """Класс для стокранения системных статистик."""
+    """Класс для стокранения системных статистик (неизменяемый снимок)."""
     cpu_percent: float
     cpu_freq: float
     cpu_temp: Optional[float] = None
@@ -20,105 +28,334 @@ class SystemStats:
     gpu_memory: Optional[float] = None
     ram_percent: float = 0
     disk_percent: float = 0
+    timestamp: float = 0  # time.time() момента замера
+
+
+class Collector:
+    """
+    Источник показателей с TTL, учетом стоимости и отключением при сбоях.
+
+    Пока TTL не истек, collect() отдает прошлое значение. Ошибка или
+    пустой ответ источника (нет GPU, нет датчиков) откладывают следующий
+    опрос с удвоением паузы; после max_failures сбоев подряд источник
+    отключается.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[], Optional[Dict[str, Any]]],
+        ttl: float,
+        default: Dict[str, Any],
+        max_failures: Optional[int] = None,
+        max_backoff: Optional[float] = None,
+    ):
+        """
+        Args:
+            name: Имя источника
+            fetch: Функция замера; None — данных нет
+            ttl: Сколько секунд значение считается свежим
+            default: Значение, пока данных нет
+            max_failures: Сбоев подряд до отключения
+            max_backoff: Предельная пауза между повторными попытками (сек)
+        """
+        self.name = name
+        self.ttl = ttl
+        self._fetch = fetch
+        self._value = dict(default)
+        self._next_due = 0.0
+        self.max_failures = max_failures or SYSTEM_MONITOR_CONFIG["collector_max_failures"]
+        self.max_backoff = max_backoff or SYSTEM_MONITOR_CONFIG["collector_max_backoff"]
+        self.failures = 0
+        self.disabled = False
+        self.calls = 0
+        self.total_seconds = 0.0
+        self._recent = deque()  # (момент, стоимость) вызовов за последнюю минуту
+        self._lock = threading.Lock()
+
+    def collect(self) -> Dict[str, Any]:
+        """Значение источника (свежее или из кэша)."""
+        with self._lock:
+            now = time.monotonic()
+            if self.disabled or now < self._next_due:
+                return self._value
+
+            started = time.perf_counter()
+            try:
+                value = self._fetch()
+                error = None
+            except Exception as e:
+                value, error = None, e
+            cost = time.perf_counter() - started
+            self.calls += 1
+            self.total_seconds += cost
+            self._recent.append((now, cost))
+            self._trim(now)
+
+            if value is not None:
+                self._value = value
+                self.failures = 0
+                self._next_due = now + self.ttl
+                return self._value
+
+            self.failures += 1
+            if self.failures >= self.max_failures:
+                self.disabled = True
+                logger.warning(
+                    f"Источник {self.name} отключен после {self.failures} сбоев"
+                    + (f": {error}" if error else " (нет данных)")
+                )
+            else:
+                backoff = min(max(self.ttl, 1.0) * 2 ** self.failures, self.max_backoff)
+                self._next_due = now + backoff
+                logger.debug(f"Источник {self.name}: сбой, повтор через {backoff:.0f} с ({error})")
+            return self._value
+
+    def _trim(self, now: float) -> None:
+        """Забыть вызовы старше минуты (под self._lock)."""
+        horizon = now - 60
+        while self._recent and self._recent[0][0] < horizon:
+            self._recent.popleft()
+
+    def disable(self, reason: str) -> None:
+        """Отключить источник."""
+        self.disabled = True
+        logger.info(f"Источник {self.name} отключен: {reason}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Стоимость опроса: всего и за последнюю минуту."""
+        with self._lock:
+            self._trim(time.monotonic())
+            return {
+                "ttl": self.ttl,
+                "calls": self.calls,
+                "avg_ms": self.total_seconds / self.calls * 1000 if self.calls else 0.0,
+                "ms_per_minute": sum(cost for _, cost in self._recent) * 1000,
+                "calls_per_minute": len(self._recent),
+                "failures": self.failures,
+                "disabled": self.disabled,
+            }
 
 
 class SystemMonitor:
-    """Монитор системных показателей."""
+    """
+    Монитор системных показателей.
 
-    def __init__(self):
-        """Инициализация монитора."""
-        logger.info("Монитор системы инициализирован")
+    Фоновый поток раз в update_interval делает замер и публикует
+    неизменяемый снимок SystemStats; get_snapshot() просто возвращает
+    последний снимок и никогда не ждет замера.
+    """
+
+    def __init__(self, update_interval: Optional[float] = None):
+        """
+        Инициализация монитора.
+
+        Args:
+            update_interval: Период замеров (сек), по умолчанию из конфига
+        """
+        self.update_interval = update_interval or SYSTEM_MONITOR_CONFIG["update_interval"]
+        self._snapshot: Optional[SystemStats] = None
+        self._subscribers: List[Callable[[SystemStats], None]] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
         self._init_gpu_monitoring()
+        self._init_collectors()
+        # Первый вызов без интервала только запоминает счетчики CPU
+        psutil.cpu_percent(interval=None)
+        logger.info("Монитор системы инициализирован")
+
+    # ------------------------ ФОНОВЫЕ ЗАМЕРЫ ------------------------
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Запустить поток замеров."""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sampler_loop, name="system-monitor", daemon=True)
+        self._thread.start()
+        logger.info(f"Замеры системы каждые {self.update_interval:.1f} с")
+
+    def stop(self) -> None:
+        """Остановить поток замеров."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _sampler_loop(self) -> None:
+        """Замеры с фиксированным шагом (без накопления дрейфа)."""
+        next_tick = time.monotonic()
+        while not self._stop_event.is_set():
+            self._publish(self.sample())
+            next_tick += self.update_interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                # Замер дольше интервала — не пытаемся догонять
+                next_tick = time.monotonic()
+                delay = 0
+            self._stop_event.wait(delay)
+
+    def _publish(self, stats: SystemStats) -> None:
+        """Сохранить снимок и уведомить подписчиков."""
+        self._snapshot = stats
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(stats)
+            except Exception as e:
+                logger.error(f"Ошибка подписчика монитора: {e}")
+
+    def subscribe(self, callback: Callable[[SystemStats], None]) -> None:
+        """Вызывать callback(снимок) после каждого замера (в потоке монитора)."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[SystemStats], None]) -> None:
+        """Отписаться от замеров."""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def get_snapshot(self) -> SystemStats:
+        """
+        Последний снимок показателей без ожидания.
+
+        До первого фонового замера делает замер сам (один раз).
+        """
+        stats = self._snapshot
+        if stats is None:
+            stats = self.sample()
+            self._snapshot = stats
+        return stats
+
+    # ------------------------ ИСТОЧНИКИ ------------------------
+
+    def _init_collectors(self) -> None:
+        """Источники показателей, каждый со своим TTL."""
+        ttl = SYSTEM_MONITOR_CONFIG["collector_ttl"]
+        self.collectors: Dict[str, Collector] = {
+            "cpu": Collector("cpu", self._read_cpu_percent, ttl["cpu"], {"cpu_percent": 0}),
+            "cpu_freq": Collector("cpu_freq", self._read_cpu_freq, ttl["cpu_freq"], {"cpu_freq": 0}),
+            "ram": Collector(
+                "ram", self._read_ram, ttl["ram"], {"ram_percent": 0, "ram_used": 0, "ram_total": 0}
+            ),
+            "disk": Collector(
+                "disk", self._read_disk, ttl["disk"], {"disk_percent": 0, "disk_used": 0, "disk_total": 0}
+            ),
+            "cpu_temp": Collector("cpu_temp", self._read_cpu_temp, ttl["cpu_temp"], {"cpu_temp": None}),
+            "gpu": Collector(
+                "gpu", self._read_gpu, ttl["gpu"],
+                {"gpu_percent": None, "gpu_temp": None, "gpu_memory": None},
+            ),
+        }
+        if not self.gputil:
+            self.collectors["gpu"].disable("GPUtil недоступен")
 
     def _init_gpu_monitoring(self) -> None:
         """Попытка инициализировать GPUtil для NVIDIA."""
+        self.gputil = None
+        if not SYSTEM_MONITOR_CONFIG["monitor_gpu"]:
+            return
         try:
-            import gputil
-            self.gputil = gputil
+            import GPUtil
+            self.gputil = GPUtil
             logger.info("Поддержка GPU (NVIDIA) инициализирована")
         except ImportError:
-            self.gputil = None
             logger.warning("Оптиональные библиотеки GPU не установлены")
 
+    @staticmethod
+    def _read_cpu_percent() -> Dict[str, float]:
+        # Загрузка с предыдущего замера — без сна внутри вызова
+        return {"cpu_percent": psutil.cpu_percent(interval=None)}
+
+    @staticmethod
+    def _read_cpu_freq() -> Optional[Dict[str, float]]:
+        freq = psutil.cpu_freq()
+        return {"cpu_freq": freq.current} if freq else None
+
+    @staticmethod
+    def _read_ram() -> Dict[str, float]:
+        memory = psutil.virtual_memory()
+        return {
+            "ram_percent": memory.percent,
+            "ram_used": memory.used / (1024**3),  # ГБ
+            "ram_total": memory.total / (1024**3),  # ГБ
+        }
+
+    @staticmethod
+    def _read_disk() -> Dict[str, float]:
+        disk = psutil.disk_usage(SYSTEM_DRIVE)
+        return {
+            "disk_percent": disk.percent,
+            "disk_used": disk.used / (1024**3),  # ГБ
+            "disk_total": disk.total / (1024**3),  # ГБ
+        }
+
+    @staticmethod
+    def _read_cpu_temp() -> Optional[Dict[str, float]]:
+        if not hasattr(psutil, "sensors_temperatures"):
+            return None  # Windows: датчиков в psutil нет
+        temps = psutil.sensors_temperatures()
+        if "coretemp" in temps:
+            return {"cpu_temp": temps["coretemp"][0].current}
+        if temps:
+            # Получить первый доступный сенсор
+            first_sensor = list(temps.values())[0]
+            return {"cpu_temp": first_sensor[0].current}
+        return None
+
+    def _read_gpu(self) -> Optional[Dict[str, float]]:
+        # GPUtil запускает nvidia-smi на каждый вызов — отсюда большой TTL
+        gpus = self.gputil.getGPUs()
+        if not gpus:
+            return None
+        gpu = gpus[0]  # Первый GPU
+        return {
+            "gpu_percent": gpu.load * 100,
+            "gpu_temp": gpu.temperature,
+            "gpu_memory": gpu.memoryUsed / gpu.memoryTotal * 100,
+        }
+
     def get_cpu_stats(self) -> Dict[str, float]:
         """Получить статистику ПП."""
-        try:
-            cpu_percent = psutil.cpu_percent(interval=0.1)
-            cpu_freq = psutil.cpu_freq().current if psutil.cpu_freq() else 0
-            
-            return {
-                "cpu_percent": cpu_percent,
-                "cpu_freq": cpu_freq,
-            }
-        except Exception as e:
-            logger.error(f"Ошибка получения CPU статистики: {e}")
-            return {"cpu_percent": 0, "cpu_freq": 0}
+        return {**self.collectors["cpu"].collect(), **self.collectors["cpu_freq"].collect()}
 
     def get_ram_stats(self) -> Dict[str, float]:
         """Получить статистику ОЗУ."""
-        try:
-            memory = psutil.virtual_memory()
-            return {
-                "ram_percent": memory.percent,
-                "ram_used": memory.used / (1024**3),  # ГБ
-                "ram_total": memory.total / (1024**3),  # ГБ
-            }
-        except Exception as e:
-            logger.error(f"Ошибка получения RAM статистики: {e}")
-            return {"ram_percent": 0, "ram_used": 0, "ram_total": 0}
+        return self.collectors["ram"].collect()
 
     def get_disk_stats(self) -> Dict[str, float]:
-        """Получить статистику диска C:."""
-        try:
-            disk = psutil.disk_usage("C:\\")
-            return {
-                "disk_percent": disk.percent,
-                "disk_used": disk.used / (1024**3),  # ГБ
-                "disk_total": disk.total / (1024**3),  # ГБ
-            }
-        except Exception as e:
-            logger.error(f"Ошибка получения диск статистики: {e}")
-            return {"disk_percent": 0, "disk_used": 0, "disk_total": 0}
+        """Получить статистику системного диска."""
+        return self.collectors["disk"].collect()
 
     def get_gpu_stats(self) -> Dict[str, Optional[float]]:
         """Получить статистику GPU (NVIDIA)."""
-        if not self.gputil:
-            return {"gpu_percent": None, "gpu_temp": None, "gpu_memory": None}
-        
-        try:
-            gpus = self.gputil.getGPUs()
-            if gpus:
-                gpu = gpus[0]  # Первый GPU
-                return {
-                    "gpu_percent": gpu.load * 100,
-                    "gpu_temp": gpu.temperature,
-                    "gpu_memory": gpu.memoryUsed / gpu.memoryTotal * 100,
-                }
-        except Exception as e:
-            logger.warning(f"Ошибка получения GPU статистики: {e}")
-        
-        return {"gpu_percent": None, "gpu_temp": None, "gpu_memory": None}
+        return self.collectors["gpu"].collect()
 
     def get_cpu_temp(self) -> Optional[float]:
         """Получить температуру ПП."""
-        try:
-            temps = psutil.sensors_temperatures()
-            if "coretemp" in temps:
-                return temps["coretemp"][0].current
-            elif temps:
-                # Получить первый доступный сенсор
-                first_sensor = list(temps.values())[0]
-                return first_sensor[0].current
-        except Exception as e:
-            logger.debug(f"Не удалось получить температуру: {e}")
-        return None
+        return self.collectors["cpu_temp"].collect()["cpu_temp"]
+
+    def get_collector_stats(self) -> Dict[str, dict]:
+        """Стоимость и состояние каждого источника."""
+        return {name: collector.get_stats() for name, collector in self.collectors.items()}
 
     def get_all_stats(self) -> SystemStats:
-        """Получить все системные статистики."""
+        """Получить все системные статистики (последний снимок, не блокирует)."""
+        return self.get_snapshot()
+
+    def sample(self) -> SystemStats:
+        """Сделать замер всех показателей (вызывается потоком монитора)."""
         cpu_stats = self.get_cpu_stats()
         ram_stats = self.get_ram_stats()
         gpu_stats = self.get_gpu_stats()
-        
+
         return SystemStats(
             cpu_percent=cpu_stats["cpu_percent"],
             cpu_freq=cpu_stats["cpu_freq"],
@@ -127,7 +364,8 @@ class SystemMonitor:
             gpu_temp=gpu_stats["gpu_temp"],
             gpu_memory=gpu_stats["gpu_memory"],
             ram_percent=ram_stats["ram_percent"],
-            disk_percent=0,  # Пока не используется
+            disk_percent=self.get_disk_stats()["disk_percent"],
+            timestamp=time.time(),
         )
 
     def format_stats(self, stats: SystemStats) -> str:
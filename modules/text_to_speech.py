@@ -1,83 +1,494 @@
 """Модуль синтеза речи (TTS) с pyttsx3."""
 
-import pyttsx3
+import io
+import os
+import wave
+import queue
 import logging
-from typing import Optional
+import tempfile
+import itertools
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
 from config.settings import TTS_CONFIG
+from modules.phrase_cache import PhraseCache
+from modules.tracing import tracer
+
+try:
+    import pyttsx3
+    PYTTSX3_AVAILABLE = True
+except ImportError:
+    PYTTSX3_AVAILABLE = False
+
+try:
+    import pyaudio
+    PYAUDIO_AVAILABLE = True
+except ImportError:
+    PYAUDIO_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Приоритеты реплик (меньше — важнее)
+PRIORITY_URGENT = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
 
-class TextToSpeech:
-    """Обертка для pyttsx3."""
+# Длительность "отрисовки" слова в тестовом бэкенде
+_BUFFER_WORD_SECONDS = 0.3
+
+
+@dataclass(order=True)
+class Utterance:
+    """Реплика в очереди синтеза."""
+    priority: int
+    seq: int
+    text: str = field(compare=False, default="")
+    interruptible: bool = field(compare=False, default=True)
+    future: Future = field(compare=False, default_factory=Future)
+    action: Optional[Callable[[], Any]] = field(compare=False, default=None)
+    cache: bool = field(compare=False, default=False)
+    on_start: Optional[Callable[[], None]] = field(compare=False, default=None)
+    trace: str = field(compare=False, default="tts")
+    trace_id: Optional[int] = field(compare=False, default=None)
+    shutdown: bool = field(compare=False, default=False)
+
+
+class SpeechBackend:
+    """Базовый бэкенд синтеза. Все методы, кроме stop(), вызываются из потока TTS."""
+
+    def open(self) -> None:
+        """Подготовить движок."""
+
+    def reset(self) -> None:
+        """
+        Сбросить прерывание перед новой репликой.
+
+        Вызывается потоком TTS до того, как реплика станет текущей, поэтому
+        stop() из interrupt() не может быть затерт началом say()/play().
+        """
+
+    def say(self, text: str) -> bool:
+        """
+        Произнести текст (блокирующе).
+
+        Returns:
+            True если реплика произнесена полностью, False если прервана
+        """
+        raise NotImplementedError
+
+    def stop(self) -> None:
+        """Прервать текущую реплику (может вызываться из любого потока)."""
+
+    def set_property(self, name: str, value: Any) -> None:
+        """Установить параметр голоса (rate, volume, voice)."""
+
+    def voice_settings(self) -> Dict[str, Any]:
+        """Текущие параметры голоса (для привязки кэша фраз)."""
+        return {}
+
+    def render(self, text: str) -> Optional[bytes]:
+        """
+        Синтезировать текст в WAV без воспроизведения.
+
+        Returns:
+            WAV-байты или None, если бэкенд этого не умеет
+        """
+        return None
+
+    def play(self, wav: bytes) -> bool:
+        """
+        Воспроизвести готовый WAV (блокирующе).
+
+        Returns:
+            True если проиграно полностью, False если прервано
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Освободить ресурсы."""
+
+
+class Pyttsx3Backend(SpeechBackend):
+    """Синтез через pyttsx3 на динамики."""
 
     def __init__(self):
-        """Инициализация TTS двига."""
-        try:
-            self.engine = pyttsx3.init()
-            self.engine.setProperty("rate", TTS_CONFIG["rate"])
-            self.engine.setProperty("volume", TTS_CONFIG["volume"])
-            
-            # Установка русского голоса (если доступно)
+        self.engine = None
+        self._stop_requested = False
+        self._pa = None
+
+    def open(self) -> None:
+        if not PYTTSX3_AVAILABLE:
+            raise ImportError("pyttsx3 is required")
+        self.engine = pyttsx3.init()
+        self.engine.setProperty("rate", TTS_CONFIG["rate"])
+        self.engine.setProperty("volume", TTS_CONFIG["volume"])
+        # Прерывание делаем из коллбэка движка — в его же потоке
+        self.engine.connect("started-word", self._on_word)
+
+        # Установка голоса из настроек или русского (если доступно)
+        if TTS_CONFIG["voice"]:
+            self.engine.setProperty("voice", TTS_CONFIG["voice"])
+        else:
             self._set_russian_voice()
-            logger.info("Модуль TTS инициализирован")
-        except Exception as e:
-            logger.error(f"Ошибка инициализации TTS: {e}")
-            raise
 
     def _set_russian_voice(self) -> None:
         """Настроика русского голоса."""
         voices = self.engine.getProperty("voices")
-        
+
         # Поиск русского голоса
         for voice in voices:
             if "russian" in voice.name.lower() or "ru" in voice.languages[0].lower():
                 self.engine.setProperty("voice", voice.id)
                 logger.info(f"Установлен голос: {voice.name}")
                 return
-        
+
         # По умолчанию используем первый русского голос или дефолт
         if voices:
             self.engine.setProperty("voice", voices[0].id)
             logger.warning("Не найден русский голос, использую стандартный")
 
-    def speak(self, text: str, wait: bool = True) -> None:
+    def _on_word(self, name, location, length) -> None:
+        if self._stop_requested:
+            self.engine.stop()
+
+    def reset(self) -> None:
+        self._stop_requested = False
+
+    def say(self, text: str) -> bool:
+        self.engine.say(text)
+        self.engine.runAndWait()
+        return not self._stop_requested
+
+    def stop(self) -> None:
+        self._stop_requested = True
+
+    def set_property(self, name: str, value: Any) -> None:
+        self.engine.setProperty(name, value)
+
+    def voice_settings(self) -> Dict[str, Any]:
+        return {name: self.engine.getProperty(name) for name in ("rate", "volume", "voice")}
+
+    def render(self, text: str) -> Optional[bytes]:
+        # Без PyAudio проиграть готовый WAV нечем — синтезируем напрямую
+        if not PYAUDIO_AVAILABLE:
+            return None
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            self.engine.save_to_file(text, path)
+            self.engine.runAndWait()
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+    def play(self, wav: bytes) -> bool:
+        if self._pa is None:
+            self._pa = pyaudio.PyAudio()
+        with wave.open(io.BytesIO(wav), "rb") as reader:
+            stream = self._pa.open(
+                format=self._pa.get_format_from_width(reader.getsampwidth()),
+                channels=reader.getnchannels(),
+                rate=reader.getframerate(),
+                output=True,
+            )
+            try:
+                # Пишем небольшими блоками, чтобы barge-in срабатывал сразу
+                while not self._stop_requested:
+                    chunk = reader.readframes(1024)
+                    if not chunk:
+                        break
+                    stream.write(chunk)
+            finally:
+                stream.stop_stream()
+                stream.close()
+        return not self._stop_requested
+
+    def close(self) -> None:
+        try:
+            if self._pa:
+                self._pa.terminate()
+            self.engine._cleanup()
+        except Exception:
+            pass
+
+
+class BufferBackend(SpeechBackend):
+    """Тестовый бэкенд: пишет тишину нужной длины в память вместо динамиков."""
+
+    def __init__(self, sample_rate: int = 16000, realtime: bool = False):
+        """
+        Args:
+            sample_rate: Частота "отрисованного" PCM
+            realtime: Тратить на реплику столько же времени, сколько она звучит
+        """
+        self.sample_rate = sample_rate
+        self.realtime = realtime
+        self.output = bytearray()
+        self.spoken: List[str] = []
+        self.rendered: List[str] = []
+        self.properties = {}
+        self._stop = threading.Event()
+
+    def reset(self) -> None:
+        self._stop.clear()
+
+    def say(self, text: str) -> bool:
+        if not self._write(self._synthesize(text)):
+            return False
+        self.spoken.append(text)
+        return True
+
+    def _synthesize(self, text: str) -> bytes:
+        samples = int(len(text.split()) * _BUFFER_WORD_SECONDS * self.sample_rate)
+        return bytes(samples * 2)
+
+    def _write(self, pcm: bytes) -> bool:
+        step = self.sample_rate // 50 * 2  # 20 мс
+        for offset in range(0, len(pcm), step):
+            if self._stop.is_set():
+                return False
+            self.output += pcm[offset:offset + step]
+            if self.realtime:
+                self._stop.wait(0.02)
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def set_property(self, name: str, value: Any) -> None:
+        self.properties[name] = value
+
+    def voice_settings(self) -> Dict[str, Any]:
+        return dict(self.properties)
+
+    def render(self, text: str) -> Optional[bytes]:
+        self.rendered.append(text)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as writer:
+            writer.setnchannels(1)
+            writer.setsampwidth(2)
+            writer.setframerate(self.sample_rate)
+            writer.writeframes(self._synthesize(text))
+        return buffer.getvalue()
+
+    def play(self, wav: bytes) -> bool:
+        with wave.open(io.BytesIO(wav), "rb") as reader:
+            return self._write(reader.readframes(reader.getnframes()))
+
+
+class TextToSpeech:
+    """Очередь реплик с отдельным потоком синтеза."""
+
+    def __init__(
+        self,
+        backend: Optional[SpeechBackend] = None,
+        phrase_cache: Optional[PhraseCache] = None,
+    ):
+        """
+        Инициализация TTS двига.
+
+        Args:
+            backend: Бэкенд синтеза (по умолчанию pyttsx3)
+            phrase_cache: Кэш готовых рендеров постоянных фраз
+        """
+        self.backend = backend or Pyttsx3Backend()
+        self.phrase_cache = phrase_cache
+        self._applied_config = self._config_snapshot()
+        self._queue: "queue.PriorityQueue[Utterance]" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._current: Optional[Utterance] = None
+        self._ready = threading.Event()
+        self._init_error: Optional[Exception] = None
+
+        self._thread = threading.Thread(target=self._worker_loop, name="tts", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._init_error:
+            logger.error(f"Ошибка инициализации TTS: {self._init_error}")
+            raise self._init_error
+        logger.info("Модуль TTS инициализирован")
+
+    def _worker_loop(self) -> None:
+        """Поток синтеза: движок создается и используется только здесь."""
+        try:
+            self.backend.open()
+        except Exception as e:
+            self._init_error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        while True:
+            utterance = self._queue.get()
+            if utterance.shutdown:
+                break
+            if not utterance.future.set_running_or_notify_cancel():
+                continue
+
+            with self._lock:
+                self.backend.reset()
+                self._current = utterance
+            try:
+                if utterance.action:
+                    utterance.future.set_result(utterance.action())
+                else:
+                    logger.debug(f"Говорю: {utterance.text}")
+                    with tracer.span(utterance.trace, utterance.trace_id):
+                        if utterance.on_start:
+                            utterance.on_start()
+                        spoken = self._say(utterance)
+                    utterance.future.set_result(spoken)
+            except Exception as e:
+                logger.error(f"Ошибка по речи: {e}")
+                utterance.future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._current = None
+
+        self.backend.close()
+
+    def _say(self, utterance: Utterance) -> bool:
+        """Проиграть фразу из кэша, если можно, иначе синтезировать."""
+        if utterance.cache and self.phrase_cache:
+            wav = self._cached_render(utterance.text)
+            if wav is not None:
+                return self.backend.play(wav)
+        return self.backend.say(utterance.text)
+
+    def _cached_render(self, text: str) -> Optional[bytes]:
+        """Рендер фразы из кэша; при промахе — синтез и сохранение."""
+        self._sync_settings()
+        wav = self.phrase_cache.get(text)
+        if wav is None:
+            wav = self.backend.render(text)
+            if wav is not None:
+                self.phrase_cache.put(text, wav)
+        return wav
+
+    @staticmethod
+    def _config_snapshot() -> tuple:
+        return TTS_CONFIG["rate"], TTS_CONFIG["volume"], TTS_CONFIG["voice"]
+
+    def _sync_settings(self) -> None:
+        """Применить изменения TTS_CONFIG и перепривязать кэш к параметрам голоса."""
+        snapshot = self._config_snapshot()
+        if snapshot != self._applied_config:
+            for name, old, new in zip(("rate", "volume", "voice"), self._applied_config, snapshot):
+                if new != old and new is not None:
+                    self.backend.set_property(name, new)
+            self._applied_config = snapshot
+        self.phrase_cache.set_voice_settings(self.backend.voice_settings())
+
+    def _submit(self, utterance: Utterance, wait: bool) -> Future:
+        self._queue.put(utterance)
+        # Из потока синтеза ждать нельзя — он сам и должен выполнить реплику
+        if wait and threading.current_thread() is not self._thread:
+            try:
+                utterance.future.result()
+            except Exception:
+                pass
+        return utterance.future
+
+    def speak(
+        self,
+        text: str,
+        wait: bool = True,
+        priority: int = PRIORITY_NORMAL,
+        interruptible: bool = True,
+        cache: bool = False,
+        on_start: Optional[Callable[[], None]] = None,
+        trace: str = "tts",
+    ) -> Future:
         """
         Проводить синтез речи.
 
         Args:
             text: Текст для провождения
             wait: Ожидать завершения
+            priority: Приоритет в очереди (PRIORITY_*)
+            interruptible: Можно ли прервать реплику (barge-in)
+            cache: Постоянная фраза — играть из кэша рендеров
+            on_start: Вызывается в потоке синтеза, когда реплика начинает звучать
+            trace: Стадия для трассировки (prompt_tts, response_tts)
+
+        Returns:
+            Future с True (произнесено) или False (прервано)
         """
-        try:
-            logger.debug(f"Говорю: {text}")
-            self.engine.say(text)
-            if wait:
-                self.engine.runAndWait()
-        except Exception as e:
-            logger.error(f"Ошибка по речи: {e}")
+        utterance = Utterance(
+            priority, next(self._seq), text, interruptible, cache=cache, on_start=on_start,
+            trace=trace, trace_id=tracer.current,
+        )
+        return self._submit(utterance, wait)
+
+    def warm_phrases(self, phrases: Iterable[str]) -> None:
+        """Заранее отрендерить постоянные фразы (в фоне, с низким приоритетом)."""
+        if not self.phrase_cache:
+            return
+        for text in phrases:
+            utterance = Utterance(
+                PRIORITY_LOW, next(self._seq), interruptible=False,
+                action=lambda text=text: self._cached_render(text),
+            )
+            self._submit(utterance, wait=False)
+
+    def interrupt(self) -> None:
+        """Barge-in: прервать текущую реплику и отменить прерываемые из очереди."""
+        kept = []
+        while True:
+            try:
+                utterance = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if utterance.interruptible and utterance.action is None and not utterance.shutdown:
+                utterance.future.cancel()
+            else:
+                kept.append(utterance)
+        for utterance in kept:
+            self._queue.put(utterance)
+
+        with self._lock:
+            current = self._current
+        if current and current.interruptible and current.action is None:
+            self.backend.stop()
+            logger.info("Речь прервана")
+
+    def _set_property(self, name: str, value: Any) -> None:
+        utterance = Utterance(
+            PRIORITY_URGENT, next(self._seq), interruptible=False,
+            action=lambda: self.backend.set_property(name, value),
+        )
+        self._submit(utterance, wait=False)
 
     def set_rate(self, rate: int) -> None:
         """Настройка скорости речи."""
-        self.engine.setProperty("rate", rate)
+        self._set_property("rate", rate)
         logger.info(f"Скорость иставлена на: {rate}")
 
     def set_volume(self, volume: float) -> None:
         """Настройка громкости."""
-        self.engine.setProperty("volume", max(0, min(1, volume)))
+        self._set_property("volume", max(0, min(1, volume)))
         logger.info(f"Громкость установлена на: {volume}")
 
     def stop(self) -> None:
         """Остановить воспроизведение."""
         try:
-            self.engine.stop()
+            self.interrupt()
             logger.info("Речь остановлена")
         except Exception as e:
             logger.error(f"Ошибка при остановке: {e}")
 
+    def close(self) -> None:
+        """Остановить поток синтеза."""
+        self.stop()
+        # После всех реплик, оставшихся в очереди
+        self._queue.put(Utterance(PRIORITY_LOW + 1, next(self._seq), shutdown=True))
+
     def __del__(self) -> None:
         """Очистка ресурсов."""
         try:
-            self.engine._cleanup()
+            self.close()
         except:
             pass
@@ -0,0 +1,257 @@
+"""Трассировка задержек по репликам: от wake-word до действия и ответа."""
+
+import os
+import json
+import math
+import time
+import logging
+import itertools
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+from config.settings import TRACING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyHistogram:
+    """
+    Гистограмма задержек (мкс) с логарифмическими корзинами, как в HdrHistogram.
+
+    Внутри каждой степени двойки — 2**(sub_bucket_bits - 1) равных корзин,
+    поэтому относительная погрешность постоянна (~1.6% при 7 битах), а
+    память не зависит от числа значений.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 7):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.half_count = self.sub_bucket_count >> 1
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        if value < self.sub_bucket_count:
+            return value
+        shift = value.bit_length() - self.sub_bucket_bits
+        return self.sub_bucket_count + (shift - 1) * self.half_count + (value >> shift) - self.half_count
+
+    def _value(self, index: int) -> int:
+        """Середина корзины."""
+        if index < self.sub_bucket_count:
+            return index
+        shift, offset = divmod(index - self.sub_bucket_count, self.half_count)
+        shift += 1
+        mantissa = offset + self.half_count
+        return ((mantissa << shift) + ((mantissa + 1) << shift) - 1) // 2
+
+    def record(self, value_us: int) -> None:
+        """Добавить значение."""
+        value_us = max(0, int(value_us))
+        index = self._index(value_us)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.min = value_us if self.total == 0 else min(self.min, value_us)
+        self.max = max(self.max, value_us)
+        self.total += 1
+
+    def percentile(self, percent: float) -> int:
+        """Значение перцентиля (мкс, с точностью корзины)."""
+        if not self.total:
+            return 0
+        rank = max(1, math.ceil(percent / 100 * self.total))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(max(self._value(index), self.min), self.max)
+        return self.max
+
+
+class Span:
+    """Интервал стадии. Завершается end() или выходом из with."""
+
+    __slots__ = ("tracer", "name", "utterance", "start", "args")
+
+    def __init__(self, tracer: "Tracer", name: str, utterance: Optional[int], args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.utterance = utterance
+        self.args = args
+        self.start = time.perf_counter()
+
+    def end(self) -> None:
+        self.tracer._finish(self)
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.end()
+
+
+class _NullSpan:
+    """Заглушка при выключенной трассировке: ничего не замеряет."""
+
+    __slots__ = ()
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    Трассировщик стадий обработки реплик.
+
+    Каждая реплика (от срабатывания wake-word) получает номер; интервалы и
+    события из потоков Porcupine, Vosk и TTS помечаются им — явно или через
+    номер текущей реплики. Длительности интервалов и смещения событий от
+    начала реплики копятся в гистограммах по стадиям; последние события
+    можно выгрузить в формате Chrome trace (chrome://tracing, Perfetto).
+
+    Выключенный трассировщик возвращает общую заглушку и ничего не пишет.
+    """
+
+    def __init__(self, enabled: bool = False, max_events: int = TRACING_CONFIG["max_events"]):
+        self.enabled = enabled
+        self.current: Optional[int] = None
+        self._ids = itertools.count(1)
+        self._events: "deque[tuple]" = deque(maxlen=max_events)
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._starts: "OrderedDict[int, float]" = OrderedDict()
+        self._threads: Dict[int, str] = {}
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        """Включить трассировку."""
+        self.enabled = True
+        logger.info("Трассировка задержек включена")
+
+    def new_utterance(self) -> Optional[int]:
+        """Начать новую реплику; ее номер становится текущим."""
+        if not self.enabled:
+            return None
+        utterance = next(self._ids)
+        with self._lock:
+            self._starts[utterance] = time.perf_counter()
+            while len(self._starts) > 256:
+                self._starts.popitem(last=False)
+        self.current = utterance
+        return utterance
+
+    def span(self, name: str, utterance: Optional[int] = None, **args):
+        """
+        Интервал стадии: with tracer.span(...) или span = ...; span.end().
+
+        Args:
+            name: Стадия
+            utterance: Номер реплики (по умолчанию — текущая)
+            args: Доп. поля события
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, utterance if utterance is not None else self.current, args)
+
+    def instant(self, name: str, utterance: Optional[int] = None, **args) -> None:
+        """Событие-точка; в гистограмму идет смещение от начала реплики."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        utterance = utterance if utterance is not None else self.current
+        thread = threading.current_thread()
+        with self._lock:
+            self._threads[thread.ident] = thread.name
+            self._events.append(("i", name, utterance, thread.ident, now, 0.0, args))
+            started = self._starts.get(utterance)
+            if started is not None:
+                self._histogram(name).record((now - started) * 1e6)
+
+    def _finish(self, span: Span) -> None:
+        now = time.perf_counter()
+        thread = threading.current_thread()
+        with self._lock:
+            self._threads[thread.ident] = thread.name
+            self._events.append(("X", span.name, span.utterance, thread.ident, span.start, now - span.start, span.args))
+            self._histogram(span.name).record((now - span.start) * 1e6)
+
+    def _histogram(self, name: str) -> LatencyHistogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms[name] = LatencyHistogram()
+        return histogram
+
+    def summary(self) -> Dict[str, dict]:
+        """
+        Статистика по стадиям (мс).
+
+        Для интервалов — длительность, для событий — время от wake-word.
+        """
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {
+            name: {
+                "count": histogram.total,
+                "p50": histogram.percentile(50) / 1000,
+                "p95": histogram.percentile(95) / 1000,
+                "p99": histogram.percentile(99) / 1000,
+                "max": histogram.max / 1000,
+            }
+            for name, histogram in histograms.items()
+        }
+
+    def format_summary(self) -> str:
+        """Таблица задержек по стадиям."""
+        lines = [f"{'стадия':<24}{'n':>6}{'p50, мс':>10}{'p95, мс':>10}{'p99, мс':>10}{'max, мс':>10}"]
+        for name, stats in sorted(self.summary().items(), key=lambda item: item[1]["p50"]):
+            lines.append(
+                f"{name:<24}{stats['count']:>6}{stats['p50']:>10.1f}{stats['p95']:>10.1f}"
+                f"{stats['p99']:>10.1f}{stats['max']:>10.1f}"
+            )
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> dict:
+        """Последние события в формате Chrome trace (JSON Object Format)."""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        trace: List[dict] = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        for phase, name, utterance, tid, start, duration, args in events:
+            event = {
+                "name": name,
+                "ph": phase,
+                "ts": (start - self._origin) * 1e6,
+                "pid": pid,
+                "tid": tid,
+                "args": dict(args, utterance=utterance),
+            }
+            if phase == "X":
+                event["dur"] = duration * 1e6
+            else:
+                event["s"] = "t"
+            trace.append(event)
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def dump(self, path: str = TRACING_CONFIG["trace_path"]) -> None:
+        """Сохранить трассу для chrome://tracing или Perfetto."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+        logger.info(f"Трасса сохранена: {path}")
+
+
+# Общий трассировщик процесса
+tracer = Tracer(enabled=TRACING_CONFIG["enabled"])
@@ -0,0 +1,266 @@
+"""Кэш переводов по предложениям (LRU в памяти + SQLite на диске)."""
+
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from config.settings import DATABASE_CONFIG, TRANSLATION_CONFIG
+from modules.database import connect
+
+logger = logging.getLogger(__name__)
+
+# Конец предложения: знак препинания и пробел перед следующим
+SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+# Есть ли в сегменте буквы (числа, время, знаки переводить незачем)
+HAS_LETTERS = re.compile(r"[^\W\d_]")
+
+
+def normalize(segment: str) -> str:
+    """Единая форма сегмента: NFC и одиночные пробелы."""
+    return " ".join(unicodedata.normalize("NFC", segment).split())
+
+
+def split_segments(text: str) -> List[List[str]]:
+    """
+    Разбить текст на сегменты для перевода.
+
+    Returns:
+        Строки текста, каждая — список нормализованных предложений
+        (пустая строка — пустой список)
+    """
+    lines = []
+    for line in text.splitlines():
+        sentences = (normalize(part) for part in SENTENCE_END.split(line))
+        lines.append([sentence for sentence in sentences if sentence])
+    return lines
+
+
+class TranslationCache:
+    """
+    Кэш переводов сегментов.
+
+    Ключ — хэш нормализованного сегмента и языковая пара. Сначала
+    проверяется LRU в памяти, затем таблица SQLite (WAL); в переводчик
+    уходят только промахи. Для каждого сегмента хранится, сколько стоил
+    его перевод, — из этого считается сэкономленное время.
+    """
+
+    def __init__(
+        self,
+        path: str = DATABASE_CONFIG["path"],
+        max_entries: int = TRANSLATION_CONFIG["cache_entries"],
+    ):
+        """
+        Args:
+            path: Файл базы данных
+            max_entries: Сегментов в памяти
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "db_hits": 0, "misses": 0, "saved_ms": 0.0, "spent_ms": 0.0}
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        # После close() база открывается заново при следующем обращении
+        self._reopen = False
+        try:
+            self._db = self._connect()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Кэш переводов только в памяти: {e}")
+
+    def _connect(self) -> sqlite3.Connection:
+        db = connect(self.path)
+        db.execute(
+            """CREATE TABLE IF NOT EXISTS translation_cache (
+                pair TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                source TEXT NOT NULL,
+                translated TEXT NOT NULL,
+                cost_ms REAL NOT NULL,
+                PRIMARY KEY (pair, hash)
+            ) WITHOUT ROWID"""
+        )
+        db.commit()
+        return db
+
+    def _database(self) -> Optional[sqlite3.Connection]:
+        """Соединение с базой (под self._lock); None — кэш только в памяти."""
+        if self._reopen:
+            self._reopen = False
+            try:
+                self._db = self._connect()
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Кэш переводов только в памяти: {e}")
+        return self._db
+
+    @staticmethod
+    def _hash(segment: str) -> str:
+        return hashlib.blake2b(segment.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _remember(self, key: Tuple[str, str], value: Tuple[str, float]) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, segments: List[str], pair: str) -> Dict[str, Tuple[str, float]]:
+        """
+        Найти переводы сегментов.
+
+        Returns:
+            {сегмент: (перевод, стоимость перевода в мс)} для найденных
+        """
+        found: Dict[str, Tuple[str, float]] = {}
+        missing: Dict[str, str] = {}
+        with self._lock:
+            for segment in segments:
+                key = (pair, self._hash(segment))
+                value = self._memory.get(key)
+                if value is not None:
+                    self._memory.move_to_end(key)
+                    found[segment] = value
+                else:
+                    missing[key[1]] = segment
+
+            db = self._database() if missing else None
+            if db:
+                try:
+                    placeholders = ",".join("?" * len(missing))
+                    rows = db.execute(
+                        f"SELECT hash, translated, cost_ms FROM translation_cache "
+                        f"WHERE pair = ? AND hash IN ({placeholders})",
+                        [pair, *missing],
+                    ).fetchall()
+                except sqlite3.Error as e:
+                    logger.warning(f"Ошибка чтения кэша переводов: {e}")
+                    rows = []
+                for digest, translated, cost_ms in rows:
+                    segment = missing[digest]
+                    self._remember((pair, digest), (translated, cost_ms))
+                    found[segment] = (translated, cost_ms)
+                    self.stats["db_hits"] += 1
+        return found
+
+    def put_many(self, entries: List[Tuple[str, str, float]], pair: str) -> None:
+        """
+        Сохранить переводы.
+
+        Args:
+            entries: (сегмент, перевод, стоимость в мс)
+        """
+        rows = [(pair, self._hash(segment), segment, translated, cost_ms)
+                for segment, translated, cost_ms in entries]
+        with self._lock:
+            for _, digest, _, translated, cost_ms in rows:
+                self._remember((pair, digest), (translated, cost_ms))
+            db = self._database()
+            if db:
+                try:
+                    db.executemany(
+                        "INSERT OR REPLACE INTO translation_cache VALUES (?, ?, ?, ?, ?)", rows
+                    )
+                    db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Ошибка записи кэша переводов: {e}")
+
+    def translate(
+        self,
+        text: str,
+        pair: str,
+        translate_many: Callable[[List[str]], List[str]],
+    ) -> Tuple[str, Dict]:
+        """
+        Перевести текст, переводя только сегменты, которых нет в кэше.
+
+        Args:
+            text: Исходный текст
+            pair: Языковая пара ("ru-en")
+            translate_many: Перевод списка сегментов (в том же порядке)
+
+        Returns:
+            (перевод с исходной разбивкой на строки, отчет по запросу)
+        """
+        lines = split_segments(text)
+        translated, report = self.translate_segments(
+            [segment for line in lines for segment in line], pair, translate_many
+        )
+        results = iter(translated)
+        result = "\n".join(" ".join(next(results) for _ in line) for line in lines)
+        return result, report
+
+    def translate_segments(
+        self,
+        segments: List[str],
+        pair: str,
+        translate_many: Callable[[List[str]], List[str]],
+    ) -> Tuple[List[str], Dict]:
+        """
+        Перевести готовые сегменты; все промахи кэша — одним вызовом translate_many.
+
+        Args:
+            segments: Нормализованные предложения (см. split_segments)
+            pair: Языковая пара ("ru-en")
+            translate_many: Перевод списка сегментов (в том же порядке)
+
+        Returns:
+            (переводы в порядке segments, отчет по запросу); сегменты без
+            букв возвращаются как есть
+        """
+        unique = list(dict.fromkeys(segment for segment in segments if HAS_LETTERS.search(segment)))
+        found = self.get_many(unique, pair)
+        misses = [segment for segment in unique if segment not in found]
+
+        spent_ms = 0.0
+        if misses:
+            started = time.perf_counter()
+            translated = translate_many(misses)
+            spent_ms = (time.perf_counter() - started) * 1000
+            # Время пакета делится между сегментами пропорционально длине
+            total_chars = sum(len(segment) for segment in misses)
+            entries = [
+                (segment, result, spent_ms * len(segment) / total_chars)
+                for segment, result in zip(misses, translated)
+            ]
+            self.put_many(entries, pair)
+            found.update({segment: (result, cost_ms) for segment, result, cost_ms in entries})
+
+        saved_ms = sum((found[segment][1] for segment in unique if segment not in misses), 0.0)
+        hits = len(unique) - len(misses)
+        with self._lock:
+            self.stats["hits"] += hits
+            self.stats["misses"] += len(misses)
+            self.stats["saved_ms"] += saved_ms
+            self.stats["spent_ms"] += spent_ms
+
+        results = [found[segment][0] if segment in found else segment for segment in segments]
+        report = {
+            "segments": len(unique),
+            "hits": hits,
+            "misses": len(misses),
+            "hit_rate": hits / len(unique) if unique else 0.0,
+            "spent_ms": spent_ms,
+            "saved_ms": saved_ms,
+        }
+        return results, report
+
+    def get_stats(self) -> Dict:
+        """Статистика кэша с начала работы."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def close(self) -> None:
+        """Закрыть базу данных (она откроется снова при следующем обращении)."""
+        with self._lock:
+            if self._db:
+                self._db.close()
+                self._db = None
+                self._reopen = True
@@ -0,0 +1,88 @@
+"""Модуль детектора речевой активности (VAD) перед Vosk."""
+
+import logging
+import numpy as np
+from config.settings import VAD_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 20 * log10(32768): перевод энергии int16 в dBFS
+_INT16_FULL_SCALE_DB = 90.309
+
+
+class VoiceActivityDetector:
+    """
+    Энергия + частота переходов через ноль с адаптивным уровнем шума.
+
+    Уровень шума — низкий перцентиль энергий подкадров за последние
+    несколько секунд, независимо от решения речь/тишина: паузы между
+    словами держат его у шума, а ровный громкий шум (вентилятор) за
+    несколько секунд поднимает порог и перестает считаться речью.
+    """
+
+    def __init__(self, sample_rate: int):
+        """
+        Инициализация детектора.
+
+        Args:
+            sample_rate: Частота дискретизации PCM
+        """
+        self.subframe = max(16, int(sample_rate * VAD_CONFIG["subframe_ms"] / 1000))
+        self.margin_db = VAD_CONFIG["energy_margin_db"]
+        self.zcr_unvoiced = VAD_CONFIG["zcr_unvoiced"]
+        self.min_speech_subframes = VAD_CONFIG["min_speech_subframes"]
+        self.noise_floor_db = VAD_CONFIG["initial_noise_floor_db"]
+        # Кольцевой буфер энергий подкадров
+        self._history = np.empty(max(1, VAD_CONFIG["floor_window_ms"] // VAD_CONFIG["subframe_ms"]), dtype=np.float32)
+        self._history_pos = 0
+        self._history_len = 0
+
+    def reset(self) -> None:
+        """Сбросить уровень шума к начальному."""
+        self.noise_floor_db = VAD_CONFIG["initial_noise_floor_db"]
+        self._history_pos = 0
+        self._history_len = 0
+
+    def is_speech(self, pcm: bytes) -> bool:
+        """
+        Есть ли речь в блоке PCM (16 бит, моно).
+
+        Блок режется на подкадры, энергия и ZCR считаются для всех сразу.
+        """
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        count = len(samples) // self.subframe * self.subframe
+        if count == 0:
+            return False
+        frames = samples[:count].reshape(-1, self.subframe).astype(np.float32)
+
+        energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-9) - _INT16_FULL_SCALE_DB
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.subframe - 1)
+
+        threshold = self.noise_floor_db + self.margin_db
+        # Гласные — громко; шипящие — тише, но с частыми переходами через ноль
+        voiced = energy_db > threshold
+        unvoiced = (energy_db > threshold - self.margin_db / 2) & (zcr > self.zcr_unvoiced)
+        speech = int(np.count_nonzero(voiced | unvoiced)) >= self.min_speech_subframes
+
+        self._update_noise_floor(energy_db)
+        return speech
+
+    def _update_noise_floor(self, energy_db: np.ndarray) -> None:
+        """Сдвинуть уровень шума к перцентилю окна: вниз быстро, вверх медленно."""
+        size = len(self._history)
+        energy_db = energy_db[-size:]
+        end = self._history_pos + len(energy_db)
+        if end <= size:
+            self._history[self._history_pos:end] = energy_db
+        else:
+            split = size - self._history_pos
+            self._history[self._history_pos:] = energy_db[:split]
+            self._history[:end - size] = energy_db[split:]
+        self._history_pos = end % size
+        self._history_len = min(size, self._history_len + len(energy_db))
+
+        target = float(np.percentile(self._history[:self._history_len], VAD_CONFIG["floor_percentile"]))
+        rate = VAD_CONFIG["floor_fall_rate"] if target < self.noise_floor_db else VAD_CONFIG["floor_rise_rate"]
+        self.noise_floor_db += rate * (target - self.noise_floor_db)
+        self.noise_floor_db = max(-_INT16_FULL_SCALE_DB, self.noise_floor_db)
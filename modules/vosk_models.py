@@ -0,0 +1,147 @@
+"""Модели Vosk разного размера: загрузка по требованию и выгрузка при простое."""
+
+import time
+import logging
+import threading
+from typing import Optional
+
+from vosk import Model
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def process_rss() -> int:
+    """Резидентная память процесса (байт), 0 если psutil недоступен."""
+    if not PSUTIL_AVAILABLE:
+        return 0
+    return psutil.Process().memory_info().rss
+
+
+class ModelTier:
+    """
+    Одна модель Vosk.
+
+    Модель загружается при первом acquire() и, если задан idle_unload,
+    выгружается через столько секунд после последнего release().
+    """
+
+    def __init__(self, name: str, path: str, idle_unload: Optional[float] = None):
+        """
+        Args:
+            name: Имя уровня для логов и статистики ("small", "large")
+            path: Путь к модели
+            idle_unload: Выгружать после простоя (сек); None — держать всегда
+        """
+        self.name = name
+        self.path = path
+        self.idle_unload = idle_unload
+        self._model: Optional[Model] = None
+        self._users = 0
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._loading = threading.Lock()
+        self.stats = {
+            "loads": 0,
+            "unloads": 0,
+            "load_seconds": 0.0,
+            "rss_bytes": 0,  # Прирост RSS при последней загрузке
+            "decodes": 0,
+            "decode_seconds": 0.0,
+            "audio_seconds": 0.0,
+        }
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def _load(self) -> Model:
+        # Загрузка идет вне self._lock: release/unload других потоков не ждут ее
+        with self._loading:
+            if self._model is not None:
+                return self._model
+            logger.info(f"Загрузка модели Vosk ({self.name}): {self.path}")
+            rss_before = process_rss()
+            started = time.perf_counter()
+            model = Model(self.path)
+            self.stats["load_seconds"] = time.perf_counter() - started
+            self.stats["rss_bytes"] = max(0, process_rss() - rss_before)
+            self.stats["loads"] += 1
+            logger.info(
+                f"Модель {self.name} загружена за {self.stats['load_seconds']:.1f} с, "
+                f"+{self.stats['rss_bytes'] / 2 ** 20:.0f} МБ RSS"
+            )
+            with self._lock:
+                self._model = model
+            return model
+
+    def acquire(self) -> Model:
+        """Получить модель (загружая при необходимости) и отметить использование."""
+        with self._lock:
+            self._users += 1
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            model = self._model
+        if model is not None:
+            return model
+        try:
+            return self._load()
+        except Exception:
+            self.release()
+            raise
+
+    def release(self) -> None:
+        """Закончить использование; запускает таймер выгрузки."""
+        with self._lock:
+            self._users = max(0, self._users - 1)
+            if self._users or self.idle_unload is None or self._model is None:
+                return
+            self._timer = threading.Timer(self.idle_unload, self.unload)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def prefetch(self) -> None:
+        """Начать загрузку в фоне (например, в начале диктовки)."""
+        def _run():
+            try:
+                self.acquire()
+            except Exception as e:
+                logger.error(f"Ошибка загрузки модели {self.name}: {e}")
+            else:
+                self.release()
+
+        if not self.loaded:
+            threading.Thread(target=_run, name=f"vosk-{self.name}", daemon=True).start()
+
+    def unload(self) -> None:
+        """Выгрузить модель, если она сейчас не используется."""
+        with self._lock:
+            if self._users or self._model is None:
+                return
+            self._model = None
+            self._timer = None
+            self.stats["unloads"] += 1
+        logger.info(f"Модель {self.name} выгружена после простоя")
+
+    def record_decode(self, seconds: float, audio_seconds: float) -> None:
+        """Учесть время декодирования фразы."""
+        self.stats["decodes"] += 1
+        self.stats["decode_seconds"] += seconds
+        self.stats["audio_seconds"] += audio_seconds
+
+    def get_stats(self) -> dict:
+        """Статистика уровня: загрузка, память и задержка декодирования."""
+        stats = dict(self.stats)
+        decodes = stats["decodes"]
+        stats["loaded"] = self.loaded
+        stats["rss_mb"] = stats["rss_bytes"] / 2 ** 20
+        stats["avg_decode_ms"] = stats["decode_seconds"] / decodes * 1000 if decodes else 0.0
+        # Real-time factor: время декодирования / длительность звука
+        stats["rtf"] = stats["decode_seconds"] / stats["audio_seconds"] if stats["audio_seconds"] else 0.0
+        return stats
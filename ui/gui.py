@@ -95,7 +95,10 @@ class AssistantWindow(QMainWindow):
     def _update_stats(self):
         if not self.assistant:
             return
-        stats = self.assistant.system_monitor.get_all_stats()
+        # Не блокируем GUI, пока монитор загружается в фоне
+        if not self.assistant.components["system_monitor"].ready:
+            return
+        stats = self.assistant.system_monitor.get_snapshot()
         self.system_label.setText(self.assistant.system_monitor.format_stats(stats))
 
     def _on_toggle(self):